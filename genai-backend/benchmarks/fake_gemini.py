@@ -0,0 +1,142 @@
+# benchmarks/fake_gemini.py
+
+import json
+import random
+import asyncio
+import hashlib
+import argparse
+from typing import Dict, List
+
+import uvicorn
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, StreamingResponse
+from starlette.routing import Route
+
+EMBEDDING_DIMENSIONS = 768
+
+
+class FakeGeminiConfig:
+    def __init__(
+        self,
+        latency_ms: float = 400,
+        jitter_ms: float = 100,
+        embed_latency_ms: float = 60,
+        stream_chunks: int = 8,
+        chunk_delay_ms: float = 40,
+        error_rate: float = 0.0,
+    ):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.embed_latency_ms = embed_latency_ms
+        self.stream_chunks = stream_chunks
+        self.chunk_delay_ms = chunk_delay_ms
+        self.error_rate = error_rate
+
+
+def _prompt_text(body: Dict) -> str:
+    return " ".join(
+        part.get("text", "")
+        for content in body.get("contents", [])
+        for part in content.get("parts", [])
+    )
+
+
+def _reply_for(prompt: str) -> str:
+    """Canned replies shaped like what each feature parses."""
+    if "Respond only in JSON" in prompt:
+        score = int(hashlib.sha256(prompt.encode("utf-8")).hexdigest(), 16) % 60 + 40
+        return json.dumps({"score": score, "strengths": ["Python", "Docker"], "gaps": ["Kubernetes"]})
+    if "cover letter" in prompt.lower():
+        return "Dear Hiring Manager,\n\n" + "I am excited to apply for this role. " * 40 + "\n\nSincerely,\nCandidate"
+    if "resume reviewer" in prompt.lower():
+        return "1. Quantify your achievements.\n2. Add a skills section.\n3. Tailor your summary to the role."
+    return "Here is some guidance based on your question. " * 12
+
+
+def _usage(prompt: str, reply: str) -> Dict:
+    return {
+        "promptTokenCount": len(prompt) // 4,
+        "candidatesTokenCount": len(reply) // 4,
+        "totalTokenCount": (len(prompt) + len(reply)) // 4,
+    }
+
+
+def _vector(text: str) -> List[float]:
+    seed = hashlib.sha256(text.encode("utf-8")).digest()
+    rng = random.Random(seed)
+    return [rng.uniform(-1, 1) for _ in range(EMBEDDING_DIMENSIONS)]
+
+
+def create_app(config: FakeGeminiConfig) -> Starlette:
+    async def think(base_ms: float) -> None:
+        await asyncio.sleep(max(0.0, random.gauss(base_ms, config.jitter_ms)) / 1000)
+
+    def failed() -> bool:
+        return config.error_rate > 0 and random.random() < config.error_rate
+
+    async def model_call(request: Request):
+        model, _, method = request.path_params["target"].partition(":")
+        body = await request.json()
+
+        if method == "batchEmbedContents":
+            await think(config.embed_latency_ms)
+            texts = [item["content"]["parts"][0]["text"] for item in body.get("requests", [])]
+            return JSONResponse({"embeddings": [{"values": _vector(text)} for text in texts]})
+
+        if failed():
+            await think(config.latency_ms / 4)
+            return JSONResponse({"error": {"code": 503, "message": "fake overload"}}, status_code=503)
+
+        prompt = _prompt_text(body)
+        reply = _reply_for(prompt)
+
+        if method == "generateContent":
+            await think(config.latency_ms)
+            return JSONResponse({
+                "candidates": [{"content": {"parts": [{"text": reply}], "role": "model"}, "finishReason": "STOP"}],
+                "usageMetadata": _usage(prompt, reply),
+            })
+
+        if method == "streamGenerateContent":
+            async def events():
+                await think(config.latency_ms / 2)  # time to first token
+                size = max(1, len(reply) // max(1, config.stream_chunks))
+                for start in range(0, len(reply), size):
+                    chunk = {"candidates": [{"content": {"parts": [{"text": reply[start:start + size]}], "role": "model"}}]}
+                    yield f"data: {json.dumps(chunk)}\r\n\r\n"
+                    await asyncio.sleep(config.chunk_delay_ms / 1000)
+                yield f"data: {json.dumps({'usageMetadata': _usage(prompt, reply)})}\r\n\r\n"
+
+            return StreamingResponse(events(), media_type="text/event-stream")
+
+        return JSONResponse({"error": {"code": 404, "message": f"unknown method {method}"}}, status_code=404)
+
+    return Starlette(routes=[Route("/models/{target:path}", model_call, methods=["POST"])])
+
+
+def main() -> None:
+    # python -m benchmarks.fake_gemini --port 8765 --latency-ms 400
+    parser = argparse.ArgumentParser(description="Local stand-in for the Gemini REST API")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency-ms", type=float, default=400)
+    parser.add_argument("--jitter-ms", type=float, default=100)
+    parser.add_argument("--embed-latency-ms", type=float, default=60)
+    parser.add_argument("--stream-chunks", type=int, default=8)
+    parser.add_argument("--chunk-delay-ms", type=float, default=40)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    args = parser.parse_args()
+
+    config = FakeGeminiConfig(
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        embed_latency_ms=args.embed_latency_ms,
+        stream_chunks=args.stream_chunks,
+        chunk_delay_ms=args.chunk_delay_ms,
+        error_rate=args.error_rate,
+    )
+    uvicorn.run(create_app(config), host="127.0.0.1", port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+# benchmarks/import_profile.py
+
+import os
+import sys
+import json
+import argparse
+import subprocess
+from collections import defaultdict
+from typing import Dict, List
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FIRST_PARTY = ("main", "db", "models", "modules", "routers", "services", "utils")
+
+
+def parse_importtime(output: str) -> List[Dict]:
+    """Rows of `python -X importtime` output as {module, self_us, cumulative_us, depth}."""
+    rows = []
+    for line in output.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        indent = len(name) - len(name.lstrip()) - 1
+        rows.append({
+            "module": name.strip(),
+            "self_us": int(self_us),
+            "cumulative_us": int(cumulative_us),
+            "depth": indent // 2,
+        })
+    return rows
+
+
+def profile_imports(target: str = "main") -> Dict:
+    """Import `target` in a fresh interpreter and summarise where the time went."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {target}"],
+        cwd=BACKEND_DIR,
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"import {target} failed:\n{result.stderr[-2000:]}")
+    rows = parse_importtime(result.stderr)
+
+    total_us = next((row["cumulative_us"] for row in rows if row["module"] == target and row["depth"] == 0), 0)
+
+    # Self time per top-level package, i.e. what each dependency costs in total
+    by_package: Dict[str, int] = defaultdict(int)
+    for row in rows:
+        by_package[row["module"].split(".")[0]] += row["self_us"]
+
+    # Cumulative time of each third-party import made directly by our own modules
+    first_party_imports: Dict[str, Dict] = {}
+    for index, row in enumerate(rows):
+        # importtime prints a module after everything it imported
+        parent = next(
+            (later["module"] for later in rows[index + 1:] if later["depth"] < row["depth"]),
+            None,
+        )
+        if parent and parent.split(".")[0] in FIRST_PARTY and row["module"].split(".")[0] not in FIRST_PARTY:
+            entry = first_party_imports.setdefault(row["module"], {"cumulative_us": 0, "imported_by": parent})
+            entry["cumulative_us"] = max(entry["cumulative_us"], row["cumulative_us"])
+
+    return {
+        "target": target,
+        "total_ms": round(total_us / 1000, 1),
+        "packages_ms": {
+            name: round(us / 1000, 1)
+            for name, us in sorted(by_package.items(), key=lambda item: item[1], reverse=True)
+        },
+        "first_party_imports_ms": {
+            name: {"ms": round(entry["cumulative_us"] / 1000, 1), "imported_by": entry["imported_by"]}
+            for name, entry in sorted(first_party_imports.items(), key=lambda item: item[1]["cumulative_us"], reverse=True)
+        },
+    }
+
+
+def main() -> None:
+    # python -m benchmarks.import_profile [--top 20] [--json]
+    parser = argparse.ArgumentParser(description="Import-time profile of the app (cold start)")
+    parser.add_argument("--target", default="main")
+    parser.add_argument("--top", type=int, default=20)
+    parser.add_argument("--json", action="store_true", help="Print the full report as JSON")
+    args = parser.parse_args()
+
+    report = profile_imports(args.target)
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+
+    print(f"⏱️ import {report['target']}: {report['total_ms']} ms\n")
+    print("Self time by package (what each dependency costs):")
+    for name, ms in list(report["packages_ms"].items())[:args.top]:
+        print(f"  {name:<32}{ms:>10} ms")
+    print("\nHeaviest imports made by our own modules (cumulative):")
+    for name, entry in list(report["first_party_imports_ms"].items())[:args.top]:
+        print(f"  {name:<32}{entry['ms']:>10} ms   ← {entry['imported_by']}")
+
+
+if __name__ == "__main__":
+    main()
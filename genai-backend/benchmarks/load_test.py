@@ -0,0 +1,298 @@
+# benchmarks/load_test.py
+
+import os
+import sys
+import json
+import time
+import random
+import asyncio
+import argparse
+import tempfile
+import subprocess
+from datetime import datetime
+from typing import Dict, List, Optional
+
+import httpx
+
+from benchmarks.seed import user_ids, job_ids
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_DIR = os.path.join(BACKEND_DIR, "benchmarks", "results")
+
+CHAT_MESSAGES = [
+    "hi",
+    "what is my ats score",
+    "recommend jobs for me",
+    "how do i apply for a job",
+    "What should I focus on in a system design interview?",
+    "Can you explain what a DevOps engineer does day to day?",
+]
+
+ROUTES = ("chat", "jd_match", "cover_letter", "resume_tips", "cover_letter_stream")
+
+
+def build_request(route: str, rng: random.Random, users: List[str], jobs: List[str], refresh_ratio: float) -> Dict:
+    """Method, URL and payload for one request to `route`."""
+    user_id, job_id = rng.choice(users), rng.choice(jobs)
+    refresh = "true" if rng.random() < refresh_ratio else "false"
+    if route == "chat":
+        return {"method": "POST", "url": "/chat", "data": {"message": rng.choice(CHAT_MESSAGES), "user_id": user_id}}
+    if route == "jd_match":
+        return {"method": "GET", "url": "/genai/jd-match/", "params": {"user_id": user_id, "job_id": job_id, "refresh": refresh}}
+    if route == "cover_letter":
+        return {"method": "GET", "url": "/genai/cover-letter/", "params": {"user_id": user_id, "job_id": job_id, "refresh": refresh}}
+    if route == "cover_letter_stream":
+        return {"method": "GET", "url": "/genai/cover-letter/stream", "params": {"user_id": user_id, "job_id": job_id, "refresh": refresh}}
+    if route == "resume_tips":
+        return {"method": "GET", "url": "/genai/resume-tips/", "params": {"user_id": user_id, "refresh": refresh}}
+    raise ValueError(f"Unknown route: {route}")
+
+
+def percentile(sorted_values: List[float], p: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, int(round(p / 100 * len(sorted_values) + 0.5)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def summarize(samples: List[Dict], elapsed: float) -> Dict:
+    latencies = sorted(s["ms"] for s in samples)
+    errors = [s for s in samples if not s["ok"]]
+    status_counts: Dict[str, int] = {}
+    for s in samples:
+        status_counts[str(s["status"])] = status_counts.get(str(s["status"]), 0) + 1
+    return {
+        "requests": len(samples),
+        "errors": len(errors),
+        "error_rate": round(len(errors) / len(samples), 4) if samples else 0.0,
+        "throughput_rps": round(len(samples) / elapsed, 2) if elapsed else 0.0,
+        "latency_ms": {
+            "mean": round(sum(latencies) / len(latencies), 2) if latencies else 0.0,
+            "p50": round(percentile(latencies, 50), 2),
+            "p95": round(percentile(latencies, 95), 2),
+            "p99": round(percentile(latencies, 99), 2),
+            "max": round(latencies[-1], 2) if latencies else 0.0,
+        },
+        "status": status_counts,
+    }
+
+
+async def drive_load(
+    base_url: str,
+    routes: List[str],
+    concurrency: int,
+    duration: float,
+    warmup: float,
+    users: List[str],
+    jobs: List[str],
+    refresh_ratio: float,
+    seed: int = 1,
+) -> Dict:
+    """Closed-loop load: `concurrency` workers each send the next request as soon as the last one finishes."""
+    samples: Dict[str, List[Dict]] = {route: [] for route in routes}
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(base_url=base_url, timeout=120, limits=limits) as client:
+        started = time.perf_counter()
+        measure_from = started + warmup
+        deadline = measure_from + duration
+
+        async def worker(index: int) -> None:
+            rng = random.Random(seed * 1000 + index)
+            turn = index
+            while time.perf_counter() < deadline:
+                route = routes[turn % len(routes)]
+                turn += 1
+                request = build_request(route, rng, users, jobs, refresh_ratio)
+                sent = time.perf_counter()
+                status, ok = 0, False
+                try:
+                    if route.endswith("_stream"):
+                        async with client.stream(request["method"], request["url"], params=request.get("params")) as response:
+                            status = response.status_code
+                            body = "".join([chunk async for chunk in response.aiter_text()])
+                            ok = status < 400 and "event: error" not in body
+                    else:
+                        response = await client.request(
+                            request["method"], request["url"], params=request.get("params"), data=request.get("data")
+                        )
+                        status = response.status_code
+                        ok = status < 400
+                except httpx.HTTPError as e:
+                    status = type(e).__name__
+                finished = time.perf_counter()
+                if sent >= measure_from and finished <= deadline:
+                    samples[route].append({"ms": (finished - sent) * 1000, "status": status, "ok": ok})
+
+        await asyncio.gather(*(worker(i) for i in range(concurrency)))
+
+    elapsed = duration
+    all_samples = [s for route_samples in samples.values() for s in route_samples]
+    return {
+        "routes": {route: summarize(route_samples, elapsed) for route, route_samples in samples.items()},
+        "overall": summarize(all_samples, elapsed),
+    }
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def wait_until_ready(url: str, process: Optional[subprocess.Popen], timeout: float = 120) -> None:
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient(timeout=2) as client:
+        while time.monotonic() < deadline:
+            if process is not None and process.poll() is not None:
+                raise RuntimeError(f"{url} exited with code {process.returncode} during startup")
+            try:
+                if (await client.get(url)).status_code < 500:
+                    return
+            except httpx.HTTPError:
+                pass
+            await asyncio.sleep(0.25)
+    raise RuntimeError(f"{url} not ready after {timeout:.0f}s")
+
+
+def start_stack(args, workdir: str) -> List[subprocess.Popen]:
+    """Fake Gemini + the app (in-memory or given Mongo), each in its own process."""
+    gemini = subprocess.Popen(
+        [
+            sys.executable, "-m", "benchmarks.fake_gemini",
+            "--port", str(args.gemini_port),
+            "--latency-ms", str(args.gemini_latency_ms),
+            "--jitter-ms", str(args.gemini_jitter_ms),
+            "--embed-latency-ms", str(args.embed_latency_ms),
+            "--stream-chunks", str(args.stream_chunks),
+            "--chunk-delay-ms", str(args.chunk_delay_ms),
+            "--error-rate", str(args.gemini_error_rate),
+        ],
+        cwd=BACKEND_DIR,
+    )
+    env = {
+        **os.environ,
+        "GEMINI_API_BASE": f"http://127.0.0.1:{args.gemini_port}",
+        "GEMINI_API_KEY": "benchmark",
+        "CHROMA_PERSIST_DIR": os.path.join(workdir, "chroma"),
+        "RESUME_TEXT_CACHE_DIR": os.path.join(workdir, "resume_text"),
+        "UPLOAD_DIR": os.path.join(workdir, "uploads"),
+        "EMBEDDING_CACHE_PATH": "",
+    }
+    command = [
+        sys.executable, "-m", "benchmarks.serve",
+        "--port", str(args.port),
+        "--users", str(args.users),
+        "--jobs", str(args.jobs),
+        "--mongo-latency-ms", str(args.mongo_latency_ms),
+    ]
+    if args.mongo_uri:
+        command += ["--mongo-uri", args.mongo_uri]
+    app = subprocess.Popen(command, cwd=BACKEND_DIR, env=env)
+    return [gemini, app]
+
+
+def compare(old_path: str, new_path: str) -> None:
+    """Print per-route p50/p95/p99 and throughput deltas between two result files."""
+    with open(old_path) as f:
+        old = json.load(f)
+    with open(new_path) as f:
+        new = json.load(f)
+    print(f"{'route':<22}{'metric':<16}{old['meta'].get('commit') or 'old':>12}{new['meta'].get('commit') or 'new':>12}{'change':>10}")
+    for route in list(new["routes"]) + ["overall"]:
+        a = old["overall"] if route == "overall" else old["routes"].get(route)
+        b = new["overall"] if route == "overall" else new["routes"].get(route)
+        if not a or not b:
+            continue
+        rows = [(f"{p} ms", a["latency_ms"][p], b["latency_ms"][p]) for p in ("p50", "p95", "p99")]
+        rows += [("rps", a["throughput_rps"], b["throughput_rps"]), ("error_rate", a["error_rate"], b["error_rate"])]
+        for metric, before, after in rows:
+            change = f"{(after - before) / before * 100:+.1f}%" if before else "n/a"
+            print(f"{route:<22}{metric:<16}{before:>12}{after:>12}{change:>10}")
+
+
+def main() -> None:
+    # python -m benchmarks.load_test --duration 30 --concurrency 16
+    # python -m benchmarks.load_test --compare results/a.json results/b.json
+    parser = argparse.ArgumentParser(description="Load test the GenAI routes against local Gemini / Mongo stand-ins")
+    parser.add_argument("--routes", default="chat,jd_match,cover_letter,resume_tips", help=f"Comma-separated subset of {', '.join(ROUTES)}")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=30, help="Measured seconds")
+    parser.add_argument("--warmup", type=float, default=5, help="Unmeasured seconds before measuring")
+    parser.add_argument("--refresh-ratio", type=float, default=0.5, help="Share of requests that bypass the result cache")
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--jobs", type=int, default=100)
+    parser.add_argument("--port", type=int, default=8800)
+    parser.add_argument("--gemini-port", type=int, default=8765)
+    parser.add_argument("--gemini-latency-ms", type=float, default=400)
+    parser.add_argument("--gemini-jitter-ms", type=float, default=100)
+    parser.add_argument("--embed-latency-ms", type=float, default=60)
+    parser.add_argument("--stream-chunks", type=int, default=8)
+    parser.add_argument("--chunk-delay-ms", type=float, default=40)
+    parser.add_argument("--gemini-error-rate", type=float, default=0.0)
+    parser.add_argument("--mongo-latency-ms", type=float, default=1.0)
+    parser.add_argument("--mongo-uri", default="", help="Use (and wipe) a real, disposable Mongo instead of the in-memory stand-in")
+    parser.add_argument("--base-url", default="", help="Load an already running server instead of starting the stack")
+    parser.add_argument("--output", default="", help="Result file (default: benchmarks/results/<time>-<commit>.json)")
+    parser.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"), help="Compare two result files and exit")
+    args = parser.parse_args()
+
+    if args.compare:
+        compare(*args.compare)
+        return
+
+    routes = [route.strip() for route in args.routes.split(",") if route.strip()]
+    unknown = set(routes) - set(ROUTES)
+    if unknown:
+        parser.error(f"unknown routes: {', '.join(sorted(unknown))}")
+
+    base_url = args.base_url or f"http://127.0.0.1:{args.port}"
+    processes: List[subprocess.Popen] = []
+    with tempfile.TemporaryDirectory(prefix="genai-bench-") as workdir:
+        try:
+            if not args.base_url:
+                processes = start_stack(args, workdir)
+                asyncio.run(wait_until_ready(f"{base_url}/api/info", processes[1]))
+            print(f"🚀 {args.concurrency} workers on {routes} for {args.warmup:.0f}s warm-up + {args.duration:.0f}s")
+            results = asyncio.run(drive_load(
+                base_url, routes, args.concurrency, args.duration, args.warmup,
+                user_ids(args.users), job_ids(args.jobs), args.refresh_ratio,
+            ))
+        finally:
+            for process in processes:
+                process.terminate()
+            for process in processes:
+                try:
+                    process.wait(timeout=15)
+                except subprocess.TimeoutExpired:
+                    process.kill()
+
+    commit = git_commit()
+    report = {
+        "meta": {
+            "commit": commit,
+            "timestamp": datetime.utcnow().isoformat() + "Z",
+            "config": {k: v for k, v in vars(args).items() if k not in ("compare", "output")},
+        },
+        **results,
+    }
+    output = args.output or os.path.join(
+        RESULTS_DIR, f"{datetime.utcnow():%Y%m%dT%H%M%S}-{commit or 'nocommit'}.json"
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+
+    for route, stats in results["routes"].items():
+        latency = stats["latency_ms"]
+        print(
+            f"{route:<20} n={stats['requests']:<6} rps={stats['throughput_rps']:<8} "
+            f"p50={latency['p50']}ms p95={latency['p95']}ms p99={latency['p99']}ms errors={stats['error_rate']:.2%}"
+        )
+    print(f"📄 Results written to {output}")
+
+
+if __name__ == "__main__":
+    main()
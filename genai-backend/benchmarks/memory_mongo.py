@@ -0,0 +1,234 @@
+# benchmarks/memory_mongo.py
+
+import copy
+import asyncio
+from types import SimpleNamespace
+from typing import Any, Dict, List, Optional
+
+from bson import ObjectId
+
+# Simulated round trip per Mongo call, so the stand-in is not unrealistically free
+MONGO_LATENCY_SECONDS = 0.0
+
+
+def _get_path(doc: Dict, path: str):
+    value = doc
+    for part in path.split("."):
+        if not isinstance(value, dict) or part not in value:
+            return None
+        value = value[part]
+    return value
+
+
+def _matches_condition(value, condition) -> bool:
+    if isinstance(condition, dict) and condition and all(k.startswith("$") for k in condition):
+        for op, arg in condition.items():
+            if op == "$in" and value not in arg:
+                return False
+            if op == "$nin" and value in arg:
+                return False
+            if op == "$ne" and value == arg:
+                return False
+            if op in ("$gt", "$gte", "$lt", "$lte"):
+                if value is None:
+                    return False
+                if op == "$gt" and not value > arg:
+                    return False
+                if op == "$gte" and not value >= arg:
+                    return False
+                if op == "$lt" and not value < arg:
+                    return False
+                if op == "$lte" and not value <= arg:
+                    return False
+            if op == "$exists" and (value is not None) != bool(arg):
+                return False
+            if op == "$type" and arg == "binData" and not isinstance(value, (bytes, bytearray)):
+                return False
+        return True
+    return value == condition
+
+
+def matches(doc: Dict, query: Optional[Dict]) -> bool:
+    return all(_matches_condition(_get_path(doc, key), cond) for key, cond in (query or {}).items())
+
+
+def project(doc: Dict, projection: Optional[Dict]) -> Dict:
+    if not projection:
+        return copy.deepcopy(doc)
+    included = [key for key, flag in projection.items() if flag]
+    if not included:
+        excluded = {key for key, flag in projection.items() if not flag}
+        return {k: copy.deepcopy(v) for k, v in doc.items() if k not in excluded}
+    result: Dict[str, Any] = {"_id": doc.get("_id")} if projection.get("_id", 1) else {}
+    for key in included:
+        value = _get_path(doc, key)
+        if value is None:
+            continue
+        target = result
+        parts = key.split(".")
+        for part in parts[:-1]:
+            target = target.setdefault(part, {})
+        target[parts[-1]] = copy.deepcopy(value)
+    return result
+
+
+async def _roundtrip() -> None:
+    await asyncio.sleep(MONGO_LATENCY_SECONDS)
+
+
+class MemoryCursor:
+    def __init__(self, docs: List[Dict]):
+        self._docs = docs
+        self._limit = 0
+
+    def sort(self, key, direction: int = 1):
+        keys = key if isinstance(key, list) else [(key, direction)]
+        for field, order in reversed(keys):
+            self._docs.sort(key=lambda d: (_get_path(d, field) is None, _get_path(d, field)), reverse=order < 0)
+        return self
+
+    def limit(self, count: int):
+        self._limit = count
+        return self
+
+    def _results(self) -> List[Dict]:
+        return self._docs[:self._limit] if self._limit else self._docs
+
+    async def to_list(self, length: Optional[int] = None) -> List[Dict]:
+        await _roundtrip()
+        docs = self._results()
+        return docs[:length] if length else docs
+
+    def __aiter__(self):
+        return self._iterate()
+
+    async def _iterate(self):
+        await _roundtrip()
+        for doc in self._results():
+            yield doc
+
+
+class MemoryCollection:
+    """The subset of Motor's collection API the app uses, over a list of dicts."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.docs: Dict[Any, Dict] = {}
+
+    def find(self, query: Optional[Dict] = None, projection: Optional[Dict] = None, **kwargs) -> MemoryCursor:
+        return MemoryCursor([project(doc, projection) for doc in self.docs.values() if matches(doc, query)])
+
+    async def find_one(self, query: Optional[Dict] = None, projection: Optional[Dict] = None, **kwargs):
+        await _roundtrip()
+        for doc in self.docs.values():
+            if matches(doc, query):
+                return project(doc, projection)
+        return None
+
+    async def insert_one(self, doc: Dict):
+        await _roundtrip()
+        doc.setdefault("_id", ObjectId())
+        self.docs[doc["_id"]] = copy.deepcopy(doc)
+        return SimpleNamespace(inserted_id=doc["_id"])
+
+    async def insert_many(self, docs: List[Dict], ordered: bool = True):
+        await _roundtrip()
+        for doc in docs:
+            doc.setdefault("_id", ObjectId())
+            self.docs[doc["_id"]] = copy.deepcopy(doc)
+        return SimpleNamespace(inserted_ids=[doc["_id"] for doc in docs])
+
+    async def replace_one(self, query: Dict, doc: Dict, upsert: bool = False):
+        await _roundtrip()
+        existing = next((d for d in self.docs.values() if matches(d, query)), None)
+        if existing is None and not upsert:
+            return SimpleNamespace(matched_count=0)
+        key = existing["_id"] if existing else doc.get("_id", query.get("_id", ObjectId()))
+        self.docs[key] = {**copy.deepcopy(doc), "_id": key}
+        return SimpleNamespace(matched_count=1 if existing else 0)
+
+    async def update_one(self, query: Dict, update: Dict, upsert: bool = False):
+        await _roundtrip()
+        existing = next((d for d in self.docs.values() if matches(d, query)), None)
+        if existing is None:
+            if not upsert:
+                return SimpleNamespace(matched_count=0)
+            existing = {"_id": query.get("_id", ObjectId())}
+            self.docs[existing["_id"]] = existing
+        existing.update(copy.deepcopy(update.get("$set", {})))
+        for key in update.get("$unset", {}):
+            existing.pop(key, None)
+        return SimpleNamespace(matched_count=1)
+
+    async def delete_one(self, query: Dict):
+        await _roundtrip()
+        for key, doc in list(self.docs.items()):
+            if matches(doc, query):
+                del self.docs[key]
+                return SimpleNamespace(deleted_count=1)
+        return SimpleNamespace(deleted_count=0)
+
+    async def delete_many(self, query: Dict):
+        await _roundtrip()
+        keys = [key for key, doc in self.docs.items() if matches(doc, query)]
+        for key in keys:
+            del self.docs[key]
+        return SimpleNamespace(deleted_count=len(keys))
+
+    async def create_index(self, *args, **kwargs):
+        return "index"
+
+
+class MemoryDatabase:
+    def __init__(self, name: str):
+        self.name = name
+        self._collections: Dict[str, MemoryCollection] = {}
+
+    def __getitem__(self, name: str) -> MemoryCollection:
+        if name not in self._collections:
+            self._collections[name] = MemoryCollection(name)
+        return self._collections[name]
+
+    def __getattr__(self, name: str) -> MemoryCollection:
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return self[name]
+
+    async def command(self, name: str, *args, **kwargs):
+        await _roundtrip()
+        return {"ok": 1.0}
+
+
+class MemoryClient:
+    def __init__(self):
+        self._databases: Dict[str, MemoryDatabase] = {}
+
+    def __getitem__(self, name: str) -> MemoryDatabase:
+        if name not in self._databases:
+            self._databases[name] = MemoryDatabase(name)
+        return self._databases[name]
+
+    def close(self) -> None:
+        pass
+
+
+def install(latency_seconds: float = 0.0) -> MemoryClient:
+    """
+    Point db.mongo at an in-memory client. Must run before anything imports
+    db.mongo's collections (i.e. before importing main).
+    """
+    global MONGO_LATENCY_SECONDS
+    MONGO_LATENCY_SECONDS = latency_seconds
+
+    import db.mongo as mongo
+
+    client = MemoryClient()
+    mongo.client = client
+    mongo.db = client[mongo.GENAI_DB_NAME]
+    mongo.portal_db = client[mongo.PORTAL_DB_NAME]
+    mongo.chat_collection = mongo.db.chat_history
+    mongo.interview_collection = mongo.db.interview_questions
+    mongo.resume_collection = mongo.db.resumes
+    mongo.jd_collection = mongo.db.job_descriptions
+    mongo.user_collection = mongo.db.users
+    return client
@@ -0,0 +1,115 @@
+# benchmarks/seed.py
+
+import random
+from datetime import datetime, timedelta
+from typing import List
+
+from bson import ObjectId
+
+SKILLS = [
+    "Python", "JavaScript", "React.js", "Node.js", "MongoDB", "Docker", "Kubernetes", "AWS",
+    "Terraform", "Jenkins", "SQL", "FastAPI", "Java", "Spring Boot", "Go", "Linux",
+    "Machine Learning", "Pandas", "TensorFlow", "CI/CD", "Git", "Azure", "GraphQL", "Redis",
+]
+ROLES = [
+    "Backend Developer", "Full Stack Developer", "DevOps Engineer", "Data Scientist",
+    "Frontend Developer", "Cloud Engineer", "ML Engineer", "Site Reliability Engineer",
+]
+COMPANIES = ["Acme Corp", "Globex", "Initech", "Umbrella", "Hooli", "Stark Industries", "Wayne Tech"]
+CITIES = ["Pune", "Bengaluru", "Mumbai", "Hyderabad", "Remote"]
+
+
+def user_ids(count: int) -> List[str]:
+    return ["%024x" % (0x100000 + i) for i in range(count)]
+
+
+def job_ids(count: int) -> List[str]:
+    return ["%024x" % (0x200000 + i) for i in range(count)]
+
+
+def _pdf_escape(line: str) -> str:
+    return line.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def make_pdf(lines: List[str]) -> bytes:
+    """Smallest valid single-page PDF with the given lines of text (PyPDF2 can extract it)."""
+    text_ops = "\n".join(f"({_pdf_escape(line)}) Tj T*" for line in lines)
+    stream = f"BT /F1 10 Tf 12 TL 40 800 Td\n{text_ops}\nET".encode("latin-1", "replace")
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+        b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 842] /Contents 4 0 R /Resources << /Font << /F1 5 0 R >> >> >>",
+        b"<< /Length " + str(len(stream)).encode() + b" >>\nstream\n" + stream + b"\nendstream",
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += f"{number} 0 obj\n".encode() + body + b"\nendobj\n"
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    out += b"".join(f"{offset:010d} 00000 n \n".encode() for offset in offsets)
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode()
+    return bytes(out)
+
+
+def resume_lines(rng: random.Random, index: int) -> List[str]:
+    skills = rng.sample(SKILLS, 8)
+    role = rng.choice(ROLES)
+    lines = [
+        f"Candidate {index}",
+        f"Email: candidate{index}@example.com | Phone: +91 90000{index:05d}",
+        "Professional Summary",
+        f"{role} with {rng.randint(1, 8)} years of experience building and shipping production systems.",
+        "Skills",
+        "- " + ", ".join(skills),
+        "Experience",
+    ]
+    for job in range(rng.randint(2, 4)):
+        lines.append(f"{rng.choice(ROLES)} | {rng.choice(COMPANIES)} 20{15 + job} - 20{16 + job}")
+        for _ in range(3):
+            lines.append(f"- Improved {rng.choice(skills)} services, cutting latency by {rng.randint(10, 60)}% for {rng.randint(2, 50)}k users.")
+    lines += ["Education", "B.E. Computer Engineering, University of Pune", "Projects"]
+    for _ in range(2):
+        lines.append(f"- Built a {rng.choice(skills)} and {rng.choice(skills)} project used by {rng.randint(1, 20)} teams.")
+    return lines
+
+
+def job_document(rng: random.Random, job_id: str, now: datetime) -> dict:
+    skills = rng.sample(SKILLS, 6)
+    title = rng.choice(ROLES)
+    description = (
+        f"About Us\n{rng.choice(COMPANIES)} builds software for millions of users.\n"
+        f"Responsibilities\n- Design and run {skills[0]} and {skills[1]} services\n- Own CI/CD and observability\n"
+        f"Requirements\n- {rng.randint(1, 6)}+ years with {', '.join(skills[2:])}\n"
+        "Benefits\n- Health insurance, learning budget, flexible hours"
+    )
+    return {
+        "_id": ObjectId(job_id),
+        "title": title,
+        "company": rng.choice(COMPANIES),
+        "location": rng.choice(CITIES),
+        "description": description,
+        "requirements": skills,
+        "keywords": skills,
+        "updatedAt": now - timedelta(minutes=rng.randint(0, 10000)),
+    }
+
+
+async def seed_portal(portal_db, users: int, jobs: int, seed: int = 7) -> dict:
+    """Insert synthetic students with PDF resumes and job postings."""
+    rng = random.Random(seed)
+    now = datetime.utcnow()
+    await portal_db["users"].insert_many([
+        {
+            "_id": ObjectId(user_id),
+            "fullname": f"Candidate {index}",
+            "role": "student",
+            "profile": {"resume": make_pdf(resume_lines(rng, index))},
+            "updatedAt": now,
+        }
+        for index, user_id in enumerate(user_ids(users))
+    ])
+    await portal_db["jobs"].insert_many([job_document(rng, job_id, now) for job_id in job_ids(jobs)])
+    return {"users": users, "jobs": jobs}
@@ -0,0 +1,55 @@
+# benchmarks/serve.py
+
+import os
+import argparse
+import logging
+
+import uvicorn
+
+
+def main() -> None:
+    """
+    Run the app for a benchmark: in-memory Mongo stand-in (unless --mongo-uri
+    points at a real, disposable database), seeded with synthetic data.
+    GEMINI_API_BASE etc. come from the environment set by load_test.
+    """
+    # python -m benchmarks.serve --port 8800 --users 200 --jobs 100
+    parser = argparse.ArgumentParser(description="Serve the app against local stand-ins")
+    parser.add_argument("--port", type=int, default=8800)
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--jobs", type=int, default=100)
+    parser.add_argument("--mongo-uri", default="", help="Seed and use a real Mongo instead of the in-memory stand-in")
+    parser.add_argument("--mongo-latency-ms", type=float, default=1.0, help="Simulated round trip for the in-memory stand-in")
+    parser.add_argument("--log-level", default="warning")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+
+    if args.mongo_uri:
+        os.environ["MONGO_URI"] = args.mongo_uri
+    else:
+        from benchmarks import memory_mongo
+        memory_mongo.install(latency_seconds=args.mongo_latency_ms / 1000)
+
+    from db.mongo import portal_db
+    from benchmarks.seed import seed_portal
+
+    # Seed inside the server's own loop (Motor clients bind to the loop that first uses them)
+    import main as app_main
+
+    @app_main.app.on_event("startup")
+    async def seed_benchmark_data():
+        if args.mongo_uri:
+            # Disposable database only: start from a clean slate
+            await portal_db["users"].delete_many({})
+            await portal_db["jobs"].delete_many({})
+        print(f"🌱 Seeded {await seed_portal(portal_db, args.users, args.jobs)}", flush=True)
+
+    # Seeding has to run before the other startup hooks read the jobs
+    app_main.app.router.on_startup.insert(0, app_main.app.router.on_startup.pop())
+
+    uvicorn.run(app_main.app, host="127.0.0.1", port=args.port, log_level=args.log_level)
+
+
+if __name__ == "__main__":
+    main()
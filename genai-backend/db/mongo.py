@@ -1,15 +1,163 @@
 # db/mongo.py
 import motor.motor_asyncio
 import os
+import time
+import logging
+import threading
+from collections import deque
 from dotenv import load_dotenv
 from datetime import datetime
+from pymongo import monitoring
 
 load_dotenv()
+logger = logging.getLogger(__name__)
 
 MONGO_URI = os.getenv("MONGO_URI")
-client = motor.motor_asyncio.AsyncIOMotorClient(MONGO_URI)
 
-db = client.genai_db
+# ⚙️ Connection pool settings (per process — total connections = uvicorn workers × max pool size)
+MONGO_MIN_POOL_SIZE = int(os.getenv("MONGO_MIN_POOL_SIZE", "0"))
+MONGO_MAX_POOL_SIZE = int(os.getenv("MONGO_MAX_POOL_SIZE", "20"))
+MONGO_MAX_IDLE_TIME_MS = int(os.getenv("MONGO_MAX_IDLE_TIME_MS", "300000"))
+MONGO_WAIT_QUEUE_TIMEOUT_MS = int(os.getenv("MONGO_WAIT_QUEUE_TIMEOUT_MS", "5000"))
+MONGO_CONNECT_TIMEOUT_MS = int(os.getenv("MONGO_CONNECT_TIMEOUT_MS", "10000"))
+MONGO_SERVER_SELECTION_TIMEOUT_MS = int(os.getenv("MONGO_SERVER_SELECTION_TIMEOUT_MS", "10000"))
+MONGO_SOCKET_TIMEOUT_MS = int(os.getenv("MONGO_SOCKET_TIMEOUT_MS", "30000"))
+MONGO_READ_PREFERENCE = os.getenv("MONGO_READ_PREFERENCE", "primary")
+MONGO_APP_NAME = os.getenv("MONGO_APP_NAME", "genai-backend")
+
+GENAI_DB_NAME = os.getenv("MONGO_GENAI_DB", "genai_db")
+PORTAL_DB_NAME = os.getenv("MONGO_PORTAL_DB", "jobportal")
+
+
+class PoolMetrics(monitoring.ConnectionPoolListener):
+    """
+    Connection pool listener: tracks connections in use vs. open, and how long
+    operations wait to check a connection out. Callbacks run on driver threads.
+    """
+
+    def __init__(self, max_pool_size: int, window: int = 1000):
+        self.max_pool_size = max_pool_size
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._waits_ms = deque(maxlen=window)
+        self.open = 0
+        self.in_use = 0
+        self.peak_in_use = 0
+        self.checkouts = 0
+        self.checkout_failures = 0
+        self.pool_clears = 0
+
+    def connection_check_out_started(self, event):
+        self._local.started = time.perf_counter()
+
+    def connection_checked_out(self, event):
+        duration = getattr(event, "duration", None)
+        if duration is None:
+            started = getattr(self._local, "started", None)
+            duration = time.perf_counter() - started if started else 0.0
+        with self._lock:
+            self.checkouts += 1
+            self.in_use += 1
+            self.peak_in_use = max(self.peak_in_use, self.in_use)
+            self._waits_ms.append(duration * 1000)
+
+    def connection_check_out_failed(self, event):
+        with self._lock:
+            self.checkout_failures += 1
+
+    def connection_checked_in(self, event):
+        with self._lock:
+            self.in_use = max(0, self.in_use - 1)
+
+    def connection_created(self, event):
+        with self._lock:
+            self.open += 1
+
+    def connection_closed(self, event):
+        with self._lock:
+            self.open = max(0, self.open - 1)
+
+    def pool_cleared(self, event):
+        with self._lock:
+            self.pool_clears += 1
+
+    def pool_created(self, event):
+        pass
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_ready(self, event):
+        pass
+
+    def stats(self) -> dict:
+        with self._lock:
+            waits = sorted(self._waits_ms)
+            in_use, open_, peak = self.in_use, self.open, self.peak_in_use
+            checkouts, failures, clears = self.checkouts, self.checkout_failures, self.pool_clears
+
+        def pct(p):
+            return round(waits[min(len(waits) - 1, int(p * len(waits)))], 3) if waits else 0.0
+
+        return {
+            "max_pool_size": self.max_pool_size,
+            "min_pool_size": MONGO_MIN_POOL_SIZE,
+            "read_preference": MONGO_READ_PREFERENCE,
+            "connections_open": open_,
+            "connections_in_use": in_use,
+            "peak_in_use": peak,
+            "utilization": round(in_use / self.max_pool_size, 3) if self.max_pool_size else None,
+            "checkouts": checkouts,
+            "checkout_failures": failures,
+            "pool_clears": clears,
+            "checkout_wait_ms": {
+                "avg": round(sum(waits) / len(waits), 3) if waits else 0.0,
+                "p50": pct(0.50),
+                "p95": pct(0.95),
+                "p99": pct(0.99),
+                "max": round(waits[-1], 3) if waits else 0.0,
+            },
+        }
+
+
+pool_metrics = PoolMetrics(MONGO_MAX_POOL_SIZE)
+
+# ✅ The one Mongo client for the process (both databases share its pool).
+# Motor connects lazily, so nothing touches the network until startup pings it.
+client = motor.motor_asyncio.AsyncIOMotorClient(
+    MONGO_URI,
+    minPoolSize=MONGO_MIN_POOL_SIZE,
+    maxPoolSize=MONGO_MAX_POOL_SIZE,
+    maxIdleTimeMS=MONGO_MAX_IDLE_TIME_MS,
+    waitQueueTimeoutMS=MONGO_WAIT_QUEUE_TIMEOUT_MS,
+    connectTimeoutMS=MONGO_CONNECT_TIMEOUT_MS,
+    serverSelectionTimeoutMS=MONGO_SERVER_SELECTION_TIMEOUT_MS,
+    socketTimeoutMS=MONGO_SOCKET_TIMEOUT_MS,
+    readPreference=MONGO_READ_PREFERENCE,
+    appname=MONGO_APP_NAME,
+    event_listeners=[pool_metrics],
+)
+
+db = client[GENAI_DB_NAME]
+portal_db = client[PORTAL_DB_NAME]
+
+
+async def connect_mongo() -> None:
+    """Open the pool and verify the server (called from the app startup hook)."""
+    await db.command("ping")
+    workers = os.getenv("WEB_CONCURRENCY")
+    logger.info(
+        f"🍃 MongoDB pool ready: min={MONGO_MIN_POOL_SIZE} max={MONGO_MAX_POOL_SIZE} "
+        f"read_preference={MONGO_READ_PREFERENCE}"
+        + (f" (up to {int(workers) * MONGO_MAX_POOL_SIZE} connections across {workers} workers)" if workers and workers.isdigit() else "")
+    )
+
+
+def close_mongo() -> None:
+    """Close every pooled connection (called from the app shutdown hook)."""
+    client.close()
+    logger.info("🛑 MongoDB client closed.")
+
 
 async def save_chat_to_db(
     user_id: str, 
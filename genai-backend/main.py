@@ -1,21 +1,41 @@
-from fastapi import FastAPI, HTTPException
+import time
+_import_started = time.perf_counter()  # Cold-start clock for the startup report
+
+from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse
 from dotenv import load_dotenv
 from routers import cover_letter_api
 from routers.jd_match_api import router as resume_match_api_router  
 from routers import resume_tips_api
-from db.mongo import db
+from db.mongo import db, connect_mongo, close_mongo, pool_metrics
 from pymongo.errors import ConnectionFailure
 import logging
 from routers.agent_bot_router import router as chatbot_router
+from utils.text_cache import resume_text_cache
+from utils.cpu_pool import cpu_pool, CPUPoolSaturatedError
+from services.llm_gateway import close_http_client
+from services.embedding_service import embedding_cache, embedding_function
+from services.job_index import job_keyword_index
+from services import job_vectors
+from services.result_cache import result_cache
+from services.intent_classifier import intent_classifier
+from services.upload_store import evict_uploads
+from services.chat_history import chat_history
+from utils.prompt_compactor import compaction_stats
+from utils.metrics import registry, Gauge, render_metrics
+from utils.memory_controller import memory_controller
+from utils.request_middleware import RequestMiddleware
+from services.conversation_memory import conversation_memory
+from services.warmup import startup_report, WARMUP_ON_STARTUP
 from datetime import datetime
-import gc
 import asyncio
 
 # Load environment variables from .env file
 load_dotenv()
 
+startup_report.record_imports(time.perf_counter() - _import_started)
+
 # Setup logger
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -42,6 +62,9 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# ✅ Request logging, timing and preflight debugging in one pure ASGI layer (outermost)
+app.add_middleware(RequestMiddleware)
+
 # ============== EXCEPTION HANDLERS ==============
 
 @app.exception_handler(HTTPException)
@@ -58,6 +81,21 @@ async def http_exception_handler(request, exc):
         }
     )
 
+@app.exception_handler(CPUPoolSaturatedError)
+async def cpu_pool_saturated_handler(request, exc):
+    """Reject work when the CPU pool queue is full instead of queueing without bound"""
+    logger.warning(f"🚦 CPU pool saturated for {request.url.path}")
+    return JSONResponse(
+        status_code=503,
+        headers={"Retry-After": "2"},
+        content={
+            "success": False,
+            "error": "Server busy",
+            "message": str(exc),
+            "timestamp": datetime.now().isoformat()
+        }
+    )
+
 @app.exception_handler(Exception)
 async def general_exception_handler(request, exc):
     """Handle unexpected exceptions"""
@@ -77,11 +115,57 @@ async def general_exception_handler(request, exc):
 @app.on_event("startup")
 async def check_mongodb_connection():
     try:
-        await db.command("ping")
+        await connect_mongo()
         logger.info("✅ MongoDB connection successful.")
     except ConnectionFailure as e:
         logger.error(f"❌ MongoDB connection failed: {e}")
 
+@app.on_event("startup")
+async def tune_garbage_collector():
+    """Raise GC thresholds and freeze startup objects; collections then only run above the RSS watermark"""
+    memory_controller.start()
+
+@app.on_event("startup")
+async def start_cpu_pool():
+    """Start the process pool used for PDF parsing and resume scoring"""
+    cpu_pool.start()
+
+@app.on_event("shutdown")
+async def stop_cpu_pool():
+    """Let in-flight CPU tasks finish and stop the worker processes"""
+    await cpu_pool.shutdown()
+
+@app.on_event("shutdown")
+async def close_llm_gateway():
+    """Close pooled keep-alive connections to the Gemini API"""
+    await close_http_client()
+
+@app.on_event("startup")
+async def start_job_vector_sync():
+    """Keep the job embedding collection in sync with MongoDB in the background"""
+    job_vectors.start_sync_loop()
+
+@app.on_event("shutdown")
+async def stop_job_vector_sync():
+    """Stop the background job vector sync"""
+    await job_vectors.stop_sync_loop()
+
+@app.on_event("startup")
+async def create_result_cache_indexes():
+    """TTL index so cached LLM results expire on their own"""
+    await result_cache.ensure_indexes()
+
+@app.on_event("startup")
+async def start_chat_history_writer():
+    """Indexes for chat history, then start the write-behind flusher"""
+    await chat_history.ensure_indexes()
+    chat_history.start()
+
+@app.on_event("startup")
+async def evict_stale_uploads():
+    """Drop uploaded resumes past their retention age or the disk budget"""
+    await asyncio.to_thread(evict_uploads)
+
 @app.on_event("startup")
 async def startup_message():
     """Log startup information"""
@@ -89,6 +173,19 @@ async def startup_message():
     logger.info(f"📝 CORS origins configured for frontend access")
     logger.info(f"🔧 Service optimized for stability and performance")
 
+@app.on_event("startup")
+async def warm_up_connections():
+    """Optionally open Mongo/Gemini connections and load Chroma indexes before serving (runs last)"""
+    if WARMUP_ON_STARTUP:
+        await startup_report.warm_up()
+    startup_report.mark_ready(time.perf_counter() - _import_started)
+
+@app.on_event("shutdown")
+async def close_mongodb_connection():
+    """Flush queued chat turns, then close the shared MongoDB connection pool (runs last, after everything that uses it)"""
+    await chat_history.stop()
+    close_mongo()
+
 # ============== HEALTH CHECK ENDPOINTS ==============
 # These match your constants.js HEALTH endpoints
 
@@ -203,54 +300,6 @@ app.include_router(
     tags=["AI Chatbot"]
 )
 
-# ============== ENHANCED MIDDLEWARE ==============
-
-from fastapi import Request
-import time
-
-@app.middleware("http")
-async def log_requests(request: Request, call_next):
-    """Log all incoming requests for monitoring"""
-    start_time = time.time()
-    
-    # Log request with more details
-    logger.info(f"🌐 {request.method} {request.url.path} - Client: {request.client.host} - Origin: {request.headers.get('origin', 'N/A')}")
-    
-    # Process request
-    response = await call_next(request)
-    
-    # Log response
-    process_time = time.time() - start_time
-    logger.info(f"✅ {request.method} {request.url.path} - Status: {response.status_code} - Time: {process_time:.3f}s")
-    
-    # Add processing time to response headers
-    response.headers["X-Process-Time"] = str(process_time)
-    
-    return response
-
-@app.middleware("http")
-async def memory_cleanup_middleware(request: Request, call_next):
-    """Clean up memory after heavy AI operations to prevent crashes"""
-    response = await call_next(request)
-    
-    # Force garbage collection after AI-heavy requests
-    ai_heavy_paths = ["/chat", "/genai/cover-letter/", "/genai/jd-match/", "/genai/resume-tips/"]
-    if any(path in request.url.path for path in ai_heavy_paths):
-        gc.collect()  # Force garbage collection to free memory
-        logger.debug(f"🧹 Memory cleanup performed for {request.url.path}")
-    
-    return response
-
-@app.middleware("http")
-async def cors_debug_middleware(request: Request, call_next):
-    """Debug CORS requests"""
-    if request.method == "OPTIONS":
-        origin = request.headers.get("origin")
-        logger.info(f"🔍 CORS preflight request from origin: {origin}")
-    
-    response = await call_next(request)
-    return response
-
 # ============== UTILITY ENDPOINTS ==============
 
 @app.get("/api/info", tags=["System"])
@@ -327,6 +376,54 @@ async def system_status():
             "request_logging": "enabled",
             "error_handling": "comprehensive"
         },
+        "caches": {
+            "resume_text": resume_text_cache.stats(),
+            "embeddings": embedding_cache.stats(),
+            "llm_results": result_cache.stats()
+        },
+        "embedding_provider": embedding_function.stats(),
+        "cpu_pool": cpu_pool.stats(),
+        "job_index": job_keyword_index.stats(),
+        "chat_intents": intent_classifier.stats(),
+        "chat_history": chat_history.stats(),
+        "memory": memory_controller.stats(),
+        "chat_memory": conversation_memory.stats(),
+        "prompt_compaction": compaction_stats.stats(),
+        "startup": startup_report.stats(),
+        "mongo_pool": pool_metrics.stats(),
+        "timestamp": datetime.now().isoformat()
+    }
+
+# 📈 Pool and queue levels, sampled on every scrape
+runtime_gauges = registry.register(Gauge("genai_runtime", "Connection pool, CPU pool and write-behind queue levels", ("component", "metric")))
+
+def _collect_runtime_gauges():
+    pool = pool_metrics.stats()
+    runtime_gauges.set(("mongo_pool", "connections_in_use"), pool["connections_in_use"])
+    runtime_gauges.set(("mongo_pool", "connections_open"), pool["connections_open"])
+    runtime_gauges.set(("mongo_pool", "checkout_failures"), pool["checkout_failures"])
+    cpu = cpu_pool.stats()
+    runtime_gauges.set(("cpu_pool", "in_flight"), cpu["in_flight"])
+    runtime_gauges.set(("cpu_pool", "rejected"), cpu["rejected"])
+    memory = memory_controller.stats()
+    runtime_gauges.set(("process", "rss_mb"), memory["rss_mb"])
+    runtime_gauges.set(("process", "watermark_collections"), memory["watermark_collections"])
+    history = chat_history.stats()
+    runtime_gauges.set(("chat_history", "pending"), history["pending"])
+    runtime_gauges.set(("chat_history", "dropped"), history["dropped"])
+
+registry.add_collector(_collect_runtime_gauges)
+
+@app.get("/metrics", tags=["System"], include_in_schema=False)
+async def metrics():
+    """Prometheus scrape endpoint: per-stage latency histograms, LLM token and cache counters, in-flight gauges"""
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+@app.get("/status/mongo", tags=["System"])
+async def mongo_pool_status():
+    """MongoDB connection pool utilization and checkout wait times (this worker process)"""
+    return {
+        "pool": pool_metrics.stats(),
         "timestamp": datetime.now().isoformat()
     }
 
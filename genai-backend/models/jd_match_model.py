@@ -0,0 +1,9 @@
+# models/jd_match_model.py
+from pydantic import BaseModel
+from typing import List
+
+class BatchMatchRequest(BaseModel):
+    user_id: str
+    job_ids: List[str]
+    refresh: bool = False
+    stream: bool = False
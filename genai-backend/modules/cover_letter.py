@@ -1,89 +1,102 @@
-import uuid
-import os
-import google.generativeai as genai
-from services.data_service import get_resume_binary_by_user_id, get_job_by_id
-from services.embedding_service import get_embedding
-from services.chroma_service import store_embeddings
-from utils.pdf_parser import extract_text_from_pdf
-
-# Configure Gemini API
-genai.configure(api_key=os.getenv("GEMINI_API_KEY"))
-
-async def generate_cover_letter_from_mongo(user_id: str, job_id: str) -> str:
-    # Fetch resume PDF bytes from MongoDB
-    resume_pdf_bytes = await get_resume_binary_by_user_id(user_id)
+import asyncio
+from typing import AsyncIterator, Optional
+from services.data_loader import DataLoader
+from services.embedding_service import aget_embedding, aembedding_space
+from services.chroma_service import store_embeddings, missing_ids, content_id, embedding_collection
+from services.llm_gateway import generate_text, stream_text, DEFAULT_MODEL
+from services.result_cache import cached_result, store_result, prompt_version, result_key, text_hash
+from utils.pdf_parser import extract_text_async, pdf_content_hash
+from utils.prompt_compactor import compact_inputs, compaction_signature
+
+COVER_LETTER_PROMPT = """
+    Write a professional cover letter for the following job description:
+    {job_text}
+
+    Based on this resume:
+    {resume_text}
+
+    Cover letter:
+    """
+COVER_LETTER_PARAMS = {"temperature": 0.7, "max_output_tokens": 500}
+PROMPT_VERSION = prompt_version(
+    COVER_LETTER_PROMPT, DEFAULT_MODEL, compaction=compaction_signature("cover_letter"), **COVER_LETTER_PARAMS
+)
+
+async def prepare_cover_letter(
+    user_id: str, job_id: str, refresh: bool = False, loader: Optional[DataLoader] = None
+) -> dict:
+    """
+    Everything up to the LLM call: fetch, cache lookup, parse, embed, prompt.
+    Returns {"cached": str | None, "prompt": str | None, "cache_key": str}.
+    """
+    # Fetch resume PDF bytes and job details (memoized per request by the loader)
+    loader = loader or DataLoader()
+    resume_pdf_bytes, job_data = await asyncio.gather(loader.load_resume(user_id), loader.load_job(job_id))
     if not resume_pdf_bytes:
         raise ValueError("❌ Resume not found for the given user ID.")
 
-    # Fetch job details
-    job_data = await get_job_by_id(job_id)
     if not job_data:
         raise ValueError("❌ Job not found.")
 
-    # Extract text from PDF bytes
-    resume_text = extract_text_from_pdf(resume_pdf_bytes)
     job_text = job_data.get("description", "")
 
-    # (Optional) Store embeddings if needed
-    resume_embedding = get_embedding(resume_text)
+    # Same resume + same JD + same prompt version -> reuse the previous letter
+    cache_key = result_key("cover_letter", pdf_content_hash(resume_pdf_bytes), text_hash(job_text), PROMPT_VERSION)
+    cached = await cached_result("cover_letter", cache_key, refresh)
+    if cached is not None:
+        return {"cached": cached, "prompt": None, "cache_key": cache_key}
+
+    # Extract text from PDF bytes
+    resume_text = await extract_text_async(resume_pdf_bytes)
+
+    # (Optional) Store embeddings if needed — skipped when this exact pair is already stored
     combined_text = resume_text + "\n" + job_text
-    doc_id = str(uuid.uuid4())
-    store_embeddings(
-        collection_name="resume_jd_match",
-        ids=[doc_id],
-        documents=[combined_text],
-        embeddings=[resume_embedding],
-    )
-
-    # Build prompt for cover letter generation
-    prompt = f"""
-    Write a professional cover letter for the following job description:
-    {job_text}
+    doc_id = content_id(user_id, job_id, combined_text)
+    # Record/check the embedding space first: vectors from another model are dropped, not mixed in
+    await asyncio.to_thread(embedding_collection, "resume_jd_match", await aembedding_space())
+    if await asyncio.to_thread(missing_ids, "resume_jd_match", [doc_id]):
+        resume_embedding = await aget_embedding(resume_text)
+        await asyncio.to_thread(
+            store_embeddings,
+            collection_name="resume_jd_match",
+            ids=[doc_id],
+            documents=[combined_text],
+            embeddings=[resume_embedding],
+            metadatas=[{"user_id": user_id, "job_id": job_id}],
+        )
 
-    Based on this resume:
-    {resume_text}
+    # Build prompt for cover letter generation from the cleaned, budgeted texts
+    compacted = compact_inputs("cover_letter", resume_text=resume_text, job_text=job_text)
+    prompt = COVER_LETTER_PROMPT.format(job_text=compacted["job"], resume_text=compacted["resume"])
+    return {"cached": None, "prompt": prompt, "cache_key": cache_key}
 
-    Cover letter:
-    """
 
-    # Call Google Gemini API with direct REST API approach
+async def generate_cover_letter_from_mongo(
+    user_id: str, job_id: str, refresh: bool = False, loader: Optional[DataLoader] = None
+) -> str:
+    prepared = await prepare_cover_letter(user_id, job_id, refresh, loader)
+    if prepared["cached"] is not None:
+        return prepared["cached"]
+
+    # Call Gemini through the shared async gateway (timeouts + retries handled there)
     try:
-        # Option 1: Try with gemini-1.5-flash (more widely available)
-        try:
-            model = genai.GenerativeModel('gemini-1.5-flash')
-            response = model.generate_content(
-                prompt,
-                generation_config=genai.types.GenerationConfig(
-                    temperature=0.7,
-                    max_output_tokens=500,
-                )
-            )
-            cover_letter_text = response.text.strip()
-        except:
-            # Option 2: Fallback to direct REST API call
-            import requests
-            api_key = os.getenv("GEMINI_API_KEY")
-            url = f"https://generativelanguage.googleapis.com/v1beta/models/gemini-1.5-flash-latest:generateContent?key={api_key}"
-            
-            headers = {"Content-Type": "application/json"}
-            data = {
-                "contents": [{
-                    "parts": [{"text": prompt}]
-                }],
-                "generationConfig": {
-                    "temperature": 0.7,
-                    "maxOutputTokens": 500
-                }
-            }
-            
-            response = requests.post(url, json=data, headers=headers)
-            if response.status_code != 200:
-                raise RuntimeError(f"API call failed: {response.text}")
-            
-            result = response.json()
-            cover_letter_text = result["candidates"][0]["content"]["parts"][0]["text"].strip()
-            
+        cover_letter_text = await generate_text(prepared["prompt"], **COVER_LETTER_PARAMS)
     except Exception as e:
         raise RuntimeError(f"❌ Failed to generate cover letter: {e}")
 
-    return cover_letter_text
\ No newline at end of file
+    await store_result("cover_letter", prepared["cache_key"], cover_letter_text)
+    return cover_letter_text
+
+
+async def stream_cover_letter(prepared: dict) -> AsyncIterator[str]:
+    """Yield the letter as it is generated (or the cached letter in one chunk) and cache the full text."""
+    if prepared["cached"] is not None:
+        yield prepared["cached"]
+        return
+
+    parts = []
+    async for chunk in stream_text(prepared["prompt"], **COVER_LETTER_PARAMS):
+        parts.append(chunk)
+        yield chunk
+
+    await store_result("cover_letter", prepared["cache_key"], "".join(parts).strip())
@@ -1,49 +1,19 @@
 import os
+import re
 import json
+import asyncio
 import logging
-from langchain_core.documents import Document
-from langchain_core.messages import HumanMessage
-from langchain_google_genai import ChatGoogleGenerativeAI
-from services.data_service import get_resume_binary_by_user_id, get_job_by_id
-from utils.pdf_parser import extract_text_from_pdf
-from services.embedding_service import get_or_create_chroma  # ✅ import
+from typing import AsyncIterator, List, Optional
+from services.data_loader import DataLoader
+from utils.pdf_parser import extract_text_async, pdf_content_hash
+from services.match_store import ensure_match_documents
+from services.llm_gateway import generate_text, DEFAULT_MODEL
+from services.result_cache import cached_result, store_result, prompt_version, result_key, text_hash
+from utils.prompt_compactor import compact_inputs, compaction_signature
 
 logger = logging.getLogger(__name__)
 
-API_KEY = os.getenv("GEMINI_API_KEY")
-
-llm = ChatGoogleGenerativeAI(
-    model="gemini-1.5-flash",
-    temperature=0.3,
-    google_api_key=API_KEY
-)
-
-async def match_resume_with_jd(user_id: str, job_id: str) -> dict:
-    try:
-        # 1. Fetch Resume Binary
-        resume_binary = await get_resume_binary_by_user_id(user_id)
-        if not resume_binary:
-            raise ValueError("Resume not found")
-        logger.info("✅ Resume binary fetched.")
-
-        # 2. Extract Resume Text
-        resume_text = extract_text_from_pdf(resume_binary)
-        logger.info("🧾 Resume text extracted.")
-
-        # 3. Fetch Job Description
-        job_data = await get_job_by_id(job_id)
-        if not job_data or "description" not in job_data:
-            raise ValueError("Job description not found")
-        job_description = job_data["description"]
-        logger.info("📄 Job description fetched.")
-
-        # ✅ 4. Embed and Cache in Chroma
-        docs = [Document(page_content=resume_text), Document(page_content=job_description)]
-        get_or_create_chroma(docs, collection_name=f"match_{user_id}_{job_id}")
-        logger.info("📦 ChromaDB embedding and caching complete.")
-
-        # 5. Prompt
-        prompt = f"""You are a resume screening assistant. Compare the following resume and job description, then return a JSON with match score (0-100), strengths, and gaps.
+JD_MATCH_PROMPT = """You are a resume screening assistant. Compare the following resume and job description, then return a JSON with match score (0-100), strengths, and gaps.
 
 Resume:
 {resume_text}
@@ -57,56 +27,164 @@ Respond only in JSON format like this:
   "strengths": ["React.js", "MongoDB", "Docker"],
   "gaps": ["Azure DevOps", "CI/CD pipelines", "Unit Testing"]
 }}"""
+JD_MATCH_PARAMS = {"temperature": 0.3}
+PROMPT_VERSION = prompt_version(JD_MATCH_PROMPT, DEFAULT_MODEL, compaction=compaction_signature("jd_match"), **JD_MATCH_PARAMS)
+
+# ⚙️ Batch matching: how many jobs per request and how many Gemini calls in flight
+JD_MATCH_BATCH_MAX_JOBS = int(os.getenv("JD_MATCH_BATCH_MAX_JOBS", "50"))
+JD_MATCH_BATCH_CONCURRENCY = int(os.getenv("JD_MATCH_BATCH_CONCURRENCY", "5"))
+
+
+class PreparedResume:
+    """
+    A user's resume fetched once and shared across job evaluations.
+    Text extraction is deferred until the first cache miss actually needs it.
+    """
+
+    def __init__(self, user_id: str, resume_binary: bytes):
+        self.user_id = user_id
+        self.binary = resume_binary
+        self.pdf_hash = pdf_content_hash(resume_binary)
+        self._text: Optional[str] = None
+        self._lock = asyncio.Lock()
+
+    async def text(self) -> str:
+        async with self._lock:
+            if self._text is None:
+                self._text = await extract_text_async(self.binary)
+                logger.info("🧾 Resume text extracted.")
+            return self._text
+
+
+async def prepare_resume(user_id: str, loader: Optional[DataLoader] = None) -> PreparedResume:
+    resume_binary = await (loader or DataLoader()).load_resume(user_id)
+    if not resume_binary:
+        raise ValueError("Resume not found")
+    logger.info("✅ Resume binary fetched.")
+    return PreparedResume(user_id, resume_binary)
 
-        message = HumanMessage(content=prompt)
-        response = llm.invoke([message])
-        response_text = response.content.strip()
-        logger.info("🔍 Gemini Flash responded.")
 
-        # 6. Try parsing JSON
+def _failed(error: str) -> dict:
+    return {"score": 0, "strengths": [], "gaps": [], "error": error}
+
+
+def parse_match_response(response_text: str) -> dict:
+    """Pull {score, strengths, gaps} out of Gemini's reply, falling back to the first {...} block."""
+    if response_text.startswith("```json"):
+        response_text = response_text.replace("```json", "").replace("```", "").strip()
+    elif response_text.startswith("```"):
+        response_text = response_text.replace("```", "").strip()
+
+    try:
+        result = json.loads(response_text)
+    except json.JSONDecodeError as e:
+        logger.warning("⚠️ JSON parse failed. Trying regex...")
+        json_match = re.search(r'\{.*\}', response_text, re.DOTALL)
+        if not json_match:
+            return _failed(f"Failed to parse JSON response: {str(e)}")
         try:
-            if response_text.startswith("```json"):
-                response_text = response_text.replace("```json", "").replace("```", "").strip()
-            elif response_text.startswith("```"):
-                response_text = response_text.replace("```", "").strip()
-
-            result = json.loads(response_text)
-            final_result = {
-                "score": result.get("score", 0),
-                "strengths": result.get("strengths", []),
-                "gaps": result.get("gaps", [])
-            }
-            logger.info(f"✅ Match Score: {final_result['score']}")
-            return final_result
-
-        except json.JSONDecodeError as e:
-            logger.warning("⚠️ JSON parse failed. Trying regex...")
-            import re
-            json_match = re.search(r'\{.*\}', response_text, re.DOTALL)
-            if json_match:
-                try:
-                    result = json.loads(json_match.group(0))
-                    final_result = {
-                        "score": result.get("score", 0),
-                        "strengths": result.get("strengths", []),
-                        "gaps": result.get("gaps", [])
-                    }
-                    return final_result
-                except json.JSONDecodeError:
-                    pass
-
-            return {
-                "score": 0,
-                "strengths": [],
-                "gaps": [],
-                "error": f"Failed to parse JSON response: {str(e)}"
-            }
+            result = json.loads(json_match.group(0))
+        except json.JSONDecodeError:
+            return _failed(f"Failed to parse JSON response: {str(e)}")
+
+    return {
+        "score": result.get("score", 0),
+        "strengths": result.get("strengths", []),
+        "gaps": result.get("gaps", [])
+    }
+
+
+async def evaluate_match(resume: PreparedResume, job_id: str, job_data: Optional[dict], refresh: bool = False) -> dict:
+    """Score one prepared resume against one job: cache lookup, embed, prompt, parse."""
+    if not job_data or "description" not in job_data:
+        raise ValueError("Job description not found")
+    job_description = job_data["description"]
+
+    # Serve a previous result for the same resume + JD + prompt version
+    cache_key = result_key("jd_match", resume.pdf_hash, text_hash(job_description), PROMPT_VERSION)
+    cached = await cached_result("jd_match", cache_key, refresh)
+    if cached is not None:
+        return cached
+
+    resume_text = await resume.text()
+
+    # ✅ Embed and cache in the shared match collection (skipped if unchanged)
+    stored = await ensure_match_documents(resume.user_id, job_id, resume_text, job_description)
+    logger.info(f"📦 Match documents {'already cached' if stored['cached'] else 'stored'} in ChromaDB.")
+
+    compacted = compact_inputs("jd_match", resume_text=resume_text, job_text=job_description)
+    prompt = JD_MATCH_PROMPT.format(resume_text=compacted["resume"], job_description=compacted["job"])
+    response_text = await generate_text(prompt, **JD_MATCH_PARAMS)
+    logger.info("🔍 Gemini Flash responded.")
+
+    final_result = parse_match_response(response_text)
+    if "error" not in final_result:
+        logger.info(f"✅ Match Score: {final_result['score']}")
+        await store_result("jd_match", cache_key, final_result)
+    return final_result
+
+async def match_resume_with_jd(
+    user_id: str, job_id: str, refresh: bool = False, loader: Optional[DataLoader] = None
+) -> dict:
+    try:
+        loader = loader or DataLoader()
+        resume, job_data = await asyncio.gather(prepare_resume(user_id, loader), loader.load_job(job_id))
+        logger.info("📄 Job description fetched.")
+        return await evaluate_match(resume, job_id, job_data, refresh=refresh)
 
     except Exception as e:
         logger.error(f"❌ Error in match_resume_with_jd: {e}")
-        return {
-            "score": 0,
-            "strengths": [],
-            "gaps": [],
-            "error": str(e)
-        }
+        return _failed(str(e))
+
+
+async def match_resume_with_jobs(
+    resume: PreparedResume,
+    job_ids: List[str],
+    refresh: bool = False,
+    concurrency: int = JD_MATCH_BATCH_CONCURRENCY,
+    loader: Optional[DataLoader] = None,
+) -> AsyncIterator[dict]:
+    """
+    Match one resume against many jobs.
+
+    The resume comes from prepare_resume() (fetched once, parsed once on the
+    first cache miss), all jobs come back in a single query, and per-job
+    evaluations run concurrently with at most `concurrency` in flight.
+    Yields {"job_id", "title", ...result} as each one completes.
+    """
+    job_ids = list(dict.fromkeys(job_ids))[:JD_MATCH_BATCH_MAX_JOBS]
+    jobs = await (loader or DataLoader()).load_jobs(job_ids)
+    logger.info(f"📄 Fetched {len(jobs)}/{len(job_ids)} job descriptions.")
+
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+
+    async def run(job_id: str) -> dict:
+        async with semaphore:
+            try:
+                result = await evaluate_match(resume, job_id, jobs.get(job_id), refresh=refresh)
+            except Exception as e:
+                logger.error(f"❌ Match failed for job {job_id}: {e}")
+                result = _failed(str(e))
+        job = jobs.get(job_id) or {}
+        return {"job_id": job_id, "title": job.get("title"), **result}
+
+    tasks = [asyncio.create_task(run(job_id)) for job_id in job_ids]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            yield await next_done
+    finally:
+        # Caller went away (e.g. SSE client disconnected): stop the remaining Gemini calls
+        for task in tasks:
+            task.cancel()
+
+
+def _score_value(result: dict) -> float:
+    try:
+        return float(result.get("score") or 0)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def rank_matches(results: List[dict]) -> List[dict]:
+    """Highest score first; failed evaluations go last."""
+    return sorted(results, key=lambda r: ("error" in r, -_score_value(r)))
@@ -1,58 +1,99 @@
 # modules/resume_tips.py
 
-import google.generativeai as genai
-import os
+import asyncio
 import logging
-from dotenv import load_dotenv
-import uuid
+from typing import AsyncIterator, Optional
 
-from services.data_service import get_resume_binary_by_user_id  # ✅ Use binary fetch
-from utils.pdf_parser import extract_text_from_pdf              # ✅ Updated function
-from services.embedding_service import get_embedding
-from services.chroma_service import store_embeddings
+from services.data_loader import DataLoader
+from utils.pdf_parser import extract_text_async, pdf_content_hash  # ✅ Updated function
+from services.embedding_service import aget_embedding, aembedding_space
+from services.chroma_service import store_embeddings, missing_ids, content_id, embedding_collection
+from services.llm_gateway import generate_text, stream_text, DEFAULT_MODEL
+from services.result_cache import cached_result, store_result, prompt_version, result_key
+from utils.prompt_compactor import compact_inputs, compaction_signature
 
-load_dotenv()
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-genai.configure(api_key=os.getenv("GEMINI_API_KEY"))
-model = genai.GenerativeModel(model_name="models/gemini-1.5-flash")
+RESUME_TIPS_PROMPT = """
+You are a professional resume reviewer.
 
-async def generate_resume_tips_from_mongo(user_id: str) -> str:
-    try:
-        # Step 1: Fetch resume binary from MongoDB
-        resume_binary = await get_resume_binary_by_user_id(user_id)
-        if not resume_binary:
-            return "❌ Resume not found for this user."
+Analyze the resume below and give 3 clear, actionable suggestions to improve it:
+
+Resume:
+{resume_text}
+"""
+PROMPT_VERSION = prompt_version(RESUME_TIPS_PROMPT, DEFAULT_MODEL, compaction=compaction_signature("resume_tips"))
+
+async def prepare_resume_tips(user_id: str, refresh: bool = False, loader: Optional[DataLoader] = None) -> dict:
+    """
+    Everything up to the LLM call: fetch, cache lookup, parse, embed, prompt.
+    Returns {"cached": str | None, "prompt": str | None, "cache_key": str}.
+    Raises ValueError if the user has no resume.
+    """
+    # Step 1: Fetch resume binary from MongoDB
+    resume_binary = await (loader or DataLoader()).load_resume(user_id)
+    if not resume_binary:
+        raise ValueError("❌ Resume not found for this user.")
 
-        logger.info("📄 Resume binary fetched successfully.")
+    logger.info("📄 Resume binary fetched successfully.")
 
-        # Step 2: Extract text from PDF binary
-        resume_text = extract_text_from_pdf(resume_binary)
+    # Tips only depend on the resume content and the prompt version
+    cache_key = result_key("resume_tips", pdf_content_hash(resume_binary), "", PROMPT_VERSION)
+    cached = await cached_result("resume_tips", cache_key, refresh)
+    if cached is not None:
+        return {"cached": cached, "prompt": None, "cache_key": cache_key}
 
-        # Step 3: Embed + Store
-        embedding = get_embedding(resume_text)
-        doc_id = str(uuid.uuid4())
-        store_embeddings(
+    # Step 2: Extract text from PDF binary
+    resume_text = await extract_text_async(resume_binary)
+
+    # Step 3: Embed + Store (content-derived ID, so a repeat request writes nothing)
+    doc_id = content_id(user_id, resume_text)
+    # Record/check the embedding space first: vectors from another model are dropped, not mixed in
+    await asyncio.to_thread(embedding_collection, "resume_tips_feedback", await aembedding_space())
+    if await asyncio.to_thread(missing_ids, "resume_tips_feedback", [doc_id]):
+        embedding = await aget_embedding(resume_text)
+        await asyncio.to_thread(
+            store_embeddings,
             collection_name="resume_tips_feedback",
             ids=[doc_id],
             documents=[resume_text],
-            embeddings=[embedding]
+            embeddings=[embedding],
+            metadatas=[{"user_id": user_id}]
         )
 
-        # Step 4: Prompt Gemini for feedback
-        prompt = f"""
-You are a professional resume reviewer.
+    # Step 4: Prompt Gemini for feedback
+    prompt = RESUME_TIPS_PROMPT.format(resume_text=compact_inputs("resume_tips", resume_text=resume_text)["resume"])
+    return {"cached": None, "prompt": prompt, "cache_key": cache_key}
 
-Analyze the resume below and give 3 clear, actionable suggestions to improve it:
 
-Resume:
-{resume_text}
-"""
+async def generate_resume_tips_from_mongo(user_id: str, refresh: bool = False, loader: Optional[DataLoader] = None) -> str:
+    try:
+        prepared = await prepare_resume_tips(user_id, refresh, loader)
+        if prepared["cached"] is not None:
+            return prepared["cached"]
 
-        response = model.generate_content(prompt)
-        return response.text.strip()
+        tips = await generate_text(prepared["prompt"])
+        await store_result("resume_tips", prepared["cache_key"], tips)
+        return tips
+
+    except ValueError as e:
+        return str(e)
 
     except Exception as e:
         logger.error(f"❌ Error in generate_resume_tips_from_mongo: {e}")
         return "⚠️ Unable to generate resume tips at this time."
+
+
+async def stream_resume_tips(prepared: dict) -> AsyncIterator[str]:
+    """Yield tips as they are generated (or the cached tips in one chunk) and cache the full text."""
+    if prepared["cached"] is not None:
+        yield prepared["cached"]
+        return
+
+    parts = []
+    async for chunk in stream_text(prepared["prompt"]):
+        parts.append(chunk)
+        yield chunk
+
+    await store_result("resume_tips", prepared["cache_key"], "".join(parts).strip())
@@ -1,21 +1,24 @@
 # routes/chat.py
 
-from fastapi import APIRouter, UploadFile, Form, File
+from fastapi import APIRouter, UploadFile, Form, File, Request, Depends, BackgroundTasks
 from fastapi.responses import JSONResponse
 from typing import Optional
-import shutil
-import os
 import time
 
 from services.ats_score import score_resume
 from services.job_recommender import recommend_jobs
-from services.career_guide import get_career_guidance
-from services.faq import answer_faq
+from services.career_guide import get_career_guidance, stream_career_guidance
+from services.faq import FAQ_INTENTS, answer_faq_intent
+from services.intent_classifier import classify_intent, INTENT_MIN_CONFIDENCE, FALLBACK_INTENT
 from services.genai_chat import get_genai_response  # ✅ NEW IMPORT
+from services.llm_gateway import DEFAULT_MODEL
+from services.data_loader import DataLoader, get_data_loader
+from services.chat_history import chat_history
+from services.conversation_memory import conversation_memory
+from services.upload_store import save_upload, warm_resume_pipeline, UploadTooLargeError
+from utils.sse import sse_response
 
 router = APIRouter()
-UPLOAD_DIR = "uploaded_resumes"
-os.makedirs(UPLOAD_DIR, exist_ok=True)
 
 # Additional endpoints from constants.js (keeping your main /chat route unchanged)
 
@@ -53,10 +56,13 @@ async def db_health_check():
 async def clear_chat_history(user_id: str = Form(...)):
     """Clear chat history endpoint from constants.js"""
     try:
+        deleted = await chat_history.clear_user(user_id)
+        await conversation_memory.forget(user_id)
         return JSONResponse({
             "success": True,
             "message": "Chat history cleared successfully",
             "user_id": user_id,
+            "deleted": deleted,
             "timestamp": time.time()
         })
     except Exception as e:
@@ -67,29 +73,27 @@ async def clear_chat_history(user_id: str = Form(...)):
 
 @router.post("/chat")
 async def chat_route(
+    background_tasks: BackgroundTasks,
     message: str = Form(...),
     user_id: str = Form(...),
     job_id: Optional[str] = Form(None),
     action: Optional[str] = Form("chat"),
-    file: Optional[UploadFile] = File(None)
+    file: Optional[UploadFile] = File(None),
+    loader: DataLoader = Depends(get_data_loader),
 ):
     try:
-        file_uploaded = False
-        file_path = None
+        started = time.perf_counter()
         file_info = None
 
-        # ✅ Save uploaded resume file
+        # ✅ Stream uploaded resume to disk (deduplicated by content hash)
         if file:
-            filename = f"{user_id}_{int(time.time())}_{file.filename.replace(' ', '').replace('(', '').replace(')', '')}"
-            file_path = os.path.join(UPLOAD_DIR, filename)
-            with open(file_path, "wb") as buffer:
-                shutil.copyfileobj(file.file, buffer)
-            file_uploaded = True
-            file_info = {
-                "filename": file.filename,
-                "size": os.path.getsize(file_path),
-                "path": file_path
-            }
+            try:
+                file_info = await save_upload(file)
+            except UploadTooLargeError as e:
+                return JSONResponse({"success": False, "error": str(e)}, status_code=413)
+            if not file_info["duplicate"]:
+                # Warm the text / embedding caches after the response is sent
+                background_tasks.add_task(warm_resume_pipeline, file_info["path"])
 
         # ✅ Response initialization
         response_text = "I'm here to help! Ask me to analyze your resume, recommend jobs, answer FAQs, or give career guidance."
@@ -98,9 +102,13 @@ async def chat_route(
         career_guidance = None
         faq_answer = None
 
+        # 🧭 Local intent classification; only low-confidence messages reach the LLM
+        intent, confidence = classify_intent(message)
+        routed_intent = intent if confidence >= INTENT_MIN_CONFIDENCE else FALLBACK_INTENT
+
         # 🎯 Resume Score
-        if "score" in message.lower() or "ats" in message.lower():
-            resume_score = await score_resume(user_id)
+        if routed_intent == "ats_score":
+            resume_score = await score_resume(user_id, loader=loader)
             if "error" in resume_score:
                 response_text = resume_score["error"]
             else:
@@ -113,8 +121,8 @@ async def chat_route(
                 )
 
         # 💼 Job Recommendations
-        elif "job" in message.lower() and "recommend" in message.lower():
-            job_matches = await recommend_jobs(user_id)
+        elif routed_intent == "job_recommend":
+            job_matches = await recommend_jobs(user_id, loader=loader)
             if job_matches and job_matches.get("recommendations"):
                 response_text = "🔍 Based on your resume, here are some jobs you might like:\n\n"
                 for job in job_matches["recommendations"]:
@@ -127,22 +135,43 @@ async def chat_route(
                 response_text = job_matches.get("message", "No job matches found.")
 
         # 🧭 Career Guidance
-        elif "career" in message.lower() or "roadmap" in message.lower():
+        elif routed_intent == "career_guidance":
             career_guidance = await get_career_guidance(message)
             response_text = career_guidance
 
         # ❓ FAQs
-        elif any(q in message.lower() for q in ["how do", "where can", "what is", "faq", "help"]):
-            faq_answer = answer_faq(message)
+        elif routed_intent in FAQ_INTENTS:
+            faq_answer = answer_faq_intent(routed_intent)
             response_text = faq_answer
 
+        # 👋 Greetings get the canned intro without an LLM call
+        elif routed_intent == "greeting":
+            pass
+
         # 🧠 GenAI Fallback: handle all other general queries
         else:
-            response_text = get_genai_response(message)
+            # Recent turns + rolling summary, capped at CHAT_MEMORY_TOKEN_BUDGET
+            prompt = await conversation_memory.build_prompt(user_id, message)
+            response_text = await get_genai_response(prompt)
+
+        # 💾 Queued for the write-behind flusher; never awaited on the response path
+        chat_history.record(
+            user_id,
+            message,
+            response_text,
+            file_path=file_info["path"] if file_info else None,
+            is_duplicate=bool(file_info and file_info["duplicate"]),
+            processing_time=round(time.perf_counter() - started, 3),
+            response_type=routed_intent,
+        )
+        background_tasks.add_task(conversation_memory.add_turn, user_id, message, response_text)
 
         return JSONResponse({
             "success": True,
             "message": response_text,
+            "intent": routed_intent,
+            "confidence": round(confidence, 3),
+            "file": file_info,
             "timestamp": time.time()
         })
 
@@ -150,4 +179,13 @@ async def chat_route(
         return JSONResponse({
             "success": False,
             "error": str(e)
-        }, status_code=500)
\ No newline at end of file
+        }, status_code=500)
+
+# 🧭 Career guidance streamed as server-sent events (POST /career-guidance/stream)
+@router.post("/career-guidance/stream")
+async def career_guidance_stream(request: Request, message: str = Form(...)):
+    return sse_response(
+        request,
+        stream_career_guidance(message),
+        meta={"feature": "career_guidance", "cached": False, "model": DEFAULT_MODEL},
+    )
@@ -1,10 +1,12 @@
-from fastapi import APIRouter, Query, HTTPException
+from fastapi import APIRouter, Query, HTTPException, Request, Depends
 from fastapi.responses import JSONResponse
 import logging
 import traceback
 
-from services.data_service import get_resume_binary_by_user_id, get_job_by_id
-from modules.cover_letter import generate_cover_letter_from_mongo
+from services.data_loader import DataLoader, get_data_loader
+from modules.cover_letter import generate_cover_letter_from_mongo, prepare_cover_letter, stream_cover_letter
+from services.llm_gateway import DEFAULT_MODEL
+from utils.sse import sse_response
 
 router = APIRouter(prefix="/genai/cover-letter", tags=["GenAI"])
 
@@ -16,6 +18,8 @@ logging.basicConfig(level=logging.INFO)
 async def generate_cover_letter_route(
     user_id: str = Query(..., description="User ID from MongoDB"),
     job_id: str = Query(..., description="Job ID from MongoDB"),
+    refresh: bool = Query(False, description="Bypass the result cache and regenerate"),
+    loader: DataLoader = Depends(get_data_loader),
 ):
     """
     📝 Generate a personalized cover letter using the user's resume and job description.
@@ -24,19 +28,19 @@ async def generate_cover_letter_route(
         logger.info(f"📩 Cover letter generation request received for user_id={user_id} and job_id={job_id}")
 
         # Check if resume binary exists
-        resume_binary = await get_resume_binary_by_user_id(user_id)
+        resume_binary = await loader.load_resume(user_id)
         if not resume_binary:
             logger.warning(f"❌ Resume binary not found for user_id={user_id}")
             raise HTTPException(status_code=404, detail="❌ Resume binary not found for the given user ID.")
 
         # Check if job exists
-        job_data = await get_job_by_id(job_id)
+        job_data = await loader.load_job(job_id)
         if not job_data:
             logger.warning(f"❌ Job not found for job_id={job_id}")
             raise HTTPException(status_code=404, detail="❌ Job not found for the given job ID.")
 
-        # Generate cover letter
-        cover_letter = await generate_cover_letter_from_mongo(user_id, job_id)
+        # Generate cover letter (the loader already holds the resume and job, so no second fetch)
+        cover_letter = await generate_cover_letter_from_mongo(user_id, job_id, refresh=refresh, loader=loader)
 
         if not cover_letter or "error" in cover_letter.lower():
             logger.error("❌ Cover letter generation failed internally.")
@@ -54,3 +58,28 @@ async def generate_cover_letter_route(
         logger.error(str(e))
         traceback.print_exc()
         raise HTTPException(status_code=500, detail="Unexpected server error.")
+
+
+@router.get("/stream")
+async def stream_cover_letter_route(
+    request: Request,
+    user_id: str = Query(..., description="User ID from MongoDB"),
+    job_id: str = Query(..., description="Job ID from MongoDB"),
+    refresh: bool = Query(False, description="Bypass the result cache and regenerate"),
+    loader: DataLoader = Depends(get_data_loader),
+):
+    """
+    📝 Same as the route above, streamed as server-sent events
+    (`token` per chunk, then `done` with the full letter).
+    """
+    logger.info(f"📩 Streaming cover letter request for user_id={user_id} and job_id={job_id}")
+    try:
+        prepared = await prepare_cover_letter(user_id, job_id, refresh=refresh, loader=loader)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+    return sse_response(
+        request,
+        stream_cover_letter(prepared),
+        meta={"feature": "cover_letter", "cached": prepared["cached"] is not None, "model": DEFAULT_MODEL},
+    )
@@ -1,8 +1,18 @@
-from fastapi import APIRouter, Query, HTTPException
-from fastapi.responses import JSONResponse
+from fastapi import APIRouter, Query, HTTPException, Request, Depends
+from fastapi.responses import JSONResponse, StreamingResponse
+import time
 import logging
 
-from modules.resume_jd_matcher import match_resume_with_jd
+from models.jd_match_model import BatchMatchRequest
+from services.data_loader import DataLoader, get_data_loader
+from modules.resume_jd_matcher import (
+    match_resume_with_jd,
+    match_resume_with_jobs,
+    prepare_resume,
+    rank_matches,
+    JD_MATCH_BATCH_MAX_JOBS,
+)
+from utils.sse import format_event
 
 # Router configuration
 router = APIRouter(prefix="/genai/jd-match", tags=["GenAI"])
@@ -14,13 +24,15 @@ logger = logging.getLogger(__name__)
 @router.get("/")
 async def resume_jd_match_api(
     user_id: str = Query(..., description="MongoDB User ID"),
-    job_id: str = Query(..., description="MongoDB Job ID")
+    job_id: str = Query(..., description="MongoDB Job ID"),
+    refresh: bool = Query(False, description="Bypass the result cache and re-run the match"),
+    loader: DataLoader = Depends(get_data_loader),
 ):
     """
     Compare a user's resume with a job description and return structured match result.
     """
     try:
-        result = await match_resume_with_jd(user_id, job_id)
+        result = await match_resume_with_jd(user_id, job_id, refresh=refresh, loader=loader)
 
         # Validate result structure
         if not isinstance(result, dict) or "score" not in result:
@@ -35,3 +47,63 @@ async def resume_jd_match_api(
     except Exception as e:
         logger.exception("Resume-JD matching failed unexpectedly.")
         raise HTTPException(status_code=500, detail="Internal server error")
+
+
+@router.post("/batch")
+async def resume_jd_match_batch_api(
+    body: BatchMatchRequest,
+    request: Request,
+    loader: DataLoader = Depends(get_data_loader),
+):
+    """
+    Compare one resume with many jobs (e.g. a page of listings).
+
+    - stream=false: one JSON response with results ranked by score.
+    - stream=true: server-sent `result` events as each job finishes,
+      then `done` with the ranked list.
+    """
+    if not body.job_ids:
+        raise HTTPException(status_code=422, detail="job_ids must not be empty")
+    if len(body.job_ids) > JD_MATCH_BATCH_MAX_JOBS:
+        raise HTTPException(status_code=422, detail=f"At most {JD_MATCH_BATCH_MAX_JOBS} job_ids per request")
+
+    try:
+        resume = await prepare_resume(body.user_id, loader)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+    results = match_resume_with_jobs(resume, body.job_ids, refresh=body.refresh, loader=loader)
+
+    if not body.stream:
+        try:
+            matches = [result async for result in results]
+        except Exception:
+            logger.exception("Batch resume-JD matching failed unexpectedly.")
+            raise HTTPException(status_code=500, detail="Internal server error")
+        return JSONResponse(content={"success": True, "data": rank_matches(matches)})
+
+    async def event_stream():
+        started = time.perf_counter()
+        matches = []
+        try:
+            async for result in results:
+                if await request.is_disconnected():
+                    logger.info("🔌 Client disconnected from batch JD match; cancelling remaining jobs.")
+                    return
+                matches.append(result)
+                yield format_event("result", result)
+            yield format_event("done", {
+                "data": rank_matches(matches),
+                "elapsed_ms": round((time.perf_counter() - started) * 1000, 1),
+            })
+        except Exception as e:
+            logger.error(f"❌ Batch JD match stream failed: {e}")
+            yield format_event("error", {"error": str(e)})
+        finally:
+            await results.aclose()
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -1,14 +1,41 @@
 # routers/resume_tips_api.py
 
-from fastapi import APIRouter, Query
-from modules.resume_tips import generate_resume_tips_from_mongo
+from fastapi import APIRouter, Query, Request, HTTPException, Depends
+from services.data_loader import DataLoader, get_data_loader
+from modules.resume_tips import generate_resume_tips_from_mongo, prepare_resume_tips, stream_resume_tips
+from services.llm_gateway import DEFAULT_MODEL
+from utils.sse import sse_response
 
 router = APIRouter(prefix="/genai/resume-tips", tags=["GenAI"])
 
 @router.get("/")
-async def get_resume_tips(user_id: str = Query(..., description="User ID")):
+async def get_resume_tips(
+    user_id: str = Query(..., description="User ID"),
+    refresh: bool = Query(False, description="Bypass the result cache and regenerate"),
+    loader: DataLoader = Depends(get_data_loader),
+):
     try:
-        tips = await generate_resume_tips_from_mongo(user_id)  # ✅ Await async function
+        tips = await generate_resume_tips_from_mongo(user_id, refresh=refresh, loader=loader)  # ✅ Await async function
         return {"tips": tips}
     except Exception as e:
         return {"error": str(e)}
+
+
+@router.get("/stream")
+async def stream_resume_tips_route(
+    request: Request,
+    user_id: str = Query(..., description="User ID"),
+    refresh: bool = Query(False, description="Bypass the result cache and regenerate"),
+    loader: DataLoader = Depends(get_data_loader),
+):
+    """Resume tips as server-sent events (`token` per chunk, then `done` with the full text)."""
+    try:
+        prepared = await prepare_resume_tips(user_id, refresh=refresh, loader=loader)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+    return sse_response(
+        request,
+        stream_resume_tips(prepared),
+        meta={"feature": "resume_tips", "cached": prepared["cached"] is not None, "model": DEFAULT_MODEL},
+    )
@@ -0,0 +1,262 @@
+# services/ats_batch.py
+
+import os
+import time
+import asyncio
+import argparse
+import logging
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from dotenv import load_dotenv
+from pymongo import UpdateOne
+
+from services.data_service import db, users_collection
+from services.ats_score import score_resume_pdfs
+from utils.cpu_pool import CPUPool, CPU_POOL_WORKERS
+from utils.pdf_parser import pdf_content_hash
+
+load_dotenv()
+logger = logging.getLogger(__name__)
+
+# ✅ One document per student: latest ATS result plus the checkpoint fields
+#    (resume hash, scorer version, user's updatedAt) used to skip unchanged resumes
+ats_scores_collection = db["ats_scores"]
+
+# Bump when the scoring rules change so every resume is re-scored on the next run
+SCORER_VERSION = "ats-analyzer-v1"
+
+ATS_BATCH_PAGE_SIZE = int(os.getenv("ATS_BATCH_PAGE_SIZE", "500"))
+ATS_BATCH_CHUNK_SIZE = int(os.getenv("ATS_BATCH_CHUNK_SIZE", "25"))
+ATS_BATCH_WRITE_SIZE = int(os.getenv("ATS_BATCH_WRITE_SIZE", "500"))
+ATS_BATCH_CHUNK_TIMEOUT = float(os.getenv("ATS_BATCH_CHUNK_TIMEOUT", "600"))
+
+STUDENTS_WITH_RESUME = {"role": "student", "profile.resume": {"$type": "binData"}}
+
+
+def _needs_check(user: dict, existing: Optional[dict], full: bool) -> bool:
+    """Whether a user's resume must be fetched and hashed (cheap prefilter on updatedAt)."""
+    if full or existing is None:
+        return True
+    if existing.get("scorer_version") != SCORER_VERSION:
+        return True
+    return existing.get("user_updated_at") != user.get("updatedAt")
+
+
+class _ScoreWriter:
+    """Buffers upserts into ats_scores and sends them with unordered bulk_write."""
+
+    def __init__(self, write_size: int, dry_run: bool):
+        self.write_size = write_size
+        self.dry_run = dry_run
+        self._ops: List[UpdateOne] = []
+        self._lock = asyncio.Lock()
+        self.written = 0
+
+    async def add(self, ops: List[UpdateOne]) -> None:
+        async with self._lock:
+            self._ops.extend(ops)
+            if len(self._ops) >= self.write_size:
+                await self._flush_locked()
+
+    async def flush(self) -> None:
+        async with self._lock:
+            await self._flush_locked()
+
+    async def _flush_locked(self) -> None:
+        ops, self._ops = self._ops, []
+        if not ops:
+            return
+        if not self.dry_run:
+            await ats_scores_collection.bulk_write(ops, ordered=False)
+        self.written += len(ops)
+
+
+async def _iter_user_pages(page_size: int, limit: Optional[int]):
+    """
+    Keyset-paginate students with a resume by _id, fetching only _id and
+    updatedAt. Each page is a short query, so no cursor stays open while
+    the workers are busy.
+    """
+    last_id = None
+    seen = 0
+    while limit is None or seen < limit:
+        query = dict(STUDENTS_WITH_RESUME)
+        if last_id is not None:
+            query["_id"] = {"$gt": last_id}
+        size = page_size if limit is None else min(page_size, limit - seen)
+        cursor = users_collection.find(query, projection={"_id": 1, "updatedAt": 1}).sort("_id", 1).limit(size)
+        page = await cursor.to_list(length=size)
+        if not page:
+            return
+        seen += len(page)
+        last_id = page[-1]["_id"]
+        yield page
+
+
+async def run_bulk_scoring(
+    full: bool = False,
+    workers: int = CPU_POOL_WORKERS,
+    page_size: int = ATS_BATCH_PAGE_SIZE,
+    chunk_size: int = ATS_BATCH_CHUNK_SIZE,
+    write_size: int = ATS_BATCH_WRITE_SIZE,
+    limit: Optional[int] = None,
+    dry_run: bool = False,
+) -> Dict:
+    """
+    Score every student's resume into `ats_scores`.
+
+    Unless `full`, users whose updatedAt and scorer version match their
+    stored result are skipped without reading the resume; the rest are
+    hashed and only re-scored when the resume content actually changed.
+    Memory stays bounded: one page of IDs plus at most 2 × workers chunks
+    of resume bytes in flight.
+    """
+    started = time.perf_counter()
+    # The pool admits max(1, workers) + max_queue tasks, so every in-flight chunk always gets a slot
+    slots = max(1, workers) * 2
+    pool = CPUPool(workers=workers, max_queue=slots, default_timeout=ATS_BATCH_CHUNK_TIMEOUT)
+    pool.start()
+    in_flight = asyncio.Semaphore(slots)
+    writer = _ScoreWriter(write_size, dry_run)
+    tasks = set()
+    counts = {"users": 0, "fetched": 0, "unchanged": 0, "scored": 0, "failed": 0}
+
+    async def score_chunk(chunk: List[Tuple[str, bytes, str, datetime]]) -> None:
+        try:
+            meta = {user_id: (pdf_hash, updated_at) for user_id, _, pdf_hash, updated_at in chunk}
+            try:
+                results = await pool.run(score_resume_pdfs, [(user_id, pdf) for user_id, pdf, _, _ in chunk])
+            except Exception as e:
+                # Worker crash / timeout / saturation: not the resumes' fault, so no checkpoint.
+                # Dropping resume_hash and scorer_version makes the next run retry these users.
+                logger.error(f"❌ Scoring chunk of {len(chunk)} failed: {e}")
+                counts["failed"] += len(chunk)
+                await writer.add([
+                    UpdateOne(
+                        {"_id": user_id},
+                        {
+                            "$set": {"error": str(e) or type(e).__name__, "scored_at": datetime.utcnow()},
+                            "$unset": {"resume_hash": "", "scorer_version": ""},
+                        },
+                        upsert=True,
+                    )
+                    for user_id in meta
+                ])
+                return
+
+            ops = []
+            for user_id, result in results:
+                pdf_hash, updated_at = meta[user_id]
+                checkpoint = {
+                    "resume_hash": pdf_hash,
+                    "scorer_version": SCORER_VERSION,
+                    "user_updated_at": updated_at,
+                    "scored_at": datetime.utcnow(),
+                }
+                if "error" in result:
+                    # A per-PDF error is recorded against the hash, so a broken PDF is retried only once it changes
+                    counts["failed"] += 1
+                    update = {"$set": {**checkpoint, "error": result["error"], "score": None}}
+                else:
+                    counts["scored"] += 1
+                    update = {"$set": {**checkpoint, **result}, "$unset": {"error": ""}}
+                ops.append(UpdateOne({"_id": user_id}, update, upsert=True))
+            await writer.add(ops)
+        finally:
+            in_flight.release()
+
+    async def submit(chunk) -> None:
+        await in_flight.acquire()  # backpressure: the page loop waits for free workers
+        task = asyncio.create_task(score_chunk(chunk))
+        tasks.add(task)
+        task.add_done_callback(tasks.discard)
+
+    try:
+        async for page in _iter_user_pages(page_size, limit):
+            counts["users"] += len(page)
+            ids = [user["_id"] for user in page]
+            existing = {
+                doc["_id"]: doc
+                async for doc in ats_scores_collection.find(
+                    {"_id": {"$in": ids}},
+                    projection={"resume_hash": 1, "scorer_version": 1, "user_updated_at": 1},
+                )
+            }
+            to_check = [user["_id"] for user in page if _needs_check(user, existing.get(user["_id"]), full)]
+            counts["unchanged"] += len(page) - len(to_check)
+            if not to_check:
+                continue
+
+            touched, chunk = [], []
+            async for user in users_collection.find(
+                {"_id": {"$in": to_check}},
+                projection={"profile.resume": 1, "updatedAt": 1},
+            ):
+                counts["fetched"] += 1
+                pdf_bytes = bytes(user["profile"]["resume"])
+                pdf_hash = pdf_content_hash(pdf_bytes)
+                stored = existing.get(user["_id"])
+                if (
+                    not full and stored
+                    and stored.get("resume_hash") == pdf_hash
+                    and stored.get("scorer_version") == SCORER_VERSION
+                ):
+                    # Profile edited but resume unchanged: just move the checkpoint forward
+                    counts["unchanged"] += 1
+                    touched.append(UpdateOne({"_id": user["_id"]}, {"$set": {"user_updated_at": user.get("updatedAt")}}))
+                    continue
+
+                chunk.append((user["_id"], pdf_bytes, pdf_hash, user.get("updatedAt")))
+                if len(chunk) >= chunk_size:
+                    await submit(chunk)
+                    chunk = []
+
+            if chunk:
+                await submit(chunk)
+            if touched:
+                await writer.add(touched)
+
+            logger.info(f"📊 ATS batch progress: {counts}")
+
+        if tasks:
+            await asyncio.gather(*tasks)
+        await writer.flush()
+    finally:
+        await pool.shutdown()
+
+    if not dry_run:
+        await ats_scores_collection.create_index([("score", -1)])
+
+    summary = {
+        **counts,
+        "written": writer.written,
+        "dry_run": dry_run,
+        "seconds": round(time.perf_counter() - started, 2),
+    }
+    logger.info(f"✅ ATS batch finished: {summary}")
+    return summary
+
+
+if __name__ == "__main__":
+    # python -m services.ats_batch [--full] [--workers 8] [--limit 1000] [--dry-run]
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description="Score every student's resume into the ats_scores collection")
+    parser.add_argument("--full", action="store_true", help="Ignore checkpoints and re-score everyone")
+    parser.add_argument("--workers", type=int, default=CPU_POOL_WORKERS)
+    parser.add_argument("--page-size", type=int, default=ATS_BATCH_PAGE_SIZE)
+    parser.add_argument("--chunk-size", type=int, default=ATS_BATCH_CHUNK_SIZE)
+    parser.add_argument("--write-size", type=int, default=ATS_BATCH_WRITE_SIZE)
+    parser.add_argument("--limit", type=int, default=None)
+    parser.add_argument("--dry-run", action="store_true", help="Score but do not write results")
+    args = parser.parse_args()
+
+    print(asyncio.run(run_bulk_scoring(
+        full=args.full,
+        workers=args.workers,
+        page_size=args.page_size,
+        chunk_size=args.chunk_size,
+        write_size=args.write_size,
+        limit=args.limit,
+        dry_run=args.dry_run,
+    )))
@@ -1,11 +1,19 @@
-from services.data_service import get_resume_binary_by_user_id
-from utils.pdf_parser import extract_text_from_pdf
+from services.data_loader import DataLoader
+from utils.pdf_parser import extract_text_async, extract_text_from_pdf
 from utils.keyword_matcher import match_keywords
+from utils.cpu_pool import cpu_pool
+from utils.resume_analyzer import (
+    ResumeFeatures,
+    analyze_resume,
+    matched_keywords,
+    SCORING_KEYWORDS,
+    PROFESSIONAL_KEYWORDS,
+)
 import re
-from typing import Dict, List
+from typing import Dict, List, Optional, Tuple
 
 
-async def score_resume(user_id: str) -> Dict:
+async def score_resume(user_id: str, loader: Optional[DataLoader] = None) -> Dict:
     """
     Simple resume scoring for chatbot - returns score, improvement tips, and additional metrics.
     
@@ -16,53 +24,156 @@ async def score_resume(user_id: str) -> Dict:
         Dict: Resume score and improvement tips with all required fields
     """
     # Fetch resume
-    resume_pdf = await get_resume_binary_by_user_id(user_id)
+    resume_pdf = await (loader or DataLoader()).load_resume(user_id)
     if not resume_pdf:
         return {"error": "Resume not found. Please upload your resume first."}
 
     # Extract text
     try:
-        resume_text = extract_text_from_pdf(resume_pdf)
+        resume_text = await extract_text_async(resume_pdf)
         if not resume_text:
             return {"error": "Could not read your resume. Please ensure it's a valid PDF."}
     except Exception:
         return {"error": "Failed to process your resume. Please try uploading again."}
 
-    # Calculate metrics
-    word_count = len(resume_text.split())
-    resume_length = get_resume_length_category(word_count)
-    
-    # Calculate ATS score
-    ats_score = calculate_ats_compatibility(resume_text)
-    
-    # Get matched keywords (basic professional keywords)
-    professional_keywords = [
-        'experience', 'project', 'managed', 'developed', 'created', 'led',
-        'achieved', 'improved', 'implemented', 'designed', 'built',
-        'collaborated', 'team', 'client', 'solution', 'skills',
-        'education', 'university', 'degree', 'certification',
-        'software', 'technical', 'analysis', 'communication'
-    ]
-    
-    matched_keywords_list = get_matched_keywords(resume_text, professional_keywords)
-    
-    # Generate improvement tips
-    tips = generate_improvement_tips(resume_text, ats_score)
-    
-    # Get score category
-    score_category = get_score_category(ats_score)
-    
+    # Score in the CPU pool so the regex passes don't block the event loop
+    return await cpu_pool.run(score_resume_text, resume_text)
+
+
+def score_resume_text(resume_text: str) -> Dict:
+    """
+    Compute the ATS score, tips and metrics for already-extracted resume text.
+    Pure and picklable, so it can run in a worker process.
+    """
+    return score_features(analyze_resume(resume_text))
+
+
+def score_resume_texts(resume_texts: List[str]) -> List[Dict]:
+    """Bulk variant of score_resume_text: one call (one pool task) for many resumes."""
+    return [score_features(analyze_resume(text)) for text in resume_texts]
+
+
+def score_resume_pdfs(items: List[Tuple[str, bytes]]) -> List[Tuple[str, Dict]]:
+    """
+    Parse and score a chunk of (key, pdf_bytes) in one worker task.
+    A bad PDF only fails its own entry ({"error": ...}), not the chunk.
+    """
+    results = []
+    for key, pdf_bytes in items:
+        try:
+            text = extract_text_from_pdf(pdf_bytes)
+            if not text:
+                results.append((key, {"error": "No extractable text"}))
+                continue
+            results.append((key, score_features(analyze_resume(text))))
+        except Exception as e:
+            results.append((key, {"error": str(e)}))
+    return results
+
+
+def score_features(features: ResumeFeatures) -> Dict:
+    """Score, tips and metrics derived from a resume's feature record."""
+    ats_score = ats_score_from_features(features)
+    matched_keywords_list = matched_keywords(features)
+
     return {
         "score": ats_score,
-        "category": score_category,
-        "tips": tips,
-        "resume_length": resume_length,
+        "category": get_score_category(ats_score),
+        "tips": tips_from_features(features, ats_score),
+        "resume_length": get_resume_length_category(features.word_count),
         "matched_keywords": matched_keywords_list,
-        "word_count": word_count,
+        "word_count": features.word_count,
         "total_keywords_found": len(matched_keywords_list)
     }
 
 
+def ats_score_from_features(features: ResumeFeatures) -> int:
+    """Same scoring as calculate_ats_compatibility, computed from the feature record."""
+    words = features.words
+
+    # 1. Essential Sections (40 points max)
+    sections_found = sum([
+        bool(words & {"experience", "employment"}),
+        bool(words & {"education", "academic", "degree", "university", "college"}),
+        bool(words & {"skills", "competencies", "technologies"}),
+        bool(words & {"contact", "email", "phone", "address"}),
+    ])
+    score = sections_found * 10
+
+    # 2. Professional Keywords (25 points max)
+    keyword_score = int((len(features.keywords.intersection(SCORING_KEYWORDS)) / len(SCORING_KEYWORDS)) * 100)
+    score += min(keyword_score // 4, 25)
+
+    # 3. Contact Information (15 points max)
+    score += (8 if features.has_email else 0) + (7 if features.has_phone else 0)
+
+    # 4. Formatting Quality (10 points max)
+    if features.has_bullets or features.has_arrow:
+        score += 5
+    if 200 <= features.word_count <= 1000:
+        score += 5
+
+    # 5. Content Quality (10 points max)
+    if features.has_quantified:
+        score += 5
+    if not features.has_first_person:
+        score += 5
+
+    return min(score, 100)
+
+
+def tips_from_features(features: ResumeFeatures, ats_score: int) -> List[str]:
+    """Same tips, in the same order, as generate_improvement_tips."""
+    words = features.words
+    tips = []
+
+    # Check missing sections
+    if not words & {"experience", "employment"}:
+        tips.append("Add a 'Work Experience' section with your job history")
+    if not words & {"education", "academic", "degree", "university"}:
+        tips.append("Include an 'Education' section with your qualifications")
+    if not words & {"skills", "competencies"}:
+        tips.append("Add a 'Skills' section listing your technical abilities")
+
+    # Contact information
+    if not features.has_email:
+        tips.append("Add your email address at the top of your resume")
+    if not features.has_phone:
+        tips.append("Include your phone number in the contact section")
+
+    # Content improvements
+    if features.word_count < 200:
+        tips.append("Expand your resume with more detailed descriptions of your work")
+    elif features.word_count > 1000:
+        tips.append("Make your resume more concise - aim for 1-2 pages maximum")
+
+    # Formatting
+    if not features.has_bullets:
+        tips.append("Use bullet points to make your achievements easier to read")
+
+    # Keywords and achievements
+    if not words & {"achieved", "managed", "developed", "created", "led", "improved"}:
+        tips.append("Start bullet points with strong action verbs like 'achieved', 'managed', 'developed'")
+    if not features.has_quantified:
+        tips.append("Include specific numbers and percentages to quantify your achievements")
+
+    # ATS-specific tips
+    if ats_score < 70:
+        tips.append("Use standard section headings like 'Work Experience', 'Education', 'Skills'")
+        tips.append("Avoid using images, tables, or fancy formatting that ATS systems can't read")
+
+    # Professional tone
+    if features.has_first_person:
+        tips.append("Write in third person - avoid using 'I', 'my', or 'me'")
+
+    # General ATS tips
+    if ats_score < 80:
+        tips.append("Save your resume as a PDF to preserve formatting")
+        tips.append("Use keywords from job descriptions you're applying to")
+
+    return tips[:6] if tips else ["Your resume looks good! Keep it updated with your latest achievements."]
+
+
 def get_resume_length_category(word_count: int) -> str:
     """Categorize resume length."""
     if word_count < 150:
@@ -222,4 +333,38 @@ def get_score_category(score: int) -> str:
     elif score >= 60:
         return "Fair"
     else:
-        return "Needs Improvement"
\ No newline at end of file
+        return "Needs Improvement"
+
+def reference_score_resume_text(resume_text: str) -> Dict:
+    """The original multi-pass scoring, kept to verify score_features against."""
+    word_count = len(resume_text.split())
+    ats_score = calculate_ats_compatibility(resume_text)
+    matched_keywords_list = get_matched_keywords(resume_text, PROFESSIONAL_KEYWORDS)
+    return {
+        "score": ats_score,
+        "category": get_score_category(ats_score),
+        "tips": generate_improvement_tips(resume_text, ats_score),
+        "resume_length": get_resume_length_category(word_count),
+        "matched_keywords": matched_keywords_list,
+        "word_count": word_count,
+        "total_keywords_found": len(matched_keywords_list)
+    }
+
+
+if __name__ == "__main__":
+    # python -m services.ats_score verify resume1.pdf resume2.txt ...
+    import sys
+
+    if len(sys.argv) < 3 or sys.argv[1] != "verify":
+        sys.exit("usage: python -m services.ats_score verify <file.pdf|file.txt> ...")
+
+    mismatches = 0
+    for path in sys.argv[2:]:
+        with open(path, "rb") as f:
+            raw = f.read()
+        text = extract_text_from_pdf(raw) if path.lower().endswith(".pdf") else raw.decode("utf-8", "replace")
+        if score_resume_text(text) != reference_score_resume_text(text):
+            mismatches += 1
+            print(f"❌ {path}: analyzer result differs from reference")
+    print(f"✅ {len(sys.argv) - 2 - mismatches}/{len(sys.argv) - 2} resumes scored identically")
+    sys.exit(1 if mismatches else 0)
@@ -1,22 +1,10 @@
 # services/career_guide.py
 
-import os
-from dotenv import load_dotenv
-from langchain_google_genai import ChatGoogleGenerativeAI
-from langchain.schema import HumanMessage
+from typing import AsyncIterator
 
-load_dotenv()
-GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
+from services.llm_gateway import generate_text, stream_text
 
-llm = ChatGoogleGenerativeAI(model="gemini-1.5-flash", google_api_key=GEMINI_API_KEY)
-
-async def get_career_guidance(user_query: str) -> str:
-    """
-    Generate personalized career guidance using Gemini model.
-    :param user_query: A string describing user's interests, skills, goals, etc.
-    :return: AI-generated roadmap or guidance string.
-    """
-    prompt = f"""
+CAREER_GUIDANCE_PROMPT = """
 You're a helpful and knowledgeable career counselor.
 
 A user is asking for career guidance. Here's what they said:
@@ -31,8 +19,22 @@ Based on this, provide:
 
 Be structured, concise, and encouraging.
 """
+
+
+async def get_career_guidance(user_query: str) -> str:
+    """
+    Generate personalized career guidance using Gemini model.
+    :param user_query: A string describing user's interests, skills, goals, etc.
+    :return: AI-generated roadmap or guidance string.
+    """
+    prompt = CAREER_GUIDANCE_PROMPT.format(user_query=user_query)
     try:
-        response = llm.invoke([HumanMessage(content=prompt)])
-        return response.content
+        return await generate_text(prompt)
     except Exception as e:
         return f"⚠️ Error generating career guidance: {str(e)}"
+
+
+async def stream_career_guidance(user_query: str) -> AsyncIterator[str]:
+    """Streaming variant of get_career_guidance: yields text chunks as Gemini produces them."""
+    async for chunk in stream_text(CAREER_GUIDANCE_PROMPT.format(user_query=user_query)):
+        yield chunk
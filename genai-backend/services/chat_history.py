@@ -0,0 +1,189 @@
+# services/chat_history.py
+
+import os
+import time
+import asyncio
+import logging
+from collections import deque
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from dotenv import load_dotenv
+from pymongo import ASCENDING, DESCENDING
+
+from db.mongo import chat_collection
+
+load_dotenv()
+logger = logging.getLogger(__name__)
+
+# ⚙️ Write-behind settings (configurable via .env)
+CHAT_HISTORY_BATCH_SIZE = int(os.getenv("CHAT_HISTORY_BATCH_SIZE", "200"))
+CHAT_HISTORY_FLUSH_SECONDS = float(os.getenv("CHAT_HISTORY_FLUSH_SECONDS", "2"))
+CHAT_HISTORY_MAX_PENDING = int(os.getenv("CHAT_HISTORY_MAX_PENDING", "20000"))
+CHAT_HISTORY_TTL_DAYS = int(os.getenv("CHAT_HISTORY_TTL_DAYS", "90"))
+CHAT_HISTORY_ENABLED = os.getenv("CHAT_HISTORY_ENABLED", "true").lower() != "false"
+
+
+class ChatHistoryWriter:
+    """
+    Write-behind queue for chat turns.
+
+    record() only appends to an in-memory buffer, so a chat response never
+    waits on Mongo. A background task sends the buffer with one unordered
+    insert_many once it reaches CHAT_HISTORY_BATCH_SIZE turns or every
+    CHAT_HISTORY_FLUSH_SECONDS, whichever comes first.
+
+    The buffer is bounded: if Mongo is unreachable for long enough to fill
+    it, the oldest turns are dropped (and counted) rather than growing
+    memory without limit. Pending turns are flushed on shutdown.
+    """
+
+    def __init__(self, collection, batch_size: int, flush_seconds: float, max_pending: int):
+        self.collection = collection
+        self.batch_size = max(1, batch_size)
+        self.flush_seconds = flush_seconds
+        self._pending: deque = deque(maxlen=max_pending)
+        self._wakeup: Optional[asyncio.Event] = None
+        # Held while a batch is being written, so /clear cannot race an in-flight insert
+        self._write_lock: Optional[asyncio.Lock] = None
+        self._task: Optional[asyncio.Task] = None
+
+        self.recorded = 0
+        self.written = 0
+        self.dropped = 0
+        self.flushes = 0
+        self.failures = 0
+        self.last_flush_ms = 0.0
+
+    def record(
+        self,
+        user_id: str,
+        message: str,
+        response: str,
+        file_path: str = None,
+        is_duplicate: bool = False,
+        processing_time: float = None,
+        response_type: str = "normal",
+        context: str = None,
+    ) -> None:
+        """Queue one chat turn (same document shape as db.mongo.save_chat_to_db)."""
+        if not CHAT_HISTORY_ENABLED:
+            return
+        if len(self._pending) == self._pending.maxlen:
+            self.dropped += 1
+        self._pending.append({
+            "user_id": user_id,
+            "message": message,
+            "response": response,
+            "file_path": file_path,
+            "is_duplicate": is_duplicate,
+            "processing_time": processing_time,
+            "response_type": response_type,
+            "context": context,
+            "timestamp": datetime.utcnow(),
+        })
+        self.recorded += 1
+        if len(self._pending) >= self.batch_size and self._wakeup is not None:
+            self._wakeup.set()
+
+    async def ensure_indexes(self) -> None:
+        """Per-user history lookups/deletes, plus TTL expiry on the turn timestamp."""
+        try:
+            await self.collection.create_index([("user_id", ASCENDING), ("timestamp", DESCENDING)])
+            if CHAT_HISTORY_TTL_DAYS > 0:
+                await self.collection.create_index("timestamp", expireAfterSeconds=CHAT_HISTORY_TTL_DAYS * 86400)
+        except Exception as e:
+            logger.warning(f"⚠️ Could not create chat history indexes: {e}")
+
+    def start(self) -> None:
+        """Start the background flusher (called from the app startup hook)."""
+        if self._task is None or self._task.done():
+            self._wakeup = asyncio.Event()
+            self._write_lock = asyncio.Lock()
+            self._task = asyncio.create_task(self._flush_loop())
+
+    async def stop(self) -> None:
+        """Stop the flusher and write whatever is still pending."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        while self._pending:
+            if not await self.flush():
+                logger.warning(f"⚠️ Dropping {len(self._pending)} unsaved chat turns on shutdown.")
+                break
+
+    async def _flush_loop(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_seconds)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            while self._pending:
+                if not await self.flush():
+                    break  # Mongo is failing; retry on the next tick instead of spinning
+                if len(self._pending) < self.batch_size:
+                    break
+
+    async def flush(self) -> bool:
+        """Write up to one batch of pending turns. Returns False if the insert failed."""
+        if self._write_lock is None:
+            self._write_lock = asyncio.Lock()
+        async with self._write_lock:
+            batch = [self._pending.popleft() for _ in range(min(self.batch_size, len(self._pending)))]
+            if not batch:
+                return True
+            started = time.perf_counter()
+            try:
+                await self.collection.insert_many(batch, ordered=False)
+            except Exception as e:
+                self.failures += 1
+                # Put the batch back at the front; the bounded deque drops the oldest if full
+                room = self._pending.maxlen - len(self._pending)
+                self.dropped += max(0, len(batch) - room)
+                self._pending.extendleft(reversed(batch[-room:] if room else []))
+                logger.warning(f"⚠️ Chat history flush of {len(batch)} turns failed: {e}")
+                return False
+            self.flushes += 1
+            self.written += len(batch)
+            self.last_flush_ms = round((time.perf_counter() - started) * 1000, 2)
+            return True
+
+    async def clear_user(self, user_id: str) -> int:
+        """Delete a user's stored and still-pending turns. Returns how many were removed."""
+        if self._write_lock is None:
+            self._write_lock = asyncio.Lock()
+        async with self._write_lock:
+            kept = [doc for doc in self._pending if doc["user_id"] != user_id]
+            removed = len(self._pending) - len(kept)
+            self._pending.clear()
+            self._pending.extend(kept)
+            result = await self.collection.delete_many({"user_id": user_id})
+        return removed + result.deleted_count
+
+    def stats(self) -> Dict:
+        return {
+            "enabled": CHAT_HISTORY_ENABLED,
+            "pending": len(self._pending),
+            "recorded": self.recorded,
+            "written": self.written,
+            "dropped": self.dropped,
+            "flushes": self.flushes,
+            "failures": self.failures,
+            "last_flush_ms": self.last_flush_ms,
+            "batch_size": self.batch_size,
+            "flush_seconds": self.flush_seconds,
+        }
+
+
+# ✅ Shared writer for the chat router
+chat_history = ChatHistoryWriter(
+    chat_collection,
+    batch_size=CHAT_HISTORY_BATCH_SIZE,
+    flush_seconds=CHAT_HISTORY_FLUSH_SECONDS,
+    max_pending=CHAT_HISTORY_MAX_PENDING,
+)
@@ -0,0 +1,187 @@
+# services/chroma_retention.py
+
+import os
+import time
+import sqlite3
+import argparse
+import logging
+from collections import defaultdict
+from typing import Dict, List, Optional
+
+from dotenv import load_dotenv
+
+from services.chroma_service import PERSIST_DIR, get_chroma_client, get_or_create_collection
+from services.match_store import MATCH_COLLECTION
+
+load_dotenv()
+logger = logging.getLogger(__name__)
+
+# ⚙️ Retention policy defaults (configurable via .env)
+RETENTION_MAX_AGE_DAYS = float(os.getenv("CHROMA_RETENTION_DAYS", "30"))
+RETENTION_MAX_PER_USER = int(os.getenv("CHROMA_MAX_DOCS_PER_USER", "20"))
+RETENTION_PAGE_SIZE = 1000
+
+# Collections written by the GenAI features
+MANAGED_COLLECTIONS = ["resume_tips_feedback", "resume_jd_match", MATCH_COLLECTION]
+
+
+def _dir_size(path: str) -> int:
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.path.getsize(os.path.join(root, name))
+            except OSError:
+                continue
+    return total
+
+
+def _iter_metadata(collection):
+    """Page through (id, metadata, document length) without loading embeddings."""
+    offset = 0
+    while True:
+        page = collection.get(include=["metadatas", "documents"], limit=RETENTION_PAGE_SIZE, offset=offset)
+        ids = page.get("ids") or []
+        if not ids:
+            break
+        for doc_id, meta, doc in zip(ids, page.get("metadatas") or [], page.get("documents") or []):
+            yield doc_id, meta or {}, len(doc or "")
+        offset += len(ids)
+
+
+def select_stale_ids(
+    rows: List[tuple],
+    max_age_days: Optional[float],
+    max_per_user: Optional[int],
+    now: float,
+) -> List[str]:
+    """
+    Pick IDs to delete from (id, metadata, size) rows.
+
+    - Anything older than max_age_days goes. Rows without `created_at`
+      (written before content IDs existed) count as infinitely old.
+    - Per user, only the newest max_per_user documents are kept.
+    """
+    stale = set()
+    per_user = defaultdict(list)
+    cutoff = now - max_age_days * 86400 if max_age_days else None
+
+    for doc_id, meta, _ in rows:
+        created_at = meta.get("created_at")
+        if cutoff is not None and (created_at is None or created_at < cutoff):
+            stale.add(doc_id)
+            continue
+        if meta.get("user_id"):
+            per_user[meta["user_id"]].append((created_at or 0, doc_id))
+
+    if max_per_user:
+        for docs in per_user.values():
+            docs.sort(reverse=True)
+            stale.update(doc_id for _, doc_id in docs[max_per_user:])
+
+    return [doc_id for doc_id, _, _ in rows if doc_id in stale]
+
+
+def prune_collection(
+    collection_name: str,
+    max_age_days: Optional[float] = RETENTION_MAX_AGE_DAYS,
+    max_per_user: Optional[int] = RETENTION_MAX_PER_USER,
+    dry_run: bool = False,
+) -> Dict:
+    """
+    Delete stale vectors from one collection.
+
+    Returns counts plus an estimate of the space reclaimed
+    (document text + float32 vectors) for the deleted rows.
+    """
+    collection = get_or_create_collection(collection_name)
+    rows = list(_iter_metadata(collection))
+    stale_ids = select_stale_ids(rows, max_age_days, max_per_user, time.time())
+
+    dimension = 0
+    if rows:
+        sample = collection.get(ids=[rows[0][0]], include=["embeddings"]).get("embeddings")
+        if sample is not None and len(sample):
+            dimension = len(sample[0])
+
+    stale_set = set(stale_ids)
+    doc_bytes = sum(size for doc_id, _, size in rows if doc_id in stale_set)
+    estimated_bytes = doc_bytes + len(stale_ids) * dimension * 4
+
+    if stale_ids and not dry_run:
+        for i in range(0, len(stale_ids), RETENTION_PAGE_SIZE):
+            collection.delete(ids=stale_ids[i:i + RETENTION_PAGE_SIZE])
+
+    return {
+        "collection": collection_name,
+        "total": len(rows),
+        "deleted": 0 if dry_run else len(stale_ids),
+        "would_delete": len(stale_ids),
+        "estimated_bytes_reclaimed": estimated_bytes,
+    }
+
+
+def vacuum_store(persist_dir: str = PERSIST_DIR) -> None:
+    """
+    Compact Chroma's SQLite file so deleted rows actually free disk space.
+    Run while the API is stopped; the app holds the database open.
+    """
+    db_path = os.path.join(persist_dir, "chroma.sqlite3")
+    if not os.path.exists(db_path):
+        return
+    conn = sqlite3.connect(db_path)
+    try:
+        conn.execute("VACUUM")
+    finally:
+        conn.close()
+
+
+def run_retention(
+    collections: Optional[List[str]] = None,
+    max_age_days: Optional[float] = RETENTION_MAX_AGE_DAYS,
+    max_per_user: Optional[int] = RETENTION_MAX_PER_USER,
+    dry_run: bool = False,
+    vacuum: bool = False,
+) -> Dict:
+    """
+    Prune every managed collection that exists and report what was reclaimed,
+    both estimated (per deleted row) and measured on disk.
+    """
+    existing = {getattr(c, "name", c) for c in get_chroma_client().list_collections()}
+    targets = [name for name in (collections or MANAGED_COLLECTIONS) if name in existing]
+
+    size_before = _dir_size(PERSIST_DIR)
+    results = [prune_collection(name, max_age_days, max_per_user, dry_run) for name in targets]
+    if vacuum and not dry_run:
+        vacuum_store()
+    size_after = _dir_size(PERSIST_DIR)
+
+    summary = {
+        "collections": results,
+        "deleted": sum(r["deleted"] for r in results),
+        "estimated_bytes_reclaimed": sum(r["estimated_bytes_reclaimed"] for r in results),
+        "disk_bytes_before": size_before,
+        "disk_bytes_after": size_after,
+        "disk_bytes_reclaimed": max(0, size_before - size_after),
+        "dry_run": dry_run,
+    }
+    logger.info(
+        f"🧹 Chroma retention: deleted {summary['deleted']} vectors, "
+        f"~{summary['estimated_bytes_reclaimed']} bytes of content, "
+        f"{summary['disk_bytes_reclaimed']} bytes on disk"
+    )
+    return summary
+
+
+if __name__ == "__main__":
+    # python -m services.chroma_retention --max-age-days 30 --max-per-user 20 [--dry-run] [--vacuum]
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description="Prune stale vectors from the GenAI Chroma store")
+    parser.add_argument("--collections", nargs="*", default=None)
+    parser.add_argument("--max-age-days", type=float, default=RETENTION_MAX_AGE_DAYS)
+    parser.add_argument("--max-per-user", type=int, default=RETENTION_MAX_PER_USER)
+    parser.add_argument("--dry-run", action="store_true")
+    parser.add_argument("--vacuum", action="store_true", help="VACUUM chroma.sqlite3 afterwards (API must be stopped)")
+    args = parser.parse_args()
+
+    print(run_retention(args.collections, args.max_age_days, args.max_per_user, args.dry_run, args.vacuum))
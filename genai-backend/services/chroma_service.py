@@ -1,52 +1,212 @@
 import os
-import chromadb
+import time
+import hashlib
+import logging
+import threading
 from dotenv import load_dotenv
-from typing import List
+from typing import Dict, List, Optional
+
+from utils.metrics import timed
 
 load_dotenv()
+logger = logging.getLogger(__name__)
 
 # ✅ New persistent client path
 PERSIST_DIR = os.getenv("CHROMA_PERSIST_DIR", "./chroma_store")
 
-# ✅ Use PersistentClient instead of Client + Settings
-chroma_client = chromadb.PersistentClient(path=PERSIST_DIR)
+# ✅ One PersistentClient per process, opened lazily
+_chroma_client = None
+_client_lock = threading.Lock()
+
+
+def get_chroma_client():
+    """
+    The shared PersistentClient, opened on first use. Importing chromadb and
+    opening the store takes most of a second, so neither happens at import.
+    """
+    global _chroma_client
+    if _chroma_client is None:
+        with _client_lock:
+            if _chroma_client is None:
+                import chromadb
+                _chroma_client = chromadb.PersistentClient(path=PERSIST_DIR)
+    return _chroma_client
 
 
-def get_or_create_collection(collection_name: str):
+def get_or_create_collection(collection_name: str, metadata: Optional[Dict] = None):
     """
     Get an existing collection or create a new one if it doesn't exist.
+    `metadata` (e.g. {"hnsw:space": "cosine"}) only applies when creating.
     """
     try:
-        collection = chroma_client.get_or_create_collection(name=collection_name)
+        collection = get_chroma_client().get_or_create_collection(name=collection_name, metadata=metadata)
         return collection
     except Exception as e:
         raise RuntimeError(f"Error creating/getting ChromaDB collection: {str(e)}")
 
 
+# Collections already checked against the current embedding space
+_checked_spaces: Dict[str, Dict] = {}
+
+
+def embedding_collection(collection_name: str, space: Dict, metadata: Optional[Dict] = None):
+    """
+    Get or create a collection holding vectors from one embedding space
+    ({"embedding_model", "embedding_dimensions"}), recorded in its metadata.
+
+    Collections from before spaces were recorded adopt the current space if
+    their stored vectors have the same dimensionality. A collection written
+    by another model is dropped and recreated empty: its vectors cannot be
+    compared with new ones, and everything stored here can be re-embedded.
+    """
+    if _checked_spaces.get(collection_name) == space:
+        return get_or_create_collection(collection_name)
+
+    collection = get_or_create_collection(collection_name, metadata={**(metadata or {}), **space})
+    stored = collection.metadata or {}
+    recorded = {key: stored.get(key) for key in space}
+
+    if recorded != space:
+        if stored.get("embedding_model") is None:
+            sample = collection.get(limit=1, include=["embeddings"]).get("embeddings")
+            if sample is not None and len(sample):
+                recorded["embedding_dimensions"] = len(sample[0])
+            compatible = recorded["embedding_dimensions"] in (None, space["embedding_dimensions"])
+        else:
+            compatible = False
+
+        if compatible:
+            collection.modify(metadata={**{k: v for k, v in stored.items() if not k.startswith("hnsw:")}, **space})
+            logger.info(f"🧬 Recorded embedding space on '{collection_name}': {space}")
+        else:
+            logger.warning(f"⚠️ '{collection_name}' holds {recorded}, not {space}; recreating it for re-embedding")
+            get_chroma_client().delete_collection(collection_name)
+            collection = get_or_create_collection(collection_name, metadata={**(metadata or {}), **space})
+
+    _checked_spaces[collection_name] = space
+    return collection
+
+
+def content_id(*parts: str) -> str:
+    """
+    Deterministic document ID derived from content, so identical documents
+    always map to the same ID.
+    """
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(str(part).encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+@timed("chroma.get")
+def missing_ids(collection_name: str, ids: List[str]) -> List[str]:
+    """
+    Return the subset of ids not yet stored in the collection.
+    """
+    collection = get_or_create_collection(collection_name)
+    try:
+        existing = set(collection.get(ids=ids, include=[])["ids"])
+    except Exception as e:
+        raise RuntimeError(f"Error reading from ChromaDB: {str(e)}")
+    return [doc_id for doc_id in ids if doc_id not in existing]
+
+
+@timed("chroma.write")
 def store_embeddings(
     collection_name: str,
     ids: List[str],
     documents: List[str],
-    embeddings: List[List[float]]
-):
+    embeddings: List[List[float]],
+    metadatas: Optional[List[Dict]] = None
+) -> int:
     """
     Store documents and embeddings in ChromaDB collection.
+
+    IDs that already exist are skipped, so storing the same content-derived
+    IDs again writes nothing. New documents are stamped with `created_at`
+    (epoch seconds) for the retention job. Returns the number written.
     """
     if not (len(ids) == len(documents) == len(embeddings)):
         raise ValueError("Length mismatch between ids, documents, and embeddings.")
+    if metadatas is not None and len(metadatas) != len(ids):
+        raise ValueError("Length mismatch between ids and metadatas.")
     
+    new_ids = set(missing_ids(collection_name, ids))
+    if not new_ids:
+        return 0
+
+    now = time.time()
+    rows = [
+        (doc_id, doc, emb, {**(metadatas[i] if metadatas else {}), "created_at": now})
+        for i, (doc_id, doc, emb) in enumerate(zip(ids, documents, embeddings))
+        if doc_id in new_ids
+    ]
     collection = get_or_create_collection(collection_name)
     
     try:
         collection.add(
+            ids=[row[0] for row in rows],
+            documents=[row[1] for row in rows],
+            embeddings=[row[2] for row in rows],
+            metadatas=[row[3] for row in rows]
+        )
+    except Exception as e:
+        raise RuntimeError(f"Error storing embeddings to ChromaDB: {str(e)}")
+    return len(rows)
+
+
+@timed("chroma.write")
+def upsert_embeddings(
+    collection_name: str,
+    ids: List[str],
+    documents: List[str],
+    embeddings: List[List[float]],
+    metadatas: Optional[List[Dict]] = None
+):
+    """
+    Insert or replace documents by ID. Writing the same IDs again is idempotent.
+    """
+    if not (len(ids) == len(documents) == len(embeddings)):
+        raise ValueError("Length mismatch between ids, documents, and embeddings.")
+    if metadatas is not None and len(metadatas) != len(ids):
+        raise ValueError("Length mismatch between ids and metadatas.")
+
+    collection = get_or_create_collection(collection_name)
+
+    try:
+        collection.upsert(
             ids=ids,
             documents=documents,
-            embeddings=embeddings
+            embeddings=embeddings,
+            metadatas=metadatas
         )
     except Exception as e:
-        raise RuntimeError(f"Error storing embeddings to ChromaDB: {str(e)}")
+        raise RuntimeError(f"Error upserting embeddings to ChromaDB: {str(e)}")
+
+
+@timed("chroma.get")
+def get_documents(
+    collection_name: str,
+    where: Optional[Dict] = None,
+    ids: Optional[List[str]] = None,
+    include: Optional[List[str]] = None
+):
+    """
+    Fetch documents by ID and/or metadata filter (no similarity search).
+    """
+    collection = get_or_create_collection(collection_name)
+    try:
+        return collection.get(
+            ids=ids,
+            where=where,
+            include=include or ["metadatas"]
+        )
+    except Exception as e:
+        raise RuntimeError(f"Error reading from ChromaDB: {str(e)}")
 
 
+@timed("chroma.query")
 def query_similar_documents(collection_name: str, query_embedding: List[float], top_k: int = 5):
     """
     Query ChromaDB for most similar documents based on embedding.
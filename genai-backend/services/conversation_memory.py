@@ -0,0 +1,234 @@
+# services/conversation_memory.py
+
+import os
+import asyncio
+import logging
+import threading
+from collections import OrderedDict, deque
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from dotenv import load_dotenv
+from pymongo import DESCENDING
+
+from db.mongo import db, chat_collection
+from services.llm_gateway import generate_text
+from utils.prompt_compactor import estimate_tokens, clip_tokens
+
+load_dotenv()
+logger = logging.getLogger(__name__)
+
+# ⚙️ Conversation memory settings (configurable via .env)
+CHAT_MEMORY_TOKEN_BUDGET = int(os.getenv("CHAT_MEMORY_TOKEN_BUDGET", "2000"))
+CHAT_MEMORY_RECENT_TURNS = int(os.getenv("CHAT_MEMORY_RECENT_TURNS", "6"))
+CHAT_MEMORY_SUMMARY_TOKENS = int(os.getenv("CHAT_MEMORY_SUMMARY_TOKENS", "400"))
+CHAT_MEMORY_TURN_TOKENS = int(os.getenv("CHAT_MEMORY_TURN_TOKENS", "300"))
+CHAT_MEMORY_MAX_USERS = int(os.getenv("CHAT_MEMORY_MAX_USERS", "5000"))
+
+# Rolling summaries survive restarts here; recent turns are rebuilt from chat_history
+summary_collection = db.chat_memory
+
+CHAT_PREAMBLE = (
+    "You are the career assistant of a job portal. Continue the conversation below, "
+    "using the earlier context where it is relevant."
+)
+
+SUMMARY_PROMPT = """Update the running summary of a conversation between a job seeker and a career assistant.
+Keep facts about the user (target roles, skills, experience, preferences) and any open questions.
+Write at most {words} words of plain text.
+
+Current summary:
+{summary}
+
+New turns:
+{turns}
+
+Updated summary:"""
+
+
+def _format_turn(message: str, response: str) -> str:
+    return (
+        f"User: {clip_tokens(message, CHAT_MEMORY_TURN_TOKENS)}\n"
+        f"Assistant: {clip_tokens(response, CHAT_MEMORY_TURN_TOKENS)}"
+    )
+
+
+class Conversation:
+    """One user's memory: a rolling summary plus the most recent turns verbatim."""
+
+    def __init__(self, summary: str = "", turns: Optional[List[Tuple[str, str, datetime]]] = None):
+        self.summary = summary
+        self.turns: deque = deque(turns or [])  # (message, response, timestamp)
+        self.to_fold: List[Tuple[str, str, datetime]] = []
+        self.folding = False
+
+
+class ConversationMemory:
+    """
+    Token-budgeted multi-turn memory for /chat.
+
+    build_prompt() returns the preamble, the rolling summary, as many recent
+    turns as fit CHAT_MEMORY_TOKEN_BUDGET (newest first) and the new message,
+    so prompt size and latency stay flat however long the conversation gets.
+
+    add_turn() appends the finished turn; turns beyond CHAT_MEMORY_RECENT_TURNS
+    are folded into the summary by a background LLM call, never on the
+    response path. Conversations live in an in-process LRU; on a miss the
+    summary is read from `chat_memory` and the recent turns from `chat_history`.
+    """
+
+    def __init__(self, max_users: int = CHAT_MEMORY_MAX_USERS):
+        self.max_users = max_users
+        self._conversations: "OrderedDict[str, Conversation]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._folds: Dict[str, asyncio.Task] = {}  # Running summary fold per user
+
+        self.hits = 0
+        self.loads = 0
+        self.summaries = 0
+        self.summary_failures = 0
+        self.trimmed_turns = 0
+
+    async def _get(self, user_id: str) -> Conversation:
+        with self._lock:
+            conversation = self._conversations.get(user_id)
+            if conversation is not None:
+                self._conversations.move_to_end(user_id)
+                self.hits += 1
+                return conversation
+
+        conversation = await self._load(user_id)
+        with self._lock:
+            # Another request for the same user may have loaded it meanwhile
+            existing = self._conversations.get(user_id)
+            if existing is not None:
+                return existing
+            self._conversations[user_id] = conversation
+            while len(self._conversations) > self.max_users:
+                self._conversations.popitem(last=False)
+        return conversation
+
+    async def _load(self, user_id: str) -> Conversation:
+        self.loads += 1
+        summary, turns = "", []
+        try:
+            stored = await summary_collection.find_one({"_id": user_id}, projection={"summary": 1, "turns_after": 1})
+            query = {"user_id": user_id}
+            if stored:
+                summary = stored.get("summary") or ""
+                if stored.get("turns_after"):
+                    # Only turns not already folded into the stored summary
+                    query["timestamp"] = {"$gt": stored["turns_after"]}
+            cursor = chat_collection.find(query, projection={"message": 1, "response": 1, "timestamp": 1}).sort("timestamp", DESCENDING).limit(CHAT_MEMORY_RECENT_TURNS)
+            docs = await cursor.to_list(length=CHAT_MEMORY_RECENT_TURNS)
+            turns = [(doc.get("message") or "", doc.get("response") or "", doc.get("timestamp")) for doc in reversed(docs)]
+        except Exception as e:
+            logger.warning(f"⚠️ Could not load chat memory for {user_id}: {e}")
+        return Conversation(summary, turns)
+
+    async def build_prompt(self, user_id: str, message: str) -> str:
+        """Prompt for the LLM: preamble, summary, recent turns and the new message, within budget."""
+        conversation = await self._get(user_id)
+        message = clip_tokens(message, max(CHAT_MEMORY_TURN_TOKENS, CHAT_MEMORY_TOKEN_BUDGET // 2))
+        head = [CHAT_PREAMBLE]
+        if conversation.summary:
+            head.append("Summary of the earlier conversation:\n" + clip_tokens(conversation.summary, CHAT_MEMORY_SUMMARY_TOKENS, keep_end=True))
+        tail = f"User: {message}\nAssistant:"
+
+        remaining = CHAT_MEMORY_TOKEN_BUDGET - sum(estimate_tokens(part) for part in head) - estimate_tokens(tail)
+        recent: List[str] = []
+        # Turns still waiting to be folded are the oldest candidates, then the verbatim window
+        candidates = list(conversation.to_fold) + list(conversation.turns)
+        for turn_message, turn_response, _ in reversed(candidates):
+            formatted = _format_turn(turn_message, turn_response)
+            cost = estimate_tokens(formatted)
+            if cost > remaining:
+                self.trimmed_turns += 1
+                break
+            recent.append(formatted)
+            remaining -= cost
+
+        parts = head + (["Recent conversation:\n" + "\n\n".join(reversed(recent))] if recent else []) + [tail]
+        return "\n\n".join(parts)
+
+    async def add_turn(self, user_id: str, message: str, response: str) -> None:
+        """Remember a finished turn; overflowing turns are summarized in the background."""
+        conversation = await self._get(user_id)
+        # Stamped after chat_history.record, so it sorts after the stored turn (see _save_summary)
+        conversation.turns.append((message, response, datetime.utcnow()))
+        while len(conversation.turns) > CHAT_MEMORY_RECENT_TURNS:
+            conversation.to_fold.append(conversation.turns.popleft())
+        if conversation.to_fold and not conversation.folding:
+            conversation.folding = True
+            task = asyncio.create_task(self._fold(user_id, conversation))
+            self._folds[user_id] = task
+            task.add_done_callback(lambda done: self._folds.pop(user_id, None) if self._folds.get(user_id) is done else None)
+
+    async def _fold(self, user_id: str, conversation: Conversation) -> None:
+        try:
+            while conversation.to_fold:
+                batch = conversation.to_fold[:CHAT_MEMORY_RECENT_TURNS]
+                turns_text = "\n\n".join(_format_turn(m, r) for m, r, _ in batch)
+                try:
+                    summary = await generate_text(
+                        SUMMARY_PROMPT.format(
+                            words=int(CHAT_MEMORY_SUMMARY_TOKENS * 0.75),
+                            summary=conversation.summary or "(none yet)",
+                            turns=turns_text,
+                        ),
+                        temperature=0.2,
+                        max_output_tokens=CHAT_MEMORY_SUMMARY_TOKENS,
+                    )
+                    self.summaries += 1
+                except Exception as e:
+                    # Keep going without the LLM: append the user's side of the folded turns
+                    self.summary_failures += 1
+                    logger.warning(f"⚠️ Chat summary failed for {user_id}, keeping an extractive one: {e}")
+                    summary = (conversation.summary + "\n" + "\n".join(f"- User: {clip_tokens(m, 40)}" for m, _, _ in batch)).strip()
+
+                conversation.summary = clip_tokens(summary, CHAT_MEMORY_SUMMARY_TOKENS, keep_end=True)
+                del conversation.to_fold[:len(batch)]
+                await self._save_summary(user_id, conversation.summary, batch[-1][2])
+        finally:
+            conversation.folding = False
+
+    async def _save_summary(self, user_id: str, summary: str, turns_after: Optional[datetime]) -> None:
+        try:
+            await summary_collection.update_one(
+                {"_id": user_id},
+                # chat_history turns up to `turns_after` are in the summary; see _load
+                {"$set": {"summary": summary, "turns_after": turns_after, "updated_at": datetime.utcnow()}},
+                upsert=True,
+            )
+        except Exception as e:
+            logger.warning(f"⚠️ Could not save chat summary for {user_id}: {e}")
+
+    async def forget(self, user_id: str) -> None:
+        """Drop a user's memory (cached and stored), e.g. after /clear."""
+        with self._lock:
+            self._conversations.pop(user_id, None)
+        # A fold still running would save the cleared conversation's summary back
+        task = self._folds.pop(user_id, None)
+        if task is not None and not task.done():
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+        await summary_collection.delete_one({"_id": user_id})
+
+    def stats(self) -> Dict:
+        with self._lock:
+            users = len(self._conversations)
+        return {
+            "users": users,
+            "max_users": self.max_users,
+            "hits": self.hits,
+            "loads": self.loads,
+            "summaries": self.summaries,
+            "summary_failures": self.summary_failures,
+            "trimmed_turns": self.trimmed_turns,
+            "token_budget": CHAT_MEMORY_TOKEN_BUDGET,
+            "recent_turns": CHAT_MEMORY_RECENT_TURNS,
+        }
+
+
+# ✅ Shared memory for the chat router
+conversation_memory = ConversationMemory()
@@ -0,0 +1,153 @@
+# services/data_loader.py
+
+import asyncio
+import logging
+from collections import defaultdict
+from typing import Any, Callable, Dict, List, Optional
+
+from bson import ObjectId
+from bson.errors import InvalidId
+
+from services.data_service import users_collection, jobs_collection
+from utils.metrics import stage
+
+logger = logging.getLogger(__name__)
+
+# 🎯 Only the fields the GenAI features read; user documents carry the whole PDF,
+#    so never pull more of them than needed
+RESUME_PROJECTION = {"profile.resume": 1}
+JOB_PROJECTION = {
+    "title": 1,
+    "company": 1,
+    "location": 1,
+    "description": 1,
+    "requirements": 1,
+    "keywords": 1,
+}
+
+
+def _user_key(user_id: str):
+    # Same lookup rule as data_service.get_resume_binary_by_user_id
+    try:
+        return ObjectId(user_id)
+    except (InvalidId, TypeError):
+        return user_id
+
+
+def _job_key(job_id: str):
+    try:
+        return ObjectId(job_id)
+    except (InvalidId, TypeError):
+        return None
+
+
+def _resume_from_user(user: dict) -> Optional[bytes]:
+    return (user.get("profile") or {}).get("resume") or None
+
+
+def _job_from_doc(job: dict) -> dict:
+    job["_id"] = str(job["_id"])
+    return job
+
+
+class _Source:
+    def __init__(self, collection, projection: Dict, key: Callable, transform: Callable):
+        self.collection = collection
+        self.projection = projection
+        self.key = key
+        self.transform = transform
+
+
+class DataLoader:
+    """
+    Request-scoped loader for users' resumes and jobs.
+
+    - Memoized: each entity is read at most once per request, so a route
+      that validates the resume and job and then calls a module that needs
+      them again costs no extra round trips.
+    - Projected: only the fields in RESUME_PROJECTION / JOB_PROJECTION.
+    - Batched: lookups issued in the same event-loop tick (e.g. under
+      asyncio.gather) for the same collection become one `$in` query.
+
+    Create one per request (see get_data_loader); never share across requests.
+    """
+
+    def __init__(self):
+        self._sources = {
+            "resume": _Source(users_collection, RESUME_PROJECTION, _user_key, _resume_from_user),
+            "job": _Source(jobs_collection, JOB_PROJECTION, _job_key, _job_from_doc),
+        }
+        self._results: Dict[tuple, asyncio.Future] = {}
+        self._pending: Dict[str, Dict[str, asyncio.Future]] = defaultdict(dict)
+        self._tasks = set()
+        self.queries = 0
+        self.loads = 0
+        self.hits = 0
+
+    async def load_resume(self, user_id: str) -> Optional[bytes]:
+        """Resume PDF bytes for a user, or None."""
+        return await self._load("resume", user_id)
+
+    async def load_job(self, job_id: str) -> Optional[dict]:
+        """Projected job document (with string `_id`), or None."""
+        return await self._load("job", job_id)
+
+    async def load_jobs(self, job_ids: List[str]) -> Dict[str, dict]:
+        """{job_id: job} for the jobs that exist, fetched in one batched query."""
+        jobs = await asyncio.gather(*(self._load("job", job_id) for job_id in job_ids))
+        return {job_id: job for job_id, job in zip(job_ids, jobs) if job}
+
+    def _load(self, kind: str, entity_id: str) -> asyncio.Future:
+        self.loads += 1
+        cache_key = (kind, str(entity_id))
+        future = self._results.get(cache_key)
+        if future is not None:
+            self.hits += 1
+            return future
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._results[cache_key] = future
+
+        pending = self._pending[kind]
+        if not pending:
+            # First lookup this tick: dispatch once everyone else has queued theirs
+            loop.call_soon(self._dispatch, kind)
+        pending[str(entity_id)] = future
+        return future
+
+    def _dispatch(self, kind: str) -> None:
+        batch = self._pending.pop(kind, {})
+        if batch:
+            task = asyncio.ensure_future(self._fetch(kind, batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _fetch(self, kind: str, batch: Dict[str, asyncio.Future]) -> None:
+        source = self._sources[kind]
+        keys = {entity_id: source.key(entity_id) for entity_id in batch}
+        valid = list({str(key): key for key in keys.values() if key is not None}.values())
+        found: Dict[str, Any] = {}
+
+        try:
+            if valid:
+                self.queries += 1
+                query = {"_id": valid[0]} if len(valid) == 1 else {"_id": {"$in": valid}}
+                with stage(f"mongo.{kind}"):
+                    async for doc in source.collection.find(query, projection=source.projection):
+                        found[str(doc["_id"])] = source.transform(doc)
+        except Exception as e:
+            # Same contract as data_service: failures read as "not found"
+            print(f"❌ Exception in DataLoader ({kind}): {e}")
+
+        for entity_id, future in batch.items():
+            if not future.done():
+                future.set_result(found.get(str(keys[entity_id])))
+
+    def stats(self) -> Dict:
+        return {"loads": self.loads, "hits": self.hits, "queries": self.queries}
+
+
+def get_data_loader() -> DataLoader:
+    """FastAPI dependency: a fresh loader per request."""
+    return DataLoader()
@@ -1,22 +1,16 @@
-import os
 from bson import ObjectId
 from bson.errors import InvalidId
-from motor.motor_asyncio import AsyncIOMotorClient
-from dotenv import load_dotenv
 
-# 📥 Load environment variables
-load_dotenv()
-
-# 🔗 MongoDB connection setup
-MONGO_URI = os.getenv("MONGO_URI")
-client = AsyncIOMotorClient(MONGO_URI)
-db = client["jobportal"]
+# 🔗 Job portal database on the shared app-wide client (see db/mongo.py)
+from db.mongo import portal_db as db
+from utils.metrics import timed
 
 # 🗂️ Collections
 users_collection = db["users"]
 jobs_collection = db["jobs"]
 
 # 📄 ✅ Get Resume (binary PDF) from MongoDB
+@timed("mongo.resume")
 async def get_resume_binary_by_user_id(user_id: str) -> bytes:
     try:
         print(f"📌 Searching for user ID: {user_id}")
@@ -26,7 +20,7 @@ async def get_resume_binary_by_user_id(user_id: str) -> bytes:
         except InvalidId:
             query = {"_id": user_id}
 
-        user = await users_collection.find_one(query)
+        user = await users_collection.find_one(query, projection={"profile.resume": 1, "fullname": 1})
 
         if user:
             print(f"✅ Found user: {user.get('fullname', 'N/A')}")
@@ -48,6 +42,7 @@ async def get_resume_binary_by_user_id(user_id: str) -> bytes:
 
 
 # 💼 Get Job Description by Job ID
+@timed("mongo.job")
 async def get_job_by_id(job_id: str) -> dict:
     try:
         job = await jobs_collection.find_one({"_id": ObjectId(job_id)})
@@ -60,6 +55,7 @@ async def get_job_by_id(job_id: str) -> dict:
 
 
 # 📊 Get All Jobs from the Portal
+@timed("mongo.jobs")
 async def get_all_jobs() -> list:
     try:
         cursor = jobs_collection.find({})
@@ -72,3 +68,21 @@ async def get_all_jobs() -> list:
     except Exception as e:
         print(f"❌ Exception in get_all_jobs: {e}")
         return []
+
+
+# 🔄 Stream jobs with a cursor (no length cap), optionally only those updated since a timestamp
+async def iter_jobs(projection: dict = None, updated_since=None, batch_size: int = 500):
+    query = {"updatedAt": {"$gte": updated_since}} if updated_since else {}
+    cursor = jobs_collection.find(query, projection=projection, batch_size=batch_size)
+    async for job in cursor:
+        job["_id"] = str(job["_id"])
+        yield job
+
+
+# 🆔 All job IDs currently in the portal (used to detect deletions)
+async def get_all_job_ids() -> set:
+    ids = set()
+    async for job in jobs_collection.find({}, projection={"_id": 1}, batch_size=5000):
+        ids.add(str(job["_id"]))
+    return ids
+
@@ -1,67 +1,418 @@
 import os
-import requests
+import json
+import asyncio
+import sqlite3
+import hashlib
+import threading
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+import httpx
 from dotenv import load_dotenv
-from typing import List
-from langchain_community.vectorstores import Chroma
-from langchain.schema.document import Document
-from langchain.embeddings.base import Embeddings
+from langchain_core.embeddings import Embeddings
+
+from services.llm_gateway import GEMINI_API_BASE, post_with_retries, post_with_retries_sync
+from utils.metrics import stage, count_cache
 
 # Load environment variables
 load_dotenv()
 API_KEY = os.getenv("GEMINI_API_KEY")
 
-# Custom Gemini Embedding class
-class GeminiEmbeddings(Embeddings):
-    def __init__(self, api_key: str):
-        self.api_key = api_key
-        self.endpoint = "https://generativelanguage.googleapis.com/v1beta/models/embedding-001:embedContent"
+# ⚙️ Embedding provider: "gemini" (remote API) or "local" (CPU model in-process) (configurable via .env)
+EMBEDDING_PROVIDER = os.getenv("EMBEDDING_PROVIDER", "gemini").lower()
+
+# ⚙️ Embedding client tuning (configurable via .env)
+EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "models/embedding-001")
+EMBEDDING_BATCH_SIZE = int(os.getenv("EMBEDDING_BATCH_SIZE", "100"))  # Gemini batch limit
+EMBEDDING_CONCURRENCY = int(os.getenv("EMBEDDING_CONCURRENCY", "4"))
+EMBEDDING_TIMEOUT = float(os.getenv("EMBEDDING_TIMEOUT", "30"))
+EMBEDDING_CACHE_SIZE = int(os.getenv("EMBEDDING_CACHE_SIZE", "5000"))
+EMBEDDING_CACHE_PATH = os.getenv("EMBEDDING_CACHE_PATH", "")  # e.g. ./cache/embeddings.sqlite3
+
+# ⚙️ Local CPU model (configurable via .env)
+# all-MiniLM-L6-v2 runs on the ONNX runtime bundled with chromadb; any other
+# name is loaded with sentence-transformers (must be installed separately)
+LOCAL_EMBEDDING_MODEL = os.getenv("LOCAL_EMBEDDING_MODEL", "all-MiniLM-L6-v2")
+LOCAL_EMBEDDING_BATCH_SIZE = int(os.getenv("LOCAL_EMBEDDING_BATCH_SIZE", "32"))
+LOCAL_EMBEDDING_BATCH_WAIT_MS = float(os.getenv("LOCAL_EMBEDDING_BATCH_WAIT_MS", "5"))
+ONNX_MINILM_MODEL = "all-MiniLM-L6-v2"
+
+
+class EmbeddingCache:
+    """
+    Vector cache keyed by sha256(model + text).
+
+    In-memory LRU bounded by entry count, optionally backed by a SQLite file
+    so vectors survive restarts.
+    """
+
+    def __init__(self, max_entries: int, path: Optional[str] = None):
+        self.max_entries = max_entries
+        self.path = path or None
+        self._entries: "OrderedDict[str, List[float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+
+        self.hits = 0
+        self.misses = 0
+
+        if self.path:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            self._db = sqlite3.connect(self.path, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, vector TEXT NOT NULL)")
+            self._db.commit()
+
+    @staticmethod
+    def key(model: str, text: str) -> str:
+        return hashlib.sha256(f"{model}\0{text}".encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[List[float]]:
+        with self._lock:
+            vector = self._entries.get(key)
+            if vector is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return vector
+
+            if self._db is not None:
+                row = self._db.execute("SELECT vector FROM embeddings WHERE key = ?", (key,)).fetchone()
+                if row:
+                    vector = json.loads(row[0])
+                    self._remember(key, vector)
+                    self.hits += 1
+                    return vector
+
+            self.misses += 1
+            return None
+
+    def put_many(self, items: Dict[str, List[float]]) -> None:
+        with self._lock:
+            for key, vector in items.items():
+                self._remember(key, vector)
+            if self._db is not None and items:
+                self._db.executemany(
+                    "INSERT OR REPLACE INTO embeddings (key, vector) VALUES (?, ?)",
+                    [(key, json.dumps(vector)) for key, vector in items.items()],
+                )
+                self._db.commit()
+
+    def _remember(self, key: str, vector: List[float]) -> None:
+        self._entries[key] = vector
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "persistent": self._db is not None,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+
+class EmbeddingProvider(Embeddings, ABC):
+    """
+    Base for embedding backends: LangChain interface, de-duplication and the
+    vector cache. Subclasses only implement the batch fetches for texts that
+    missed the cache (a provider missing one cannot be instantiated).
+    """
+
+    provider = "base"
+
+    def __init__(self, model: str, cache: Optional[EmbeddingCache] = None):
+        self.model = model
+        self.cache = cache
+        self.dimensions: Optional[int] = None  # Learned from the first vector
+
+    # ---------- LangChain interface ----------
 
     def embed_documents(self, texts: List[str]) -> List[List[float]]:
-        return [self._get_embedding(text) for text in texts]
+        missing, resolve = self._plan(texts)
+        if missing:
+            resolve(self._fetch_batches_sync(missing))
+        return resolve(None)
 
     def embed_query(self, text: str) -> List[float]:
-        return self._get_embedding(text)
+        return self.embed_documents([text])[0]
 
-    def _get_embedding(self, text: str) -> List[float]:
-        json_data = {
-            "model": "models/embedding-001",
-            "content": {
-                "parts": [{"text": text}]
-            }
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        missing, resolve = self._plan(texts)
+        if missing:
+            resolve(await self._fetch_batches_async(missing))
+        return resolve(None)
+
+    async def aembed_query(self, text: str) -> List[float]:
+        return (await self.aembed_documents([text]))[0]
+
+    # ---------- embedding space ----------
+
+    async def aembedding_space(self) -> Dict:
+        """
+        {"embedding_model", "embedding_dimensions"} identifying which vectors
+        this provider produces. Embeds one short probe text if no vector has
+        been seen yet (cached like any other text).
+        """
+        if self.dimensions is None:
+            await self.aembed_query("embedding dimension probe")
+        return {"embedding_model": self.model, "embedding_dimensions": self.dimensions}
+
+    def stats(self) -> Dict:
+        return {"provider": self.provider, "model": self.model, "dimensions": self.dimensions}
+
+    # ---------- cache + dedup ----------
+
+    def _plan(self, texts: List[str]):
+        """
+        Split texts into cached vectors and unique texts that still need to be
+        embedded. Returns (missing_texts, resolve) where resolve(vectors)
+        records fetched vectors and resolve(None) returns the final list.
+        """
+        vectors: Dict[str, List[float]] = {}
+        missing: List[str] = []
+        for text in dict.fromkeys(texts):  # Ordered de-duplication
+            cached = self.cache.get(EmbeddingCache.key(self.model, text)) if self.cache else None
+            if cached is not None:
+                vectors[text] = cached
+            else:
+                missing.append(text)
+        count_cache("embedding", True, len(vectors))
+        count_cache("embedding", False, len(missing))
+
+        def resolve(fetched: Optional[List[List[float]]]):
+            if fetched is None:
+                result = [vectors[text] for text in texts]
+                if result and self.dimensions is None:
+                    self.dimensions = len(result[0])
+                return result
+            new_items = dict(zip(missing, fetched))
+            vectors.update(new_items)
+            if self.cache:
+                self.cache.put_many({EmbeddingCache.key(self.model, t): v for t, v in new_items.items()})
+            return None
+
+        return missing, resolve
+
+    @abstractmethod
+    def _fetch_batches_sync(self, texts: List[str]) -> List[List[float]]:
+        """Embed texts that missed the cache, blocking the calling thread."""
+
+    @abstractmethod
+    async def _fetch_batches_async(self, texts: List[str]) -> List[List[float]]:
+        """Embed texts that missed the cache without blocking the event loop."""
+
+
+# Custom Gemini Embedding class
+class GeminiEmbeddings(EmbeddingProvider):
+    """
+    Gemini embeddings with batching, connection reuse and a vector cache.
+
+    Texts are deduplicated, served from the cache where possible, and the
+    rest are sent through batchEmbedContents in chunks of EMBEDDING_BATCH_SIZE,
+    with up to EMBEDDING_CONCURRENCY chunks in flight at once.
+    """
+
+    provider = "gemini"
+
+    def __init__(self, api_key: str, model: str = EMBEDDING_MODEL, cache: Optional[EmbeddingCache] = None):
+        super().__init__(model if model.startswith("models/") else f"models/{model}", cache)
+        self.api_key = api_key
+        self.batch_path = f"/{self.model}:batchEmbedContents"
+        self._client: Optional[httpx.Client] = None
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._async_limit: Optional[asyncio.Semaphore] = None
+
+    # ---------- network ----------
+
+    def _batch_body(self, texts: List[str]) -> Dict:
+        return {
+            "requests": [
+                {"model": self.model, "content": {"parts": [{"text": text}]}}
+                for text in texts
+            ]
         }
 
-        response = requests.post(f"{self.endpoint}?key={self.api_key}", json=json_data)
-        if response.status_code != 200:
-            raise RuntimeError(f"Embedding request failed: {response.text}")
-        data = response.json()
-        return data["embedding"]["values"]
+    @staticmethod
+    def _parse_batch(data: Dict, expected: int) -> List[List[float]]:
+        embeddings = data.get("embeddings") or []
+        if len(embeddings) != expected:
+            raise RuntimeError(f"Embedding request returned {len(embeddings)} vectors for {expected} texts")
+        return [item["values"] for item in embeddings]
+
+    def _chunks(self, texts: List[str]) -> List[List[str]]:
+        return [texts[i:i + EMBEDDING_BATCH_SIZE] for i in range(0, len(texts), EMBEDDING_BATCH_SIZE)]
+
+    def _get_client(self) -> httpx.Client:
+        if self._client is None:
+            self._client = httpx.Client(
+                base_url=GEMINI_API_BASE,
+                headers={"x-goog-api-key": self.api_key or ""},
+                timeout=EMBEDDING_TIMEOUT,
+                limits=httpx.Limits(max_keepalive_connections=EMBEDDING_CONCURRENCY),
+            )
+            self._pool = ThreadPoolExecutor(max_workers=EMBEDDING_CONCURRENCY, thread_name_prefix="embed")
+        return self._client
+
+    def _post_batch_sync(self, texts: List[str]) -> List[List[float]]:
+        with stage("embedding.request"):
+            data = post_with_retries_sync(self._get_client(), self.batch_path, self._batch_body(texts), timeout=EMBEDDING_TIMEOUT)
+        return self._parse_batch(data, len(texts))
+
+    def _fetch_batches_sync(self, texts: List[str]) -> List[List[float]]:
+        chunks = self._chunks(texts)
+        if len(chunks) == 1:
+            return self._post_batch_sync(chunks[0])
+        self._get_client()
+        results = self._pool.map(self._post_batch_sync, chunks)
+        return [vector for chunk in results for vector in chunk]
+
+    async def _fetch_batches_async(self, texts: List[str]) -> List[List[float]]:
+        if self._async_limit is None:
+            self._async_limit = asyncio.Semaphore(EMBEDDING_CONCURRENCY)
+
+        async def fetch(chunk: List[str]) -> List[List[float]]:
+            async with self._async_limit:
+                with stage("embedding.request"):
+                    data = await post_with_retries(self.batch_path, self._batch_body(chunk), timeout=EMBEDDING_TIMEOUT)
+            return self._parse_batch(data, len(chunk))
+
+        results = await asyncio.gather(*(fetch(chunk) for chunk in self._chunks(texts)))
+        return [vector for chunk in results for vector in chunk]
+
+
+
+class LocalEmbeddings(EmbeddingProvider):
+    """
+    Embeddings from a small model running on this machine's CPU: no network
+    round trip, no API quota.
+
+    Inference runs on one dedicated thread (the runtime parallelises each
+    forward pass itself), so concurrent callers queue instead of
+    oversubscribing cores. Async callers are coalesced: texts arriving within
+    LOCAL_EMBEDDING_BATCH_WAIT_MS share one forward pass of up to
+    LOCAL_EMBEDDING_BATCH_SIZE texts.
+    """
+
+    provider = "local"
+
+    def __init__(self, model: str = LOCAL_EMBEDDING_MODEL, cache: Optional[EmbeddingCache] = None):
+        super().__init__(f"local/{model}", cache)
+        self.model_name = model
+        self._encoder = None
+        self._load_lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="embed-local")
+        self._pending: List = []  # (text, future) waiting for the next forward pass
+        self._flush_task: Optional[asyncio.Task] = None
+
+        self.forward_passes = 0
+        self.texts_embedded = 0
+
+    def _load(self):
+        """Load the model on first use (the ONNX model is downloaded once and cached on disk)."""
+        with self._load_lock:
+            if self._encoder is None:
+                if self.model_name == ONNX_MINILM_MODEL:
+                    from chromadb.utils.embedding_functions import ONNXMiniLM_L6_V2
+                    onnx_model = ONNXMiniLM_L6_V2(preferred_providers=["CPUExecutionProvider"])
+                    self._encoder = lambda texts: onnx_model(texts)
+                else:
+                    try:
+                        from sentence_transformers import SentenceTransformer
+                    except ImportError:
+                        raise RuntimeError(
+                            f"LOCAL_EMBEDDING_MODEL={self.model_name} needs sentence-transformers "
+                            f"(pip install sentence-transformers) or use {ONNX_MINILM_MODEL}"
+                        )
+                    st_model = SentenceTransformer(self.model_name, device="cpu")
+                    self._encoder = lambda texts: st_model.encode(
+                        texts, batch_size=LOCAL_EMBEDDING_BATCH_SIZE, normalize_embeddings=True
+                    )
+            return self._encoder
+
+    def _encode(self, texts: List[str]) -> List[List[float]]:
+        """One or more forward passes of at most LOCAL_EMBEDDING_BATCH_SIZE texts (runs on the inference thread)."""
+        encoder = self._load()
+        vectors: List[List[float]] = []
+        with stage("embedding.local"):
+            for i in range(0, len(texts), LOCAL_EMBEDDING_BATCH_SIZE):
+                vectors.extend([float(x) for x in vector] for vector in encoder(texts[i:i + LOCAL_EMBEDDING_BATCH_SIZE]))
+                self.forward_passes += 1
+        self.texts_embedded += len(texts)
+        return vectors
+
+    def _fetch_batches_sync(self, texts: List[str]) -> List[List[float]]:
+        return self._executor.submit(self._encode, texts).result()
+
+    async def _fetch_batches_async(self, texts: List[str]) -> List[List[float]]:
+        loop = asyncio.get_running_loop()
+        futures = []
+        for text in texts:
+            future = loop.create_future()
+            self._pending.append((text, future))
+            futures.append(future)
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self._flush_pending())
+        return list(await asyncio.gather(*futures))
+
+    async def _flush_pending(self) -> None:
+        """Drain queued texts in batches, giving concurrent callers a moment to join each batch."""
+        loop = asyncio.get_running_loop()
+        while self._pending:
+            if len(self._pending) < LOCAL_EMBEDDING_BATCH_SIZE:
+                await asyncio.sleep(LOCAL_EMBEDDING_BATCH_WAIT_MS / 1000)
+            batch = self._pending[:LOCAL_EMBEDDING_BATCH_SIZE]
+            del self._pending[:LOCAL_EMBEDDING_BATCH_SIZE]
+            try:
+                vectors = await loop.run_in_executor(self._executor, self._encode, [text for text, _ in batch])
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+            for (_, future), vector in zip(batch, vectors):
+                if not future.done():
+                    future.set_result(vector)
+
+    def stats(self) -> Dict:
+        return {
+            **super().stats(),
+            "loaded": self._encoder is not None,
+            "batch_size": LOCAL_EMBEDDING_BATCH_SIZE,
+            "forward_passes": self.forward_passes,
+            "texts_embedded": self.texts_embedded,
+            "queued": len(self._pending),
+        }
+
+
+def create_embedding_provider(provider: str = EMBEDDING_PROVIDER, cache: Optional[EmbeddingCache] = None) -> EmbeddingProvider:
+    """Embedding backend selected by EMBEDDING_PROVIDER."""
+    if provider == "gemini":
+        return GeminiEmbeddings(api_key=API_KEY, cache=cache)
+    if provider == "local":
+        return LocalEmbeddings(cache=cache)
+    raise ValueError(f"Unknown EMBEDDING_PROVIDER: {provider} (expected 'gemini' or 'local')")
 
 # ✅ Global embedding instance
-embedding_function = GeminiEmbeddings(api_key=API_KEY)
-
-# ✅ Persistent Chroma DB path
-CHROMA_PERSIST_DIR = "chroma_db"
-
-# ✅ Main function to get or create cached embedding collection
-def get_or_create_chroma(docs: List[Document], collection_name: str) -> Chroma:
-    try:
-        chroma = Chroma(
-            collection_name=collection_name,
-            embedding_function=embedding_function,
-            persist_directory=CHROMA_PERSIST_DIR
-        )
-        _ = chroma.get()["ids"]  # Force access to ensure it exists
-        return chroma
-    except Exception:
-        chroma = Chroma.from_documents(
-            documents=docs,
-            embedding=embedding_function,
-            collection_name=collection_name,
-            persist_directory=CHROMA_PERSIST_DIR
-        )
-        chroma.persist()
-        return chroma
+embedding_cache = EmbeddingCache(max_entries=EMBEDDING_CACHE_SIZE, path=EMBEDDING_CACHE_PATH)
+embedding_function = create_embedding_provider(cache=embedding_cache)
 
 # ✅ Utility for single-use embedding (used in recommender, cover letter, tips)
 def get_embedding(text: str) -> List[float]:
     return embedding_function.embed_query(text)
+
+# ✅ Async variant for request handlers — never blocks the event loop
+async def aget_embedding(text: str) -> List[float]:
+    return await embedding_function.aembed_query(text)
+
+# ✅ Embed many texts in batched, concurrent requests
+async def aget_embeddings(texts: List[str]) -> List[List[float]]:
+    return await embedding_function.aembed_documents(texts)
+
+# ✅ Model + dimensionality of the vectors above, recorded on each Chroma collection
+async def aembedding_space() -> Dict:
+    return await embedding_function.aembedding_space()
@@ -5,6 +5,18 @@ FAQ_RESPONSES = {
     "how to contact support": "You can contact support by emailing support@jobportal.com or using the 'Help' chat option."
 }
 
+# Intent (from services.intent_classifier) -> FAQ entry
+FAQ_INTENTS = {
+    "faq_apply": "how do i apply",
+    "faq_internships": "where can i find internships",
+    "faq_update_resume": "how do i update my resume",
+    "faq_support": "how to contact support",
+}
+
+def answer_faq_intent(intent: str) -> str:
+    """FAQ answer for a classified intent."""
+    return FAQ_RESPONSES.get(FAQ_INTENTS.get(intent), "I'm not sure about that. You can contact our support team for help.")
+
 def answer_faq(question: str) -> str:
     """
     Simple FAQ answer matching based on keyword detection.
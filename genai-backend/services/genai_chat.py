@@ -1,22 +1,9 @@
 # services/genai_chat.py
-import os
-from dotenv import load_dotenv
-from langchain.schema import HumanMessage
-from langchain_google_genai import ChatGoogleGenerativeAI
+from services.llm_gateway import generate_text
 
-load_dotenv()
-GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
-
-# ✅ Use Gemini Flash model
-llm = ChatGoogleGenerativeAI(
-    model="gemini-1.5-flash",  # ⚡ Faster + cheaper than gemini-pro
-    google_api_key=GEMINI_API_KEY
-)
-
-def get_genai_response(message: str) -> str:
+async def get_genai_response(message: str) -> str:
     try:
-        chat = [HumanMessage(content=message)]
-        response = llm.invoke(chat)
-        return response.content
+        # ⚡ gemini-1.5-flash via the shared async gateway
+        return await generate_text(message)
     except Exception as e:
         return f"⚠️ Error from GenAI: {str(e)}"
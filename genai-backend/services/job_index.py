@@ -0,0 +1,179 @@
+# services/job_index.py
+
+import os
+import re
+import time
+import asyncio
+import logging
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from dotenv import load_dotenv
+
+from services.data_service import iter_jobs, get_all_job_ids
+
+load_dotenv()
+logger = logging.getLogger(__name__)
+
+# ⚙️ How stale the index may get before the next read triggers a refresh
+JOB_INDEX_REFRESH_SECONDS = float(os.getenv("JOB_INDEX_REFRESH_SECONDS", "60"))
+MAX_PHRASE_TOKENS = 4  # Longest keyword phrase we index ("ci cd pipeline design")
+
+# Keeps tech tokens like "c++", "c#", "node.js" intact
+_TOKEN_RE = re.compile(r"[a-z0-9][a-z0-9+#.]*")
+
+JOB_PROJECTION = {
+    "title": 1,
+    "company": 1,
+    "location": 1,
+    "description": 1,
+    "keywords": 1,
+    "requirements": 1,
+    "updatedAt": 1,
+}
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word tokens with trailing sentence punctuation removed."""
+    return [token.rstrip(".") for token in _TOKEN_RE.findall((text or "").lower()) if token.rstrip(".")]
+
+
+def normalize_keyword(keyword: str) -> Tuple[str, ...]:
+    """A keyword phrase as a tuple of normalized tokens."""
+    return tuple(tokenize(keyword))
+
+
+def text_phrases(text: str, max_len: int = MAX_PHRASE_TOKENS) -> Set[Tuple[str, ...]]:
+    """All 1..max_len token n-grams in a text."""
+    tokens = tokenize(text)
+    phrases = set()
+    for n in range(1, max_len + 1):
+        for i in range(len(tokens) - n + 1):
+            phrases.add(tuple(tokens[i:i + n]))
+    return phrases
+
+
+def job_keywords(job: dict) -> List[str]:
+    """Keywords for a job: explicit `keywords`, else the recruiter's `requirements`."""
+    return [k for k in (job.get("keywords") or job.get("requirements") or []) if isinstance(k, str) and k.strip()]
+
+
+class KeywordIndex:
+    """
+    In-process inverted index: normalized keyword phrase -> job IDs.
+
+    Built once from the whole jobs collection with a cursor and then kept
+    current by polling `updatedAt` and diffing job IDs for deletions.
+    """
+
+    def __init__(self):
+        self.postings: Dict[Tuple[str, ...], Set[str]] = defaultdict(set)
+        self.job_terms: Dict[str, Set[Tuple[str, ...]]] = {}
+        self.jobs: Dict[str, dict] = {}
+        self.last_refresh: float = 0.0
+        self.last_updated_at: Optional[datetime] = None
+        self._lock = asyncio.Lock()
+
+    # ---------- maintenance ----------
+
+    def upsert_job(self, job: dict) -> None:
+        job_id = str(job["_id"])
+        self.remove_job(job_id)
+
+        terms = {normalize_keyword(k) for k in job_keywords(job)}
+        terms = {t for t in terms if t and len(t) <= MAX_PHRASE_TOKENS}
+        if not terms:
+            return
+
+        self.job_terms[job_id] = terms
+        for term in terms:
+            self.postings[term].add(job_id)
+        self.jobs[job_id] = {
+            "job_id": job_id,
+            "title": job.get("title"),
+            "company": str(job.get("company")) if job.get("company") is not None else None,
+            "location": job.get("location"),
+            "description": (job.get("description") or "")[:300],
+        }
+
+    def remove_job(self, job_id: str) -> None:
+        for term in self.job_terms.pop(job_id, ()):
+            ids = self.postings.get(term)
+            if ids is not None:
+                ids.discard(job_id)
+                if not ids:
+                    del self.postings[term]
+        self.jobs.pop(job_id, None)
+
+    async def refresh(self, full: bool = False) -> None:
+        """Load jobs changed since the last refresh (or everything) and drop deleted ones."""
+        started = time.perf_counter()
+        since = None if full else self.last_updated_at
+        changed = 0
+
+        async for job in iter_jobs(JOB_PROJECTION, updated_since=since):
+            self.upsert_job(job)
+            changed += 1
+            updated_at = job.get("updatedAt")
+            if updated_at and (self.last_updated_at is None or updated_at > self.last_updated_at):
+                self.last_updated_at = updated_at
+
+        removed = 0
+        if self.job_terms:
+            live_ids = await get_all_job_ids()
+            for job_id in [j for j in self.job_terms if j not in live_ids]:
+                self.remove_job(job_id)
+                removed += 1
+
+        self.last_refresh = time.time()
+        if changed or removed:
+            logger.info(
+                f"🗂️ Job index refreshed: {changed} upserted, {removed} removed, "
+                f"{len(self.jobs)} jobs / {len(self.postings)} terms in {time.perf_counter() - started:.3f}s"
+            )
+
+    async def ensure_fresh(self, max_age: float = JOB_INDEX_REFRESH_SECONDS) -> None:
+        """Refresh if the index is older than max_age; concurrent callers share one refresh."""
+        if time.time() - self.last_refresh < max_age:
+            return
+        async with self._lock:
+            if time.time() - self.last_refresh < max_age:
+                return
+            try:
+                await self.refresh(full=self.last_refresh == 0)
+            except Exception as e:
+                # Keep serving the current index; the next read retries
+                logger.error(f"❌ Job index refresh failed: {e}")
+
+    # ---------- querying ----------
+
+    def match(self, phrases: Iterable[Tuple[str, ...]]) -> Dict[str, int]:
+        """Count, per job, how many of its keywords appear in the given phrases."""
+        hits: Dict[str, int] = defaultdict(int)
+        for phrase in phrases:
+            for job_id in self.postings.get(phrase, ()):
+                hits[job_id] += 1
+        return hits
+
+    def score_text(self, text: str) -> List[dict]:
+        """
+        Score only the jobs sharing at least one keyword with the text.
+        Score is the percentage of a job's keywords found (0–100).
+        """
+        results = []
+        for job_id, matched in self.match(text_phrases(text)).items():
+            total = len(self.job_terms[job_id])
+            results.append({**self.jobs[job_id], "score": int((matched / total) * 100)})
+        return results
+
+    def stats(self) -> Dict:
+        return {
+            "jobs": len(self.jobs),
+            "terms": len(self.postings),
+            "last_refresh": self.last_refresh,
+        }
+
+
+# ✅ Shared index for the app
+job_keyword_index = KeywordIndex()
@@ -1,37 +1,100 @@
 # services/job_recommender.py
 
-# services/job_recommender.py
+import os
+import logging
+
+from typing import Optional
+
+from services.data_loader import DataLoader
+from services.embedding_service import aget_embedding
+from services.job_index import job_keyword_index
+from services.job_vectors import semantic_candidates, similarities_for
+from utils.pdf_parser import extract_text_async
+
+logger = logging.getLogger(__name__)
+
+# ⚙️ "keyword" (literal overlap), "semantic" (vector ANN) or "hybrid" (blend of both)
+RECOMMENDER_MODE = os.getenv("JOB_RECOMMENDER_MODE", "hybrid")
+SEMANTIC_WEIGHT = float(os.getenv("JOB_RECOMMENDER_SEMANTIC_WEIGHT", "0.6"))
+SEMANTIC_TOP_K = int(os.getenv("JOB_RECOMMENDER_TOP_K", "20"))
+MIN_SCORE = 50  # You can tweak this threshold
+
+
+async def _semantic_scores(resume_text: str, keyword_results: list) -> tuple:
+    """
+    Embed the resume once and return (top-k nearest jobs, similarities of
+    the best keyword matches outside that top-k). Empty if unavailable.
+    """
+    try:
+        resume_embedding = await aget_embedding(resume_text)
+        semantic_results = await semantic_candidates(resume_embedding, top_k=SEMANTIC_TOP_K)
+        found = {job["job_id"] for job in semantic_results}
+        best_keyword = sorted(keyword_results, key=lambda job: job["score"], reverse=True)[:SEMANTIC_TOP_K]
+        extra_ids = [job["job_id"] for job in best_keyword if job["job_id"] not in found]
+        return semantic_results, await similarities_for(resume_embedding, extra_ids)
+    except Exception as e:
+        logger.warning(f"⚠️ Semantic job search unavailable, using keywords only: {e}")
+        return [], {}
+
+
+def _blend(keyword_results: list, semantic_results: list, keyword_similarities: dict, semantic_weight: float) -> list:
+    """
+    Weighted blend of vector similarity and keyword score (both on a 0–100 scale).
 
-from services.data_service import get_all_jobs, get_resume_binary_by_user_id
-from utils.keyword_matcher import match_keywords
-from utils.pdf_parser import extract_text_from_pdf
+    Keyword matches outside the semantic top-k use their looked-up
+    similarity, so both terms are present. Jobs with no looked-up similarity
+    (no stored vector yet, or past the first SEMANTIC_TOP_K keyword matches)
+    keep their plain keyword score instead of a down-weighted one.
+    """
+    keyword_scores = {job["job_id"]: job for job in keyword_results}
+    blended = {}
 
-async def recommend_jobs(user_id: str):
-    resume_pdf = await get_resume_binary_by_user_id(user_id)
+    def weighted(similarity: float, keyword_score: float) -> int:
+        return int(round(semantic_weight * similarity * 100 + (1 - semantic_weight) * keyword_score))
+
+    for job in semantic_results:
+        keyword_score = keyword_scores.get(job["job_id"], {}).get("score", 0)
+        entry = {k: v for k, v in job.items() if k != "similarity"}
+        entry["score"] = weighted(job["similarity"], keyword_score)
+        blended[job["job_id"]] = entry
+
+    for job_id, similarity in keyword_similarities.items():
+        if job_id not in blended and job_id in keyword_scores:
+            blended[job_id] = {**keyword_scores[job_id], "score": weighted(similarity, keyword_scores[job_id]["score"])}
+
+    for job_id, job in keyword_scores.items():
+        if job_id not in blended:
+            blended[job_id] = job
+
+    return list(blended.values())
+
+
+async def recommend_jobs(user_id: str, mode: str = None, loader: Optional[DataLoader] = None):
+    mode = mode or RECOMMENDER_MODE
+    resume_pdf = await (loader or DataLoader()).load_resume(user_id)
     if not resume_pdf:
         return {"error": "No resume found for this user."}
 
-    resume_text = extract_text_from_pdf(resume_pdf)
-    all_jobs = await get_all_jobs()
+    resume_text = await extract_text_async(resume_pdf)
 
-    recommendations = []
+    # Only jobs sharing at least one keyword with the resume are scored
+    keyword_results = []
+    if mode in ("keyword", "hybrid"):
+        await job_keyword_index.ensure_fresh()
+        keyword_results = job_keyword_index.score_text(resume_text)
 
-    for job in all_jobs:
-        job_keywords = job.get("keywords", [])
-        if not job_keywords:
-            continue  # skip if job doesn't have keywords
+    candidates = keyword_results
+    if mode in ("semantic", "hybrid"):
+        semantic_results, keyword_similarities = await _semantic_scores(resume_text, keyword_results)
+        if semantic_results:
+            weight = 1.0 if mode == "semantic" else SEMANTIC_WEIGHT
+            candidates = _blend(keyword_results, semantic_results, keyword_similarities, weight)
+        elif mode == "semantic":
+            # No job vectors yet — fall back to keyword matching
+            await job_keyword_index.ensure_fresh()
+            candidates = job_keyword_index.score_text(resume_text)
 
-        score = match_keywords(resume_text, job_keywords)
-
-        if score >= 50:  # You can tweak this threshold
-            recommendations.append({
-                "job_id": str(job.get("_id")),
-                "title": job.get("title"),
-                "company": job.get("company"),
-                "location": job.get("location"),
-                "description": job.get("description", "")[:300],  # optional short desc
-                "score": score
-            })
+    recommendations = [job for job in candidates if job["score"] >= MIN_SCORE]
 
     if not recommendations:
         return {
@@ -44,4 +107,3 @@ async def recommend_jobs(user_id: str):
         "message": f"Top {min(5, len(recommendations))} job(s) recommended for user {user_id}",
         "recommendations": recommendations[:5]
     }
-
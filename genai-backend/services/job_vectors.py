@@ -0,0 +1,234 @@
+# services/job_vectors.py
+
+import os
+import time
+import asyncio
+import hashlib
+import argparse
+import logging
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from dotenv import load_dotenv
+
+from services.chroma_service import get_or_create_collection, embedding_collection
+from services.data_service import iter_jobs, get_all_job_ids
+from services.embedding_service import aget_embeddings, aembedding_space
+
+load_dotenv()
+logger = logging.getLogger(__name__)
+
+# ✅ Precomputed job embeddings, kept in sync with the `jobs` collection
+JOB_VECTOR_COLLECTION = os.getenv("JOB_VECTOR_COLLECTION", "job_embeddings")
+JOB_VECTOR_SYNC_SECONDS = float(os.getenv("JOB_VECTOR_SYNC_SECONDS", "300"))
+JOB_VECTOR_BATCH = 100
+
+JOB_PROJECTION = {
+    "title": 1,
+    "company": 1,
+    "location": 1,
+    "description": 1,
+    "keywords": 1,
+    "requirements": 1,
+    "updatedAt": 1,
+}
+
+_last_updated_at: Optional[datetime] = None
+_sync_lock = asyncio.Lock()
+_sync_task: Optional[asyncio.Task] = None
+
+
+async def _collection():
+    # Cosine distance so 1 - distance is a similarity in [0, 1] for these embeddings
+    space = await aembedding_space()
+    return await asyncio.to_thread(embedding_collection, JOB_VECTOR_COLLECTION, space, {"hnsw:space": "cosine"})
+
+
+def job_document(job: dict) -> str:
+    """Text embedded for a job: title, skills/requirements and description."""
+    skills = ", ".join(k for k in (job.get("keywords") or job.get("requirements") or []) if isinstance(k, str))
+    return "\n".join(part for part in [job.get("title") or "", skills, job.get("description") or ""] if part)
+
+
+def _job_metadata(job: dict, text_hash: str) -> Dict:
+    return {
+        "title": job.get("title") or "",
+        "company": str(job.get("company") or ""),
+        "location": job.get("location") or "",
+        "description": (job.get("description") or "")[:300],
+        "content_hash": text_hash,
+    }
+
+
+async def _flush(batch: List[dict]) -> int:
+    """Embed and upsert the jobs in batch whose text changed since they were stored."""
+    collection = await _collection()
+    docs = {job["_id"]: job_document(job) for job in batch}
+    hashes = {job_id: hashlib.sha256(text.encode("utf-8")).hexdigest() for job_id, text in docs.items()}
+
+    existing = await asyncio.to_thread(collection.get, ids=list(docs), include=["metadatas"])
+    stored = {
+        doc_id: (meta or {}).get("content_hash")
+        for doc_id, meta in zip(existing.get("ids") or [], existing.get("metadatas") or [])
+    }
+    changed = [job for job in batch if stored.get(job["_id"]) != hashes[job["_id"]] and docs[job["_id"]]]
+    if not changed:
+        return 0
+
+    vectors = await aget_embeddings([docs[job["_id"]] for job in changed])
+    await asyncio.to_thread(
+        collection.upsert,
+        ids=[job["_id"] for job in changed],
+        documents=[docs[job["_id"]] for job in changed],
+        embeddings=vectors,
+        metadatas=[_job_metadata(job, hashes[job["_id"]]) for job in changed],
+    )
+    return len(changed)
+
+
+async def sync_job_vectors(full: bool = False) -> Dict:
+    """
+    Bring the job embedding collection in line with Mongo.
+
+    Jobs updated since the last sync (all jobs when `full`) are re-embedded
+    only if their text changed; vectors for deleted jobs are removed.
+    """
+    global _last_updated_at
+    async with _sync_lock:
+        started = time.perf_counter()
+        collection = await _collection()
+        # An empty collection (first run, or recreated for a new embedding model) needs every job
+        if not full and await asyncio.to_thread(collection.count) == 0:
+            full = True
+        since = None if full else _last_updated_at
+        newest = _last_updated_at
+        seen = embedded = 0
+        batch: List[dict] = []
+
+        async for job in iter_jobs(JOB_PROJECTION, updated_since=since):
+            batch.append(job)
+            seen += 1
+            updated_at = job.get("updatedAt")
+            if updated_at and (newest is None or updated_at > newest):
+                newest = updated_at
+            if len(batch) >= JOB_VECTOR_BATCH:
+                embedded += await _flush(batch)
+                batch = []
+        if batch:
+            embedded += await _flush(batch)
+
+        live_ids = await get_all_job_ids()
+        stored_ids = (await asyncio.to_thread(collection.get, include=[])).get("ids") or []
+        removed = [doc_id for doc_id in stored_ids if doc_id not in live_ids]
+        if removed:
+            await asyncio.to_thread(collection.delete, ids=removed)
+
+        _last_updated_at = newest
+        result = {
+            "seen": seen,
+            "embedded": embedded,
+            "removed": len(removed),
+            "seconds": round(time.perf_counter() - started, 3),
+        }
+        if embedded or removed:
+            logger.info(f"🧬 Job vectors synced: {result}")
+        return result
+
+
+async def semantic_candidates(resume_embedding: List[float], top_k: int = 20) -> List[Dict]:
+    """
+    Top-k nearest jobs to a resume embedding (ANN query on the HNSW index).
+    Returns job summaries with `similarity` in [0, 1].
+    """
+    collection = await _collection()
+    result = await asyncio.to_thread(
+        collection.query,
+        query_embeddings=[resume_embedding],
+        n_results=top_k,
+        include=["metadatas", "distances"],
+    )
+    ids = (result.get("ids") or [[]])[0]
+    metadatas = (result.get("metadatas") or [[]])[0]
+    distances = (result.get("distances") or [[]])[0]
+
+    candidates = []
+    for job_id, meta, distance in zip(ids, metadatas, distances):
+        meta = meta or {}
+        candidates.append({
+            "job_id": job_id,
+            "title": meta.get("title"),
+            "company": meta.get("company"),
+            "location": meta.get("location"),
+            "description": meta.get("description", ""),
+            "similarity": max(0.0, min(1.0, 1.0 - distance)),
+        })
+    return candidates
+
+
+async def similarities_for(resume_embedding: List[float], job_ids: List[str]) -> Dict[str, float]:
+    """
+    Similarity in [0, 1] between a resume embedding and specific jobs (those
+    outside the ANN top-k). Jobs without a stored vector are left out.
+    """
+    if not job_ids:
+        return {}
+    collection = await _collection()
+    stored = await asyncio.to_thread(collection.get, ids=list(job_ids), include=["embeddings"])
+    embeddings = stored.get("embeddings")
+    if embeddings is None:
+        return {}
+
+    query_norm = sum(x * x for x in resume_embedding) ** 0.5
+    similarities = {}
+    for job_id, vector in zip(stored.get("ids") or [], embeddings):
+        vector = [float(x) for x in vector]
+        norm = sum(x * x for x in vector) ** 0.5
+        if not norm or not query_norm:
+            continue
+        cosine = sum(a * b for a, b in zip(resume_embedding, vector)) / (norm * query_norm)
+        similarities[job_id] = max(0.0, min(1.0, cosine))
+    return similarities
+
+
+def job_vector_count() -> int:
+    return get_or_create_collection(JOB_VECTOR_COLLECTION).count()
+
+
+async def _sync_loop() -> None:
+    full = True
+    while True:
+        try:
+            await sync_job_vectors(full=full)
+            full = False
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"❌ Job vector sync failed: {e}")
+        await asyncio.sleep(JOB_VECTOR_SYNC_SECONDS)
+
+
+def start_sync_loop() -> None:
+    """Start the periodic background sync (called from the app startup hook)."""
+    global _sync_task
+    if JOB_VECTOR_SYNC_SECONDS > 0 and (_sync_task is None or _sync_task.done()):
+        _sync_task = asyncio.create_task(_sync_loop())
+
+
+async def stop_sync_loop() -> None:
+    global _sync_task
+    if _sync_task is not None:
+        _sync_task.cancel()
+        try:
+            await _sync_task
+        except asyncio.CancelledError:
+            pass
+        _sync_task = None
+
+
+if __name__ == "__main__":
+    # python -m services.job_vectors sync   (bulk backfill of all job embeddings)
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description="Job embedding collection utilities")
+    parser.add_argument("command", choices=["sync"])
+    args = parser.parse_args()
+    print(asyncio.run(sync_job_vectors(full=True)))
@@ -0,0 +1,253 @@
+# services/llm_gateway.py
+
+import asyncio
+import logging
+import os
+import json
+import random
+import time
+from typing import AsyncIterator, Dict, Optional
+
+import httpx
+from dotenv import load_dotenv
+
+from utils.metrics import stage, record_llm_usage
+
+load_dotenv()
+logger = logging.getLogger(__name__)
+
+GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
+GEMINI_API_BASE = os.getenv("GEMINI_API_BASE", "https://generativelanguage.googleapis.com/v1beta")
+DEFAULT_MODEL = os.getenv("GEMINI_MODEL", "gemini-1.5-flash")
+
+# ⚙️ Gateway tuning (configurable via .env)
+LLM_TIMEOUT = float(os.getenv("LLM_TIMEOUT", "60"))
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "3"))
+LLM_BACKOFF_BASE = float(os.getenv("LLM_BACKOFF_BASE", "0.5"))
+LLM_MAX_CONNECTIONS = int(os.getenv("LLM_MAX_CONNECTIONS", "50"))
+LLM_MAX_KEEPALIVE = int(os.getenv("LLM_MAX_KEEPALIVE", "20"))
+
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+
+_client: Optional[httpx.AsyncClient] = None
+
+
+class LLMGatewayError(RuntimeError):
+    """Raised when Gemini cannot produce a response after all retries."""
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """
+    Shared keep-alive HTTP client for every call to the Gemini REST API.
+    Created lazily on first use and closed on app shutdown.
+    """
+    global _client
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(
+            base_url=GEMINI_API_BASE,
+            headers={"x-goog-api-key": GEMINI_API_KEY or ""},
+            timeout=httpx.Timeout(LLM_TIMEOUT, connect=10.0),
+            limits=httpx.Limits(
+                max_connections=LLM_MAX_CONNECTIONS,
+                max_keepalive_connections=LLM_MAX_KEEPALIVE,
+            ),
+        )
+    return _client
+
+
+async def close_http_client() -> None:
+    """Close the shared client (called from the app shutdown hook)."""
+    global _client
+    if _client is not None and not _client.is_closed:
+        await _client.aclose()
+    _client = None
+
+
+def _model_path(model: str) -> str:
+    return model if model.startswith("models/") else f"models/{model}"
+
+
+def build_request(
+    prompt: str,
+    temperature: Optional[float] = None,
+    max_output_tokens: Optional[int] = None,
+) -> Dict:
+    """Gemini generateContent request body for a single-turn text prompt."""
+    body: Dict = {"contents": [{"role": "user", "parts": [{"text": prompt}]}]}
+    generation_config = {}
+    if temperature is not None:
+        generation_config["temperature"] = temperature
+    if max_output_tokens is not None:
+        generation_config["maxOutputTokens"] = max_output_tokens
+    if generation_config:
+        body["generationConfig"] = generation_config
+    return body
+
+
+def extract_text(data: Dict) -> str:
+    """Concatenate the text parts of the first candidate in a Gemini response."""
+    candidates = data.get("candidates") or []
+    if not candidates:
+        reason = (data.get("promptFeedback") or {}).get("blockReason", "no candidates returned")
+        raise LLMGatewayError(f"Gemini returned no output ({reason})")
+    parts = (candidates[0].get("content") or {}).get("parts") or []
+    return "".join(part.get("text", "") for part in parts)
+
+
+def _backoff_delay(attempt: int, response: Optional[httpx.Response] = None) -> float:
+    if response is not None:
+        retry_after = response.headers.get("retry-after")
+        if retry_after and retry_after.isdigit():
+            return float(retry_after)
+    # Exponential backoff with full jitter
+    return random.uniform(0, LLM_BACKOFF_BASE * (2 ** attempt))
+
+
+async def post_with_retries(path: str, body: Dict, timeout: Optional[float] = None, retries: Optional[int] = None) -> Dict:
+    """
+    POST a JSON body to the Gemini API, retrying timeouts, connection errors,
+    429 and 5xx responses with exponential backoff.
+    """
+    client = get_http_client()
+    retries = LLM_MAX_RETRIES if retries is None else retries
+    last_error = None
+
+    for attempt in range(retries + 1):
+        response = None
+        try:
+            response = await client.post(path, json=body, timeout=timeout or LLM_TIMEOUT)
+            if response.status_code == 200:
+                return response.json()
+            last_error = f"HTTP {response.status_code}: {response.text[:300]}"
+            if response.status_code not in RETRYABLE_STATUS:
+                break
+        except (httpx.TimeoutException, httpx.TransportError) as e:
+            last_error = f"{type(e).__name__}: {e}"
+
+        if attempt < retries:
+            delay = _backoff_delay(attempt, response)
+            logger.warning(f"🔁 Gemini call to {path} failed ({last_error}); retry {attempt + 1}/{retries} in {delay:.2f}s")
+            await asyncio.sleep(delay)
+
+    raise LLMGatewayError(f"Gemini request failed: {last_error}")
+
+
+def post_with_retries_sync(client: httpx.Client, path: str, body: Dict, timeout: Optional[float] = None, retries: Optional[int] = None) -> Dict:
+    """
+    Blocking twin of post_with_retries, for callers on worker threads that
+    hold their own httpx.Client. Same retryable errors and backoff.
+    """
+    retries = LLM_MAX_RETRIES if retries is None else retries
+    last_error = None
+
+    for attempt in range(retries + 1):
+        response = None
+        try:
+            response = client.post(path, json=body, timeout=timeout or LLM_TIMEOUT)
+            if response.status_code == 200:
+                return response.json()
+            last_error = f"HTTP {response.status_code}: {response.text[:300]}"
+            if response.status_code not in RETRYABLE_STATUS:
+                break
+        except (httpx.TimeoutException, httpx.TransportError) as e:
+            last_error = f"{type(e).__name__}: {e}"
+
+        if attempt < retries:
+            delay = _backoff_delay(attempt, response)
+            logger.warning(f"🔁 Gemini call to {path} failed ({last_error}); retry {attempt + 1}/{retries} in {delay:.2f}s")
+            time.sleep(delay)
+
+    raise LLMGatewayError(f"Gemini request failed: {last_error}")
+
+
+async def generate_text(
+    prompt: str,
+    model: str = DEFAULT_MODEL,
+    temperature: Optional[float] = None,
+    max_output_tokens: Optional[int] = None,
+    timeout: Optional[float] = None,
+    retries: Optional[int] = None,
+) -> str:
+    """
+    Generate a completion for a single prompt.
+
+    Args:
+        prompt (str): Full prompt text.
+        model (str): Gemini model name, with or without the "models/" prefix.
+        temperature / max_output_tokens: Optional generation settings.
+        timeout (float): Per-attempt timeout in seconds.
+        retries (int): Retry attempts for transient failures.
+
+    Returns:
+        str: Generated text (stripped).
+    """
+    body = build_request(prompt, temperature, max_output_tokens)
+    with stage("llm.generate"):
+        data = await post_with_retries(f"/{_model_path(model)}:generateContent", body, timeout, retries)
+    record_llm_usage(model, data)
+    return extract_text(data).strip()
+
+
+
+async def stream_text(
+    prompt: str,
+    model: str = DEFAULT_MODEL,
+    temperature: Optional[float] = None,
+    max_output_tokens: Optional[int] = None,
+    timeout: Optional[float] = None,
+    retries: Optional[int] = None,
+) -> AsyncIterator[str]:
+    """
+    Stream a completion as text chunks (streamGenerateContent over SSE).
+
+    Transient failures are retried only until the first chunk arrives.
+    Closing the generator (e.g. the client disconnected) closes the upstream
+    HTTP stream, which cancels the generation.
+    """
+    client = get_http_client()
+    body = build_request(prompt, temperature, max_output_tokens)
+    path = f"/{_model_path(model)}:streamGenerateContent"
+    retries = LLM_MAX_RETRIES if retries is None else retries
+    last_error = None
+    usage = None
+
+    with stage("llm.stream"):
+        for attempt in range(retries + 1):
+            started = False
+            response = None
+            try:
+                async with client.stream("POST", path, params={"alt": "sse"}, json=body, timeout=timeout or LLM_TIMEOUT) as response:
+                    if response.status_code != 200:
+                        await response.aread()
+                        last_error = f"HTTP {response.status_code}: {response.text[:300]}"
+                        if response.status_code not in RETRYABLE_STATUS:
+                            break
+                    else:
+                        async for line in response.aiter_lines():
+                            if not line.startswith("data:"):
+                                continue
+                            payload = line[len("data:"):].strip()
+                            if not payload:
+                                continue
+                            data = json.loads(payload)
+                            # Usage is cumulative; the last chunk that has it carries the totals
+                            usage = data.get("usageMetadata") or usage
+                            if not data.get("candidates") and not data.get("promptFeedback"):
+                                continue  # e.g. a trailing usage-only chunk
+                            chunk = extract_text(data)
+                            if chunk:
+                                started = True
+                                yield chunk
+                        record_llm_usage(model, {"usageMetadata": usage})
+                        return
+            except (httpx.TimeoutException, httpx.TransportError) as e:
+                if started:
+                    raise LLMGatewayError(f"Gemini stream interrupted: {e}")
+                last_error = f"{type(e).__name__}: {e}"
+
+            if attempt < retries:
+                delay = _backoff_delay(attempt, response)
+                logger.warning(f"🔁 Gemini stream to {path} failed ({last_error}); retry {attempt + 1}/{retries} in {delay:.2f}s")
+                await asyncio.sleep(delay)
+
+        raise LLMGatewayError(f"Gemini request failed: {last_error}")
@@ -0,0 +1,202 @@
+# services/match_store.py
+
+import os
+import time
+import asyncio
+import hashlib
+import argparse
+import logging
+from typing import Dict, List
+
+from dotenv import load_dotenv
+
+from services.chroma_service import upsert_embeddings, get_documents, embedding_collection
+from services.embedding_service import aget_embeddings, aembedding_space
+
+load_dotenv()
+logger = logging.getLogger(__name__)
+
+# ✅ One shared collection for every (user, job) match instead of one per pair
+MATCH_COLLECTION = os.getenv("MATCH_COLLECTION", "resume_jd_matches")
+
+# Where the old per-pair "match_{user_id}_{job_id}" collections were persisted
+LEGACY_MATCH_DIR = os.getenv("LEGACY_MATCH_DIR", "chroma_db")
+LEGACY_PREFIX = "match_"
+
+DOC_RESUME = "resume"
+DOC_JOB = "job_description"
+
+
+def content_hash(text: str) -> str:
+    """SHA-256 of a document's text, stored in metadata to detect changes."""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def match_doc_id(user_id: str, job_id: str, doc_type: str) -> str:
+    """Deterministic ID, so re-writing a pair replaces its documents in place."""
+    return f"{user_id}:{job_id}:{doc_type}"
+
+
+def _pair_filter(user_id: str, job_id: str) -> Dict:
+    return {"$and": [{"user_id": user_id}, {"job_id": job_id}]}
+
+
+async def ensure_match_documents(user_id: str, job_id: str, resume_text: str, job_description: str) -> Dict:
+    """
+    Make sure the shared match collection holds the current resume and JD
+    embeddings for this pair.
+
+    Existing entries are found with a metadata-filtered get; only documents
+    whose content hash changed are embedded and upserted.
+
+    Returns:
+        dict: {"written": [...doc types...], "cached": bool}
+    """
+    docs = {DOC_RESUME: resume_text, DOC_JOB: job_description}
+    hashes = {doc_type: content_hash(text) for doc_type, text in docs.items()}
+
+    # Vectors from another embedding model are dropped here, so their hashes can't hide them
+    await asyncio.to_thread(embedding_collection, MATCH_COLLECTION, await aembedding_space())
+    existing = await asyncio.to_thread(get_documents, MATCH_COLLECTION, _pair_filter(user_id, job_id))
+    stored = {
+        meta.get("doc_type"): meta.get("content_hash")
+        for meta in (existing.get("metadatas") or [])
+        if meta
+    }
+
+    pending = [doc_type for doc_type in docs if stored.get(doc_type) != hashes[doc_type]]
+    if not pending:
+        return {"written": [], "cached": True}
+
+    vectors = await aget_embeddings([docs[doc_type] for doc_type in pending])
+    await asyncio.to_thread(
+        upsert_embeddings,
+        MATCH_COLLECTION,
+        [match_doc_id(user_id, job_id, doc_type) for doc_type in pending],
+        [docs[doc_type] for doc_type in pending],
+        vectors,
+        [
+            {
+                "user_id": user_id,
+                "job_id": job_id,
+                "doc_type": doc_type,
+                "content_hash": hashes[doc_type],
+                "created_at": time.time(),
+            }
+            for doc_type in pending
+        ],
+    )
+    return {"written": pending, "cached": False}
+
+
+# ============== MIGRATION ==============
+
+def _collection_names(client) -> List[str]:
+    # Chroma >= 0.6 returns names, older versions return Collection objects
+    return [getattr(c, "name", c) for c in client.list_collections()]
+
+
+def migrate_legacy_collections(space: Dict, legacy_dir: str = LEGACY_MATCH_DIR, delete: bool = True) -> Dict:
+    """
+    Fold the per-pair "match_{user_id}_{job_id}" collections into MATCH_COLLECTION.
+
+    Legacy collections were created by LangChain with [resume, job description]
+    in that order and no metadata, so doc types are assigned by position.
+    Existing embeddings are copied as-is; nothing is re-embedded, so pairs
+    whose vectors don't match `space` (the current embedding model) are not
+    copied and get embedded on their next match instead.
+
+    With `delete`, every legacy collection with nothing worth copying (empty,
+    or vectors from another model) is dropped as well and counted separately,
+    so a second run finds nothing left. Without it they are only skipped.
+    """
+    if not os.path.isdir(legacy_dir):
+        return {
+            "migrated": 0, "skipped": 0, "deleted": 0, "deleted_empty": 0, "deleted_mismatched": 0,
+            "message": f"No legacy directory at {legacy_dir}",
+        }
+
+    import chromadb
+
+    legacy_client = chromadb.PersistentClient(path=legacy_dir)
+    embedding_collection(MATCH_COLLECTION, space)
+    migrated = skipped = deleted = deleted_empty = deleted_mismatched = 0
+
+    for name in _collection_names(legacy_client):
+        if not name.startswith(LEGACY_PREFIX):
+            continue
+
+        user_id, _, job_id = name[len(LEGACY_PREFIX):].partition("_")
+        if not user_id or not job_id:
+            logger.warning(f"⚠️ Skipping collection with unexpected name: {name}")
+            skipped += 1
+            continue
+
+        data = legacy_client.get_collection(name).get(include=["documents", "embeddings"])
+        documents = data.get("documents") or []
+        embeddings = data.get("embeddings")
+        if not documents or embeddings is None or len(embeddings) != len(documents):
+            if delete:
+                legacy_client.delete_collection(name)
+                deleted_empty += 1
+                logger.info(f"🗑️ Deleted {name}: no documents or embeddings to copy")
+            else:
+                logger.warning(f"⚠️ Skipping {name}: no documents or embeddings to copy")
+                skipped += 1
+            continue
+        if len(embeddings[0]) != space["embedding_dimensions"]:
+            reason = f"{len(embeddings[0])}-dim vectors, current model has {space['embedding_dimensions']}"
+            if delete:
+                legacy_client.delete_collection(name)
+                deleted_mismatched += 1
+                logger.info(f"🗑️ Deleted {name}: {reason}")
+            else:
+                logger.warning(f"⚠️ Skipping {name}: {reason}")
+                skipped += 1
+            continue
+
+        doc_types = [DOC_RESUME, DOC_JOB][:len(documents)]
+        upsert_embeddings(
+            MATCH_COLLECTION,
+            [match_doc_id(user_id, job_id, doc_type) for doc_type in doc_types],
+            documents[:len(doc_types)],
+            [list(vector) for vector in embeddings[:len(doc_types)]],
+            [
+                {
+                    "user_id": user_id,
+                    "job_id": job_id,
+                    "doc_type": doc_type,
+                    "content_hash": content_hash(text),
+                    "created_at": time.time(),
+                }
+                for doc_type, text in zip(doc_types, documents)
+            ],
+        )
+        migrated += 1
+
+        if delete:
+            legacy_client.delete_collection(name)
+            deleted += 1
+        logger.info(f"📦 Migrated {name}")
+
+    return {
+        "migrated": migrated,
+        "skipped": skipped,
+        "deleted": deleted,
+        "deleted_empty": deleted_empty,
+        "deleted_mismatched": deleted_mismatched,
+    }
+
+
+if __name__ == "__main__":
+    # python -m services.match_store migrate [--legacy-dir chroma_db] [--keep]
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description="Shared resume/JD match collection utilities")
+    sub = parser.add_subparsers(dest="command", required=True)
+    migrate = sub.add_parser("migrate", help="Fold per-pair match_* collections into the shared collection")
+    migrate.add_argument("--legacy-dir", default=LEGACY_MATCH_DIR)
+    migrate.add_argument("--keep", action="store_true", help="Do not delete legacy collections (copied, empty or from another model)")
+    args = parser.parse_args()
+
+    if args.command == "migrate":
+        print(migrate_legacy_collections(asyncio.run(aembedding_space()), args.legacy_dir, delete=not args.keep))
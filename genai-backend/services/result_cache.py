@@ -0,0 +1,168 @@
+# services/result_cache.py
+
+import os
+import time
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional
+
+from dotenv import load_dotenv
+
+from db.mongo import db
+from utils.metrics import count_cache
+
+load_dotenv()
+logger = logging.getLogger(__name__)
+
+# ⚙️ Result cache settings (configurable via .env)
+RESULT_CACHE_TTL_SECONDS = int(os.getenv("LLM_RESULT_CACHE_TTL_SECONDS", str(7 * 24 * 3600)))
+RESULT_CACHE_MEMORY_ENTRIES = int(os.getenv("LLM_RESULT_CACHE_MEMORY_ENTRIES", "1000"))
+RESULT_CACHE_ENABLED = os.getenv("LLM_RESULT_CACHE_ENABLED", "true").lower() != "false"
+
+result_cache_collection = db.llm_result_cache
+
+
+def prompt_version(template: str, model: str, **params) -> str:
+    """
+    Version tag for a prompt: hash of the template text, model and generation
+    settings. Editing any of them changes every key that uses it.
+    """
+    raw = "\0".join([template, model] + [f"{k}={params[k]}" for k in sorted(params)])
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()[:16]
+
+
+def text_hash(text: str) -> str:
+    return hashlib.sha256((text or "").encode("utf-8")).hexdigest()
+
+
+def result_key(feature: str, resume_hash: str, jd_hash: str, version: str) -> str:
+    """Cache key for (feature, resume content, job description, prompt/model version)."""
+    return hashlib.sha256(f"{feature}\0{resume_hash}\0{jd_hash}\0{version}".encode("utf-8")).hexdigest()
+
+
+class ResultCache:
+    """
+    Cache for deterministic LLM feature results.
+
+    In-process LRU in front of a Mongo collection whose documents expire via a
+    TTL index on `expires_at`. Mongo failures are logged and treated as misses,
+    so the cache can never break a feature.
+    """
+
+    def __init__(self, collection, max_memory_entries: int, ttl_seconds: int):
+        self.collection = collection
+        self.max_memory_entries = max_memory_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()  # key -> (expires_at_epoch, value)
+        self._lock = threading.Lock()
+
+        self.memory_hits = 0
+        self.mongo_hits = 0
+        self.misses = 0
+        self.bypassed = 0
+
+    async def ensure_indexes(self) -> None:
+        """TTL expiry plus a feature index for invalidation/inspection."""
+        try:
+            await self.collection.create_index("expires_at", expireAfterSeconds=0)
+            await self.collection.create_index("feature")
+        except Exception as e:
+            logger.warning(f"⚠️ Could not create result cache indexes: {e}")
+
+    async def get(self, key: str) -> Optional[Any]:
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[0] > now:
+                    self._entries.move_to_end(key)
+                    self.memory_hits += 1
+                    return entry[1]
+                del self._entries[key]
+
+        try:
+            doc = await self.collection.find_one({"_id": key}, projection={"value": 1, "expires_at": 1})
+        except Exception as e:
+            logger.warning(f"⚠️ Result cache read failed: {e}")
+            doc = None
+
+        # The TTL monitor runs about once a minute, so check expiry ourselves too
+        if doc and doc.get("expires_at") and doc["expires_at"] > datetime.utcnow():
+            self._remember(key, doc["value"], now + (doc["expires_at"] - datetime.utcnow()).total_seconds())
+            with self._lock:
+                self.mongo_hits += 1
+            return doc["value"]
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    async def set(self, key: str, feature: str, value: Any, ttl_seconds: Optional[int] = None) -> None:
+        ttl = ttl_seconds or self.ttl_seconds
+        self._remember(key, value, time.time() + ttl)
+        try:
+            await self.collection.replace_one(
+                {"_id": key},
+                {
+                    "_id": key,
+                    "feature": feature,
+                    "value": value,
+                    "created_at": datetime.utcnow(),
+                    "expires_at": datetime.utcnow() + timedelta(seconds=ttl),
+                },
+                upsert=True,
+            )
+        except Exception as e:
+            logger.warning(f"⚠️ Result cache write failed: {e}")
+
+    def note_bypass(self) -> None:
+        with self._lock:
+            self.bypassed += 1
+
+    def _remember(self, key: str, value: Any, expires_at: float) -> None:
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_memory_entries:
+                self._entries.popitem(last=False)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "enabled": RESULT_CACHE_ENABLED,
+                "memory_entries": len(self._entries),
+                "memory_hits": self.memory_hits,
+                "mongo_hits": self.mongo_hits,
+                "misses": self.misses,
+                "bypassed": self.bypassed,
+            }
+
+
+# ✅ Shared cache for JD match, cover letter and resume tips results
+result_cache = ResultCache(
+    result_cache_collection,
+    max_memory_entries=RESULT_CACHE_MEMORY_ENTRIES,
+    ttl_seconds=RESULT_CACHE_TTL_SECONDS,
+)
+
+
+async def cached_result(feature: str, key: str, refresh: bool = False) -> Optional[Any]:
+    """Look up a result unless the caller asked to bypass/refresh the cache."""
+    if not RESULT_CACHE_ENABLED:
+        return None
+    if refresh:
+        result_cache.note_bypass()
+        return None
+    value = await result_cache.get(key)
+    count_cache(f"llm_result.{feature}", value is not None)
+    if value is not None:
+        logger.info(f"⚡ {feature} served from result cache.")
+    return value
+
+
+async def store_result(feature: str, key: str, value: Any) -> None:
+    if RESULT_CACHE_ENABLED:
+        await result_cache.set(key, feature, value)
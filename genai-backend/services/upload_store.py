@@ -0,0 +1,175 @@
+# services/upload_store.py
+
+import os
+import re
+import time
+import uuid
+import asyncio
+import hashlib
+import logging
+from typing import Dict, Optional
+
+from dotenv import load_dotenv
+from fastapi import UploadFile
+
+from services.embedding_service import aget_embedding
+from utils.pdf_parser import extract_text_async
+
+load_dotenv()
+logger = logging.getLogger(__name__)
+
+# ⚙️ Upload limits and retention (configurable via .env)
+UPLOAD_DIR = os.getenv("UPLOAD_DIR", "uploaded_resumes")
+UPLOAD_MAX_BYTES = int(float(os.getenv("UPLOAD_MAX_MB", "5")) * 1024 * 1024)
+UPLOAD_CHUNK_BYTES = 256 * 1024
+UPLOAD_MAX_AGE_DAYS = float(os.getenv("UPLOAD_MAX_AGE_DAYS", "7"))
+UPLOAD_DISK_BUDGET_BYTES = int(float(os.getenv("UPLOAD_DISK_BUDGET_MB", "512")) * 1024 * 1024)
+UPLOAD_EVICT_INTERVAL_SECONDS = 600
+
+_SAFE_EXT_RE = re.compile(r"^\.[a-z0-9]{1,8}$")
+_last_eviction = 0.0
+
+
+class UploadTooLargeError(ValueError):
+    """Raised when an upload exceeds UPLOAD_MAX_BYTES."""
+
+
+def _extension(filename: Optional[str]) -> str:
+    ext = os.path.splitext(filename or "")[1].lower()
+    return ext if _SAFE_EXT_RE.match(ext) else ".pdf"
+
+
+def _commit_upload(tmp_path: str, final_path: str) -> bool:
+    """Move the temp file into place, or drop it if that content is already stored. Returns True for a duplicate."""
+    if os.path.exists(final_path):
+        os.remove(tmp_path)
+        os.utime(final_path)
+        return True
+    os.replace(tmp_path, final_path)
+    return False
+
+
+def _discard(path: str) -> None:
+    if os.path.exists(path):
+        os.remove(path)
+
+
+async def save_upload(upload: UploadFile, max_bytes: int = UPLOAD_MAX_BYTES) -> Dict:
+    """
+    Stream an upload to disk in chunks, hashing as it goes.
+
+    Files are stored as <sha256><ext>, so re-uploading the same document
+    reuses the existing file (its mtime is refreshed to keep it from being
+    evicted). Raises UploadTooLargeError past max_bytes; nothing is kept.
+
+    Returns:
+        dict: {"filename", "sha256", "size", "path", "duplicate"}
+    """
+    await asyncio.to_thread(os.makedirs, UPLOAD_DIR, exist_ok=True)
+    tmp_path = os.path.join(UPLOAD_DIR, f".upload-{uuid.uuid4().hex}.tmp")
+    digest = hashlib.sha256()
+    size = 0
+
+    try:
+        out = await asyncio.to_thread(open, tmp_path, "wb")
+        try:
+            while True:
+                chunk = await upload.read(UPLOAD_CHUNK_BYTES)
+                if not chunk:
+                    break
+                size += len(chunk)
+                if size > max_bytes:
+                    raise UploadTooLargeError(f"File is larger than {max_bytes / (1024 * 1024):g} MB.")
+                digest.update(chunk)
+                await asyncio.to_thread(out.write, chunk)
+        finally:
+            await asyncio.to_thread(out.close)
+
+        sha256 = digest.hexdigest()
+        final_path = os.path.join(UPLOAD_DIR, sha256 + _extension(upload.filename))
+        duplicate = await asyncio.to_thread(_commit_upload, tmp_path, final_path)
+    except BaseException:
+        await asyncio.shield(asyncio.to_thread(_discard, tmp_path))
+        raise
+
+    await asyncio.to_thread(maybe_evict)
+    return {
+        "filename": upload.filename,
+        "sha256": sha256,
+        "size": size,
+        "path": final_path,
+        "duplicate": duplicate,
+    }
+
+
+def _read_file(path: str) -> bytes:
+    with open(path, "rb") as f:
+        return f.read()
+
+
+async def warm_resume_pipeline(path: str) -> None:
+    """
+    Background warm-up for a freshly uploaded resume: extract text (text
+    cache) and embed it (embedding cache), so follow-up requests for the
+    same PDF skip the expensive steps.
+    """
+    started = time.perf_counter()
+    try:
+        pdf_bytes = await asyncio.to_thread(_read_file, path)
+        resume_text = await extract_text_async(pdf_bytes)
+        if not resume_text:
+            return
+        await aget_embedding(resume_text)
+        logger.info(f"🔥 Warmed resume pipeline for {os.path.basename(path)} in {time.perf_counter() - started:.2f}s")
+    except Exception as e:
+        # Warm-up is best effort; the real request will surface any error
+        logger.warning(f"⚠️ Resume warm-up failed for {os.path.basename(path)}: {e}")
+
+
+def evict_uploads(
+    max_age_days: float = UPLOAD_MAX_AGE_DAYS,
+    budget_bytes: int = UPLOAD_DISK_BUDGET_BYTES,
+) -> Dict:
+    """Delete uploads older than max_age_days, then oldest-first until under budget."""
+    if not os.path.isdir(UPLOAD_DIR):
+        return {"deleted": 0, "bytes": 0}
+
+    entries = []
+    for name in os.listdir(UPLOAD_DIR):
+        path = os.path.join(UPLOAD_DIR, name)
+        try:
+            stat = os.stat(path)
+        except OSError:
+            continue
+        if os.path.isfile(path):
+            entries.append((stat.st_mtime, stat.st_size, path))
+
+    entries.sort()
+    cutoff = time.time() - max_age_days * 86400
+    total = sum(size for _, size, _ in entries)
+    deleted = 0
+    for mtime, size, path in entries:
+        if mtime >= cutoff and total <= budget_bytes:
+            break
+        try:
+            os.remove(path)
+            total -= size
+            deleted += 1
+        except OSError:
+            continue
+
+    if deleted:
+        logger.info(f"🧹 Evicted {deleted} uploaded resume(s); {total} bytes remain.")
+    return {"deleted": deleted, "bytes": total}
+
+
+def maybe_evict() -> None:
+    """Run eviction at most once per UPLOAD_EVICT_INTERVAL_SECONDS."""
+    global _last_eviction
+    if time.time() - _last_eviction < UPLOAD_EVICT_INTERVAL_SECONDS:
+        return
+    _last_eviction = time.time()
+    try:
+        evict_uploads()
+    except Exception as e:
+        logger.warning(f"⚠️ Upload eviction failed: {e}")
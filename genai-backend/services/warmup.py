@@ -0,0 +1,117 @@
+# services/warmup.py
+
+import os
+import time
+import asyncio
+import logging
+from typing import Dict, Optional
+
+from dotenv import load_dotenv
+
+from db.mongo import db, portal_db
+from services.chroma_service import get_chroma_client
+from services.embedding_service import embedding_function
+from services.job_vectors import JOB_VECTOR_COLLECTION
+from services.llm_gateway import get_http_client, DEFAULT_MODEL
+from services.match_store import MATCH_COLLECTION
+from utils.metrics import stage
+
+load_dotenv()
+logger = logging.getLogger(__name__)
+
+# ⚙️ Warm-up before the app starts serving (configurable via .env)
+WARMUP_ON_STARTUP = os.getenv("WARMUP_ON_STARTUP", "false").lower() == "true"
+WARMUP_TIMEOUT = float(os.getenv("WARMUP_TIMEOUT", "20"))  # Per step
+WARMUP_CONNECTIONS = int(os.getenv("WARMUP_CONNECTIONS", "4"))  # Mongo / Gemini sockets opened up front
+
+
+async def _warm_mongo() -> Dict:
+    """Open several pooled connections to both databases."""
+    await asyncio.gather(*(
+        (db if i % 2 == 0 else portal_db).command("ping") for i in range(WARMUP_CONNECTIONS)
+    ))
+    return {"connections": WARMUP_CONNECTIONS}
+
+
+async def _warm_llm() -> Dict:
+    """TLS handshakes to the Gemini API on the shared client (a model lookup, no tokens)."""
+    model = DEFAULT_MODEL if DEFAULT_MODEL.startswith("models/") else f"models/{DEFAULT_MODEL}"
+    responses = await asyncio.gather(*(get_http_client().get(f"/{model}") for _ in range(WARMUP_CONNECTIONS)))
+    return {"connections": WARMUP_CONNECTIONS, "status": responses[0].status_code}
+
+
+def _warm_chroma() -> Dict:
+    """Open the store and load the HNSW index of each existing vector collection with a one-result query."""
+    client = get_chroma_client()
+    existing = {getattr(c, "name", c) for c in client.list_collections()}
+    loaded = {}
+    for name in (JOB_VECTOR_COLLECTION, MATCH_COLLECTION):
+        if name not in existing:
+            continue
+        collection = client.get_collection(name)
+        sample = collection.get(limit=1, include=["embeddings"]).get("embeddings")
+        if sample is not None and len(sample):
+            collection.query(query_embeddings=[list(sample[0])], n_results=1, include=[])
+        loaded[name] = collection.count()
+    return {"collections": loaded}
+
+
+async def _warm_embeddings() -> Dict:
+    """Load the local embedding model; the remote provider shares the LLM client warmed above."""
+    if embedding_function.provider != "local":
+        return {"skipped": embedding_function.provider}
+    return await embedding_function.aembedding_space()
+
+
+class StartupReport:
+    """
+    Where cold-start time goes: module imports, each warm-up step, and the
+    total until the app is ready to serve.
+    """
+
+    def __init__(self):
+        self.imports_seconds: Optional[float] = None
+        self.ready_seconds: Optional[float] = None
+        self.warmup: Dict[str, Dict] = {}
+
+    def record_imports(self, seconds: float) -> None:
+        self.imports_seconds = round(seconds, 3)
+
+    def mark_ready(self, seconds: float) -> None:
+        self.ready_seconds = round(seconds, 3)
+        logger.info(f"⏱️ Ready in {self.ready_seconds}s (imports {self.imports_seconds}s)")
+
+    async def _step(self, name: str, coro) -> None:
+        started = time.perf_counter()
+        try:
+            with stage(f"warmup.{name}"):
+                detail = await asyncio.wait_for(coro, WARMUP_TIMEOUT)
+            self.warmup[name] = {"ok": True, **detail}
+        except Exception as e:
+            # A failed step only costs the first request its cold path
+            self.warmup[name] = {"ok": False, "error": str(e) or type(e).__name__}
+            logger.warning(f"⚠️ Warm-up step '{name}' failed: {e}")
+        self.warmup[name]["seconds"] = round(time.perf_counter() - started, 3)
+
+    async def warm_up(self) -> Dict:
+        """Run every warm-up step concurrently; failures are logged, never raised."""
+        await asyncio.gather(
+            self._step("mongo", _warm_mongo()),
+            self._step("llm", _warm_llm()),
+            self._step("chroma", asyncio.to_thread(_warm_chroma)),
+            self._step("embeddings", _warm_embeddings()),
+        )
+        logger.info(f"🔥 Warm-up done: { {name: step['seconds'] for name, step in self.warmup.items()} }")
+        return self.warmup
+
+    def stats(self) -> Dict:
+        return {
+            "imports_seconds": self.imports_seconds,
+            "ready_seconds": self.ready_seconds,
+            "warmup_enabled": WARMUP_ON_STARTUP,
+            "warmup": self.warmup,
+        }
+
+
+# ✅ Shared startup report
+startup_report = StartupReport()
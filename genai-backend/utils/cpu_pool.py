@@ -0,0 +1,151 @@
+# utils/cpu_pool.py
+
+import asyncio
+import logging
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, Optional
+
+from dotenv import load_dotenv
+
+load_dotenv()
+logger = logging.getLogger(__name__)
+
+# ⚙️ Pool configuration (configurable via .env)
+CPU_POOL_WORKERS = int(os.getenv("CPU_POOL_WORKERS", str(max(1, (os.cpu_count() or 2) - 1))))
+CPU_POOL_MAX_QUEUE = int(os.getenv("CPU_POOL_MAX_QUEUE", "32"))
+CPU_TASK_TIMEOUT = float(os.getenv("CPU_TASK_TIMEOUT", "30"))
+CPU_POOL_START_METHOD = os.getenv("CPU_POOL_START_METHOD", "spawn")
+
+
+class CPUPoolSaturatedError(RuntimeError):
+    """Raised when the pool already has its maximum number of queued tasks."""
+
+
+class CPUPool:
+    """
+    Process pool for CPU-bound stages (PDF parsing, resume scoring).
+
+    Work submitted here never runs on the event loop. At most
+    `workers + max_queue` tasks are admitted at once; anything beyond that
+    is rejected immediately instead of piling up behind a slow PDF.
+    With `workers=0` tasks run on a single background thread instead.
+    """
+
+    def __init__(self, workers: int, max_queue: int, default_timeout: float, start_method: str = "spawn"):
+        self.workers = workers
+        self.max_queue = max_queue
+        self.default_timeout = default_timeout
+        self.start_method = start_method
+
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._in_flight = 0
+
+        self.completed = 0
+        self.failed = 0
+        self.timeouts = 0
+        self.rejected = 0
+
+    def start(self) -> None:
+        """Create the executor (idempotent). Called from the app startup hook."""
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(max(1, self.workers) + self.max_queue)
+        if self._executor is None:
+            if self.workers > 0:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context(self.start_method),
+                )
+            else:
+                self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="cpu-pool")
+            logger.info(f"⚙️ CPU pool started with {self.workers} worker(s), queue limit {self.max_queue}")
+
+    async def run(self, fn: Callable, *args: Any, timeout: Optional[float] = None) -> Any:
+        """
+        Run fn(*args) in a worker process and await the result.
+
+        fn and its arguments must be picklable (module-level functions, plain data).
+        Raises CPUPoolSaturatedError when the queue is full and
+        asyncio.TimeoutError when the task exceeds its timeout.
+        """
+        self.start()
+        if self._slots.locked():
+            self.rejected += 1
+            raise CPUPoolSaturatedError("⚠️ Server is busy processing documents. Please retry shortly.")
+
+        await self._slots.acquire()
+        self._in_flight += 1
+        loop = asyncio.get_running_loop()
+
+        try:
+            task = self._submit(fn, *args)
+        except BaseException:
+            self._release()
+            raise
+
+        # Free the slot only when the work really finishes, so a timed-out task
+        # still counts against the bound while its worker is busy.
+        task.add_done_callback(lambda _: self._release_threadsafe(loop))
+
+        try:
+            result = await asyncio.wait_for(asyncio.wrap_future(task, loop=loop), timeout or self.default_timeout)
+            self.completed += 1
+            return result
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            logger.warning(f"⏱️ CPU task {getattr(fn, '__name__', fn)} timed out")
+            raise
+        except Exception:
+            self.failed += 1
+            raise
+
+    def _submit(self, fn: Callable, *args: Any):
+        try:
+            return self._executor.submit(fn, *args)
+        except BrokenProcessPool:
+            # A worker died (e.g. OOM on a huge PDF); replace the pool and retry once
+            logger.error("❌ CPU pool was broken, restarting workers.")
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+            self.start()
+            return self._executor.submit(fn, *args)
+
+    def _release_threadsafe(self, loop: asyncio.AbstractEventLoop) -> None:
+        try:
+            loop.call_soon_threadsafe(self._release)
+        except RuntimeError:
+            pass  # Loop already closed during shutdown
+
+    def _release(self) -> None:
+        self._in_flight -= 1
+        self._slots.release()
+
+    async def shutdown(self) -> None:
+        """Cancel queued work and wait for running tasks to finish. Called on app shutdown."""
+        executor, self._executor = self._executor, None
+        if executor is not None:
+            await asyncio.to_thread(executor.shutdown, wait=True, cancel_futures=True)
+            logger.info("🛑 CPU pool shut down.")
+
+    def stats(self) -> Dict:
+        return {
+            "workers": self.workers,
+            "max_queue": self.max_queue,
+            "in_flight": self._in_flight,
+            "completed": self.completed,
+            "failed": self.failed,
+            "timeouts": self.timeouts,
+            "rejected": self.rejected,
+        }
+
+
+# ✅ Shared pool for the whole app
+cpu_pool = CPUPool(
+    workers=CPU_POOL_WORKERS,
+    max_queue=CPU_POOL_MAX_QUEUE,
+    default_timeout=CPU_TASK_TIMEOUT,
+    start_method=CPU_POOL_START_METHOD,
+)
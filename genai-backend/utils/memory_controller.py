@@ -0,0 +1,158 @@
+# utils/memory_controller.py
+
+import gc
+import os
+import time
+import logging
+import threading
+from typing import Dict, Optional
+
+from dotenv import load_dotenv
+
+from utils.metrics import registry, Histogram
+
+load_dotenv()
+logger = logging.getLogger(__name__)
+
+# ⚙️ Memory / GC settings (configurable via .env)
+MEMORY_HIGH_WATERMARK_MB = float(os.getenv("MEMORY_HIGH_WATERMARK_MB", "1024"))
+MEMORY_CHECK_INTERVAL_SECONDS = float(os.getenv("MEMORY_CHECK_INTERVAL_SECONDS", "5"))
+MEMORY_COLLECT_COOLDOWN_SECONDS = float(os.getenv("MEMORY_COLLECT_COOLDOWN_SECONDS", "30"))
+# Python's default gen0 threshold (700) triggers collections every few hundred
+# allocations, which request handling does constantly; 0 keeps the default
+GC_GEN0_THRESHOLD = int(os.getenv("GC_GEN0_THRESHOLD", "10000"))
+GC_FREEZE_ON_STARTUP = os.getenv("GC_FREEZE_ON_STARTUP", "true").lower() != "false"
+
+gc_pause = registry.register(Histogram(
+    "genai_gc_pause_seconds", "Garbage collector pause time by generation", ("generation",),
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5),
+))
+
+try:
+    _PAGE_SIZE = os.sysconf("SC_PAGE_SIZE")
+except (AttributeError, ValueError, OSError):
+    _PAGE_SIZE = 4096
+
+
+def current_rss_bytes() -> Optional[int]:
+    """Resident set size of this process (Linux /proc), or None where unavailable."""
+    try:
+        with open("/proc/self/statm", "rb") as f:
+            return int(f.read().split()[1]) * _PAGE_SIZE
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+class MemoryController:
+    """
+    Replaces blind per-request gc.collect() calls.
+
+    - On startup, raises the gen0 threshold (fewer, cheaper young collections)
+      and gc.freeze()s everything imported so far, so full collections no
+      longer rescan the long-lived module / model objects.
+    - After requests, at most every MEMORY_CHECK_INTERVAL_SECONDS, reads RSS;
+      a full collection runs only when RSS is above MEMORY_HIGH_WATERMARK_MB,
+      and then no more than once per MEMORY_COLLECT_COOLDOWN_SECONDS.
+    - Every collector pause is timed into genai_gc_pause_seconds.
+    """
+
+    def __init__(self, watermark_mb: float, check_interval: float, cooldown: float):
+        self.watermark_bytes = int(watermark_mb * 1024 * 1024)
+        self.check_interval = check_interval
+        self.cooldown = cooldown
+        self._lock = threading.Lock()
+        self._next_check = 0.0
+        self._last_collect = 0.0
+        self._gc_started = 0.0
+        self._started = False
+
+        self.rss_bytes: Optional[int] = None
+        self.peak_rss_bytes = 0
+        self.checks = 0
+        self.collections = 0
+        self.freed_bytes = 0
+        self.frozen_objects = 0
+
+    def start(self) -> None:
+        """Tune the collector (called from the app startup hook)."""
+        if self._started:
+            return
+        self._started = True
+        if GC_GEN0_THRESHOLD > 0:
+            _, gen1, gen2 = gc.get_threshold()
+            gc.set_threshold(GC_GEN0_THRESHOLD, gen1, gen2)
+        if GC_FREEZE_ON_STARTUP:
+            gc.collect()
+            gc.freeze()
+            self.frozen_objects = gc.get_freeze_count()
+        gc.callbacks.append(self._on_gc)
+        self.rss_bytes = current_rss_bytes()
+        logger.info(
+            f"🧠 GC tuned: thresholds={gc.get_threshold()} frozen={self.frozen_objects} "
+            f"watermark={self.watermark_bytes // (1024 * 1024)}MB rss={(self.rss_bytes or 0) // (1024 * 1024)}MB"
+        )
+
+    def stop(self) -> None:
+        if self._on_gc in gc.callbacks:
+            gc.callbacks.remove(self._on_gc)
+        self._started = False
+
+    def _on_gc(self, phase: str, info: Dict) -> None:
+        if phase == "start":
+            self._gc_started = time.perf_counter()
+        elif self._gc_started:
+            gc_pause.observe((str(info.get("generation")),), time.perf_counter() - self._gc_started)
+
+    def maybe_collect(self) -> bool:
+        """Cheap enough to call after every request; returns True if it collected."""
+        now = time.monotonic()
+        if now < self._next_check:
+            return False
+        with self._lock:
+            if now < self._next_check:
+                return False
+            self._next_check = now + self.check_interval
+            self.checks += 1
+            rss = current_rss_bytes()
+            if rss is None:
+                return False
+            self.rss_bytes = rss
+            self.peak_rss_bytes = max(self.peak_rss_bytes, rss)
+            if rss < self.watermark_bytes or now - self._last_collect < self.cooldown:
+                return False
+            self._last_collect = now
+
+        started = time.perf_counter()
+        unreachable = gc.collect()
+        after = current_rss_bytes() or rss
+        with self._lock:
+            self.collections += 1
+            self.freed_bytes += max(0, rss - after)
+            self.rss_bytes = after
+        logger.warning(
+            f"🧹 RSS {rss // (1024 * 1024)}MB above watermark: collected {unreachable} objects in "
+            f"{(time.perf_counter() - started) * 1000:.1f}ms, RSS now {after // (1024 * 1024)}MB"
+        )
+        return True
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "rss_mb": round((self.rss_bytes or 0) / (1024 * 1024), 1),
+                "peak_rss_mb": round(self.peak_rss_bytes / (1024 * 1024), 1),
+                "watermark_mb": round(self.watermark_bytes / (1024 * 1024), 1),
+                "gc_thresholds": gc.get_threshold(),
+                "frozen_objects": self.frozen_objects,
+                "checks": self.checks,
+                "watermark_collections": self.collections,
+                "freed_mb": round(self.freed_bytes / (1024 * 1024), 1),
+                "gc_counts": gc.get_count(),
+            }
+
+
+# ✅ Shared controller for the app
+memory_controller = MemoryController(
+    watermark_mb=MEMORY_HIGH_WATERMARK_MB,
+    check_interval=MEMORY_CHECK_INTERVAL_SECONDS,
+    cooldown=MEMORY_COLLECT_COOLDOWN_SECONDS,
+)
@@ -0,0 +1,237 @@
+# utils/metrics.py
+
+import os
+import time
+import asyncio
+import functools
+import threading
+from bisect import bisect_left
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() != "false"
+
+# Seconds; covers cache hits (sub-millisecond) through slow Gemini calls
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Sequence[str], values: Tuple, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help_text: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.help = help_text
+        self.label_names = tuple(labels)
+        self._lock = threading.Lock()
+
+    def header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, help_text: str, labels: Sequence[str] = ()):
+        super().__init__(name, help_text, labels)
+        self._values: Dict[Tuple, float] = {}
+
+    def inc(self, labels: Tuple = (), amount: float = 1) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def render(self) -> List[str]:
+        with self._lock:
+            values = dict(self._values)
+        return self.header() + [f"{self.name}{_labels(self.label_names, k)} {_number(v)}" for k, v in sorted(values.items())]
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def __init__(self, name: str, help_text: str, labels: Sequence[str] = ()):
+        super().__init__(name, help_text, labels)
+        self._values: Dict[Tuple, float] = {}
+
+    def inc(self, labels: Tuple = (), amount: float = 1) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def dec(self, labels: Tuple = (), amount: float = 1) -> None:
+        self.inc(labels, -amount)
+
+    def set(self, labels: Tuple = (), value: float = 0) -> None:
+        with self._lock:
+            self._values[labels] = value
+
+    def render(self) -> List[str]:
+        with self._lock:
+            values = dict(self._values)
+        return self.header() + [f"{self.name}{_labels(self.label_names, k)} {_number(v)}" for k, v in sorted(values.items())]
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help_text: str, labels: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS):
+        super().__init__(name, help_text, labels)
+        self.buckets = tuple(buckets)
+        self._series: Dict[Tuple, list] = {}  # labels -> [per-bucket counts (+Inf last), sum, count]
+
+    def observe(self, labels: Tuple, value: float) -> None:
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def render(self) -> List[str]:
+        with self._lock:
+            series = {k: ([*v[0]], v[1], v[2]) for k, v in self._series.items()}
+        lines = self.header()
+        for labels, (counts, total, count) in sorted(series.items()):
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                le = 'le="' + _number(bound) + '"'
+                lines.append(f"{self.name}_bucket{_labels(self.label_names, labels, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.label_names, labels)} {_number(total)}")
+            lines.append(f"{self.name}_count{_labels(self.label_names, labels)} {count}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: List[_Metric] = []
+        self._collectors: List[Callable[[], None]] = []
+
+    def register(self, metric: _Metric) -> _Metric:
+        self._metrics.append(metric)
+        return metric
+
+    def add_collector(self, collect: Callable[[], None]) -> None:
+        """Callback run before each scrape, e.g. to copy pool stats into gauges."""
+        self._collectors.append(collect)
+
+    def render(self) -> str:
+        for collect in self._collectors:
+            try:
+                collect()
+            except Exception:
+                pass
+        lines: List[str] = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+# 📈 Shared metrics
+stage_latency = registry.register(Histogram(
+    "genai_stage_duration_seconds", "Time spent in each pipeline stage", ("stage", "outcome")))
+stage_in_flight = registry.register(Gauge(
+    "genai_stage_in_flight", "Pipeline stage calls currently running", ("stage",)))
+http_latency = registry.register(Histogram(
+    "genai_http_request_duration_seconds", "HTTP request latency by route", ("method", "route", "status")))
+http_in_flight = registry.register(Gauge(
+    "genai_http_requests_in_flight", "HTTP requests currently being served"))
+llm_tokens = registry.register(Counter(
+    "genai_llm_tokens_total", "Gemini tokens reported in usageMetadata", ("model", "kind")))
+cache_events = registry.register(Counter(
+    "genai_cache_events_total", "Cache lookups by cache and result", ("cache", "result")))
+
+
+class stage:
+    """
+    Time a block as one pipeline stage (works around sync code and across
+    awaits alike): `with stage("pdf.extract"): ...`. Records the duration
+    with outcome ok / error / cancelled and tracks the in-flight gauge.
+    """
+
+    __slots__ = ("name", "_started")
+
+    def __init__(self, name: str):
+        self.name = name
+        self._started = 0.0
+
+    def __enter__(self):
+        if METRICS_ENABLED:
+            stage_in_flight.inc((self.name,))
+            self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if METRICS_ENABLED:
+            if exc_type is None:
+                outcome = "ok"
+            elif issubclass(exc_type, (asyncio.CancelledError, GeneratorExit)):
+                outcome = "cancelled"
+            else:
+                outcome = "error"
+            stage_latency.observe((self.name, outcome), time.perf_counter() - self._started)
+            stage_in_flight.dec((self.name,))
+        return False
+
+
+def timed(name: str):
+    """Decorator form of `stage` for sync and async functions."""
+
+    def decorate(func):
+        if asyncio.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with stage(name):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with stage(name):
+                return func(*args, **kwargs)
+        return wrapper
+
+    return decorate
+
+
+def count_cache(cache: str, hit: bool, amount: int = 1) -> None:
+    if METRICS_ENABLED and amount:
+        cache_events.inc((cache, "hit" if hit else "miss"), amount)
+
+
+def record_llm_usage(model: str, data: Optional[Dict]) -> None:
+    """Add prompt / completion token counts from a Gemini response's usageMetadata."""
+    usage = (data or {}).get("usageMetadata") if METRICS_ENABLED else None
+    if not usage:
+        return
+    model = model.split("/")[-1]
+    for field, kind in (("promptTokenCount", "prompt"), ("candidatesTokenCount", "completion")):
+        if usage.get(field):
+            llm_tokens.inc((model, kind), usage[field])
+
+
+def render_metrics() -> str:
+    """Everything in the Prometheus text exposition format (version 0.0.4)."""
+    return registry.render()
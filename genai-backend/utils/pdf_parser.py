@@ -1,6 +1,14 @@
 import io
+import hashlib
 from PyPDF2 import PdfReader
 
+from utils.text_cache import resume_text_cache
+from utils.cpu_pool import cpu_pool
+from utils.metrics import stage, count_cache
+
+# Bump when extraction logic changes so cached text is re-derived
+PARSER_VERSION = "pypdf2-v1"
+
 def extract_text_from_pdf(pdf_bytes: bytes) -> str:
     """
     Extracts text from a PDF given as bytes (from MongoDB).
@@ -19,3 +27,47 @@ def extract_text_from_pdf(pdf_bytes: bytes) -> str:
         return text.strip()
     except Exception as e:
         raise RuntimeError(f"❌ Failed to extract text from PDF bytes: {e}")
+
+
+def pdf_content_hash(pdf_bytes: bytes) -> str:
+    """
+    Content address for a PDF: SHA-256 of the raw bytes plus the parser version.
+    """
+    digest = hashlib.sha256(bytes(pdf_bytes))
+    digest.update(PARSER_VERSION.encode("utf-8"))
+    return digest.hexdigest()
+
+
+def extract_text_cached(pdf_bytes: bytes) -> str:
+    """
+    Same as extract_text_from_pdf, but served from the shared text cache
+    when the exact same PDF has been parsed before.
+    """
+    key = pdf_content_hash(pdf_bytes)
+    text = resume_text_cache.get(key)
+    count_cache("resume_text", text is not None)
+    if text is not None:
+        return text
+
+    with stage("pdf.extract"):
+        text = extract_text_from_pdf(pdf_bytes)
+    resume_text_cache.put(key, text)
+    return text
+
+
+async def extract_text_async(pdf_bytes: bytes) -> str:
+    """
+    Awaitable extract_text_cached: cache hits return immediately, misses are
+    parsed in the CPU pool so PyPDF2 never blocks the event loop.
+    """
+    pdf_bytes = bytes(pdf_bytes)
+    key = pdf_content_hash(pdf_bytes)
+    text = resume_text_cache.get(key)
+    count_cache("resume_text", text is not None)
+    if text is not None:
+        return text
+
+    with stage("pdf.extract"):
+        text = await cpu_pool.run(extract_text_from_pdf, pdf_bytes)
+    resume_text_cache.put(key, text)
+    return text
@@ -0,0 +1,285 @@
+# utils/prompt_compactor.py
+
+import os
+import re
+import logging
+import threading
+import unicodedata
+from collections import Counter, defaultdict
+from typing import Dict, List, Optional, Tuple
+
+from dotenv import load_dotenv
+
+load_dotenv()
+logger = logging.getLogger(__name__)
+
+# Bump when the compaction rules change (it is part of every prompt version)
+COMPACTOR_VERSION = "compact-v3"
+
+PROMPT_COMPACTION_ENABLED = os.getenv("PROMPT_COMPACTION_ENABLED", "true").lower() != "false"
+
+# Running header/footer detection: how often a short line must repeat before extra copies are dropped
+RUNNING_LINE_MIN_REPEATS = 3
+RUNNING_LINE_MAX_CHARS = 60
+
+# ⚙️ Token budgets per feature and input (configurable via .env)
+PROMPT_BUDGETS: Dict[str, Dict[str, int]] = {
+    "cover_letter": {
+        "resume": int(os.getenv("PROMPT_BUDGET_COVER_LETTER_RESUME", "1200")),
+        "job": int(os.getenv("PROMPT_BUDGET_COVER_LETTER_JOB", "700")),
+    },
+    "resume_tips": {
+        "resume": int(os.getenv("PROMPT_BUDGET_RESUME_TIPS_RESUME", "1800")),
+    },
+    "jd_match": {
+        "resume": int(os.getenv("PROMPT_BUDGET_JD_MATCH_RESUME", "1200")),
+        "job": int(os.getenv("PROMPT_BUDGET_JD_MATCH_JOB", "800")),
+    },
+}
+
+# 🧭 Section headings and how much each kind is worth when the budget is tight
+SECTION_HEADINGS = {
+    "summary": ("summary", "profile", "objective", "about me", "career objective", "professional summary"),
+    "experience": ("experience", "work experience", "professional experience", "employment", "work history", "internships", "internship"),
+    "skills": ("skills", "technical skills", "core skills", "key skills", "technologies", "tools", "competencies"),
+    "projects": ("projects", "academic projects", "personal projects", "key projects"),
+    "education": ("education", "academics", "qualifications", "academic qualifications"),
+    "certifications": ("certifications", "certificates", "courses", "training", "licenses"),
+    "achievements": ("achievements", "awards", "honors", "accomplishments", "publications"),
+    "responsibilities": ("responsibilities", "what you will do", "what you'll do", "role", "duties", "job description", "the role"),
+    "requirements": ("requirements", "required skills", "must have", "preferred qualifications", "what we are looking for", "what we're looking for", "who you are", "eligibility"),
+    "company": ("about us", "about the company", "who we are", "our company", "company overview"),
+    "benefits": ("benefits", "perks", "what we offer", "compensation", "why join us"),
+    "legal": ("equal opportunity", "eeo", "disclaimer", "privacy"),
+    "personal": ("personal details", "personal information", "declaration", "hobbies", "interests", "languages known", "references"),
+}
+SECTION_WEIGHTS = {
+    "header": 0.9,
+    "summary": 0.8,
+    "experience": 1.0,
+    "skills": 1.0,
+    "projects": 0.8,
+    "education": 0.6,
+    "certifications": 0.5,
+    "achievements": 0.5,
+    "responsibilities": 1.0,
+    "requirements": 1.0,
+    "other": 0.5,
+    "company": 0.25,
+    "benefits": 0.1,
+    "legal": 0.0,
+    "personal": 0.05,
+}
+
+_HEADING_LOOKUP = {name: kind for kind, names in SECTION_HEADINGS.items() for name in names}
+# Kinds whose headings only count on an exact match ("Privacy Guard" is a project, not a policy)
+_EXACT_HEADING_KINDS = {"legal"}
+_PAGE_MARKER_RE = re.compile(r"^(page\s*\d+(\s*(of|/)\s*\d+)?|\d+\s*(of|/)\s*\d+|-\s*\d+\s*-)$", re.IGNORECASE)
+_HYPHEN_BREAK_RE = re.compile(r"(\w)-\n(\w)")
+_SPACE_RE = re.compile(r"[ \t ​]+")
+_BULLET_RE = re.compile(r"^[•●▪■◦‣∙·\-\*–]\s*")
+_WORD_RE = re.compile(r"[a-z0-9+#.]{2,}")
+_MIN_PARTIAL_TOKENS = 40
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (~4 characters per token for English), no tokenizer needed."""
+    return (len(text or "") + 3) // 4
+
+
+def clip_tokens(text: str, tokens: int, keep_end: bool = False) -> str:
+    """Trim text to about `tokens` tokens, at a word boundary."""
+    limit = tokens * 4
+    text = text or ""
+    if len(text) <= limit:
+        return text
+    if keep_end:
+        clipped = text[-limit:]
+        return "…" + clipped[clipped.find(" ") + 1:]
+    clipped = text[:limit]
+    return clipped[:clipped.rfind(" ")] + "…" if " " in clipped else clipped + "…"
+
+
+def normalize_text(text: str) -> str:
+    """
+    Clean PDF/HTML extraction output: unicode normalization, hyphenated line
+    breaks rejoined, bullets unified, whitespace collapsed, page markers and
+    running headers/footers (short non-bullet lines repeated at least
+    RUNNING_LINE_MIN_REPEATS times) kept only once.
+    """
+    text = unicodedata.normalize("NFKC", text or "")
+    text = _HYPHEN_BREAK_RE.sub(r"\1\2", text.replace("\r\n", "\n").replace("\r", "\n"))
+
+    lines = []
+    for raw in text.split("\n"):
+        line = _SPACE_RE.sub(" ", raw).strip()
+        if not line or _PAGE_MARKER_RE.match(line):
+            continue
+        if _BULLET_RE.match(line):
+            line = "- " + _BULLET_RE.sub("", line)
+        lines.append(line)
+
+    # Running headers/footers: short non-bullet lines repeated on every page.
+    # Lines a resume legitimately repeats (a job title, a bullet, "Remote")
+    # rarely hit the threshold, and bullets are never touched.
+    counts = Counter(_running_line_key(line) for line in lines)
+    seen = set()
+    deduped = []
+    for line in lines:
+        key = _running_line_key(line)
+        if key is not None and counts[key] >= RUNNING_LINE_MIN_REPEATS:
+            if key in seen:
+                continue
+            seen.add(key)
+        deduped.append(line)
+    return "\n".join(deduped)
+
+
+def _running_line_key(line: str) -> Optional[str]:
+    """Dedupe key for lines that could be a running header/footer, else None."""
+    if line.startswith("- ") or len(line) > RUNNING_LINE_MAX_CHARS:
+        return None
+    return line.lower()
+
+
+def _heading_kind(line: str) -> Optional[str]:
+    """Section kind if the line looks like a heading, else None."""
+    if len(line) > 48 or line.startswith("- "):
+        return None
+    name = line.rstrip(":").strip().lower()
+    kind = _HEADING_LOOKUP.get(name)
+    if kind:
+        return kind
+    for heading, heading_kind in _HEADING_LOOKUP.items():
+        if heading_kind not in _EXACT_HEADING_KINDS and name.startswith(heading) and len(name) <= len(heading) + 12:
+            return heading_kind
+    letters = [c for c in line if c.isalpha()]
+    if len(letters) >= 4 and all(c.isupper() for c in letters) and len(line.split()) <= 5:
+        return "other"
+    return None
+
+
+def split_sections(text: str) -> List[Tuple[str, str]]:
+    """Split normalized text into [(kind, text)]; text before the first heading is the "header"."""
+    sections: List[Tuple[str, List[str]]] = [("header", [])]
+    for line in text.split("\n"):
+        kind = _heading_kind(line)
+        if kind:
+            sections.append((kind, [line]))
+        else:
+            sections[-1][1].append(line)
+    return [(kind, "\n".join(lines)) for kind, lines in sections if lines]
+
+
+def _relevance(section: str, context_words: Counter) -> float:
+    words = set(_WORD_RE.findall(section.lower()))
+    if not words or not context_words:
+        return 0.0
+    return len(words & context_words.keys()) / len(words) ** 0.5
+
+
+def fit_to_budget(text: str, budget: int, context: str = "", drop_boilerplate: bool = False) -> str:
+    """
+    Keep the most valuable sections within `budget` tokens, in their original
+    order. Sections are ranked by kind (SECTION_WEIGHTS) plus word overlap
+    with `context` (the other side of the prompt); the first section that
+    does not fit is clipped into the space left.
+
+    Text already within budget comes back unchanged, unless `drop_boilerplate`
+    (job postings) removes weight-0 sections such as EEO statements first.
+    """
+    sections = split_sections(text)
+    if drop_boilerplate:
+        sections = [(kind, body) for kind, body in sections if SECTION_WEIGHTS.get(kind, 0.5) > 0]
+        text = "\n".join(body for _, body in sections)
+    if estimate_tokens(text) <= budget:
+        return text
+
+    context_words = Counter(_WORD_RE.findall((context or "").lower()))
+    relevance = [_relevance(body, context_words) for _, body in sections]
+    top = max(relevance) or 1.0
+    ranked = sorted(
+        range(len(sections)),
+        key=lambda i: SECTION_WEIGHTS.get(sections[i][0], 0.5) + 0.5 * relevance[i] / top,
+        reverse=True,
+    )
+
+    kept: Dict[int, str] = {}
+    remaining = budget
+    for index in ranked:
+        kind, body = sections[index]
+        cost = estimate_tokens(body) + 1
+        if cost <= remaining:
+            kept[index] = body
+            remaining -= cost
+        elif remaining >= _MIN_PARTIAL_TOKENS:
+            kept[index] = clip_tokens(body, remaining - 1)
+            remaining = 0
+        if remaining < _MIN_PARTIAL_TOKENS:
+            break
+    return "\n".join(kept[i] for i in sorted(kept))
+
+
+class CompactionStats:
+    """Running per-feature totals of tokens before and after compaction."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._totals: Dict[str, Dict[str, int]] = defaultdict(lambda: {"calls": 0, "tokens_in": 0, "tokens_out": 0})
+
+    def record(self, feature: str, tokens_in: int, tokens_out: int) -> None:
+        with self._lock:
+            totals = self._totals[feature]
+            totals["calls"] += 1
+            totals["tokens_in"] += tokens_in
+            totals["tokens_out"] += tokens_out
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                feature: {
+                    **totals,
+                    "tokens_saved": totals["tokens_in"] - totals["tokens_out"],
+                    "saved_ratio": round(1 - totals["tokens_out"] / totals["tokens_in"], 3) if totals["tokens_in"] else 0.0,
+                }
+                for feature, totals in self._totals.items()
+            }
+
+
+compaction_stats = CompactionStats()
+
+
+def compaction_signature(feature: str) -> str:
+    """Goes into the feature's prompt version, so cached results follow budget changes."""
+    if not PROMPT_COMPACTION_ENABLED:
+        return "off"
+    budgets = ",".join(f"{k}={v}" for k, v in sorted(PROMPT_BUDGETS.get(feature, {}).items()))
+    return f"{COMPACTOR_VERSION}:{budgets}"
+
+
+def compact_inputs(feature: str, resume_text: str = "", job_text: str = "") -> Dict[str, str]:
+    """
+    Normalize, dedupe and budget the resume / job text for one feature's prompt.
+
+    Each side is ranked against the other, so the resume keeps the sections
+    that overlap the job and vice versa. Logs and records the tokens saved.
+
+    Returns:
+        dict: {"resume": str, "job": str}
+    """
+    if not PROMPT_COMPACTION_ENABLED:
+        return {"resume": resume_text, "job": job_text}
+
+    budgets = PROMPT_BUDGETS.get(feature, {})
+    resume_clean = normalize_text(resume_text)
+    job_clean = normalize_text(job_text)
+    compacted = {
+        "resume": fit_to_budget(resume_clean, budgets["resume"], job_clean) if "resume" in budgets else resume_clean,
+        "job": fit_to_budget(job_clean, budgets["job"], resume_clean, drop_boilerplate=True) if "job" in budgets else job_clean,
+    }
+
+    tokens_in = estimate_tokens(resume_text) + estimate_tokens(job_text)
+    tokens_out = estimate_tokens(compacted["resume"]) + estimate_tokens(compacted["job"])
+    compaction_stats.record(feature, tokens_in, tokens_out)
+    logger.info(f"✂️ {feature} prompt inputs: {tokens_in} → {tokens_out} tokens ({tokens_in - tokens_out} saved)")
+    return compacted
@@ -0,0 +1,65 @@
+# utils/request_middleware.py
+
+import time
+import logging
+
+from utils.metrics import http_latency, http_in_flight
+from utils.memory_controller import memory_controller
+
+logger = logging.getLogger(__name__)
+
+
+class RequestMiddleware:
+    """
+    Pure ASGI middleware for request logging, timing and CORS preflight debugging.
+
+    Unlike @app.middleware("http") (BaseHTTPMiddleware), it does not wrap the
+    request and response in extra tasks and memory streams: it only watches
+    the messages going by. X-Process-Time (time to first response byte) is
+    added to the response start; the completion log line and the latency
+    histogram use the full duration, including streamed bodies.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        method = scope["method"]
+        path = scope["path"]
+        origin = "N/A"
+        for name, value in scope.get("headers") or ():
+            if name == b"origin":
+                origin = value.decode("latin-1")
+                break
+        client = scope.get("client")
+        logger.info(f"🌐 {method} {path} - Client: {client[0] if client else 'N/A'} - Origin: {origin}")
+        if method == "OPTIONS":
+            logger.info(f"🔍 CORS preflight request from origin: {origin}")
+
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                headers = list(message.get("headers") or [])
+                headers.append((b"x-process-time", str(time.perf_counter() - started).encode("latin-1")))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        http_in_flight.inc()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            http_in_flight.dec()
+            process_time = time.perf_counter() - started
+            # Route template, not the raw path, so IDs don't explode label cardinality
+            route = getattr(scope.get("route"), "path", "unmatched")
+            http_latency.observe((method, route, str(status_code)), process_time)
+            logger.info(f"✅ {method} {path} - Status: {status_code} - Time: {process_time:.3f}s")
+            memory_controller.maybe_collect()
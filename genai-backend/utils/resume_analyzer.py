@@ -0,0 +1,96 @@
+# utils/resume_analyzer.py
+
+import re
+from typing import FrozenSet, List, NamedTuple
+
+# 🔤 Whole-word vocabulary used by the ATS score and the tips.
+# Every term is a single word of letters, so a \b-bounded match is always a
+# whole word token; multi-word headings from the original patterns
+# ("work experience", "technical skills", ...) are implied by their last word.
+WORD_TERMS = (
+    "experience", "employment",
+    "education", "academic", "degree", "university", "college",
+    "skills", "competencies", "technologies",
+    "contact", "email", "phone", "address",
+    "achieved", "managed", "developed", "created", "led", "improved",
+)
+
+# Substring keywords (matched anywhere in the lowercased text, like match_keywords)
+PROFESSIONAL_KEYWORDS = [
+    'experience', 'project', 'managed', 'developed', 'created', 'led',
+    'achieved', 'improved', 'implemented', 'designed', 'built',
+    'collaborated', 'team', 'client', 'solution', 'skills',
+    'education', 'university', 'degree', 'certification',
+    'software', 'technical', 'analysis', 'communication'
+]
+# The first 16 are the ones that count towards the ATS score
+SCORING_KEYWORDS = PROFESSIONAL_KEYWORDS[:16]
+
+FIRST_PERSON_PHRASES = ('i am', 'my name is', 'i have')
+
+# ✅ Compiled once at import. Each runs at most once per resume.
+_TOKEN_RE = re.compile(r"\w+")
+_WORD_SET = frozenset(WORD_TERMS)
+_WORD_FULL_RE = re.compile("|".join(f"(?P<{term}>{term})" for term in WORD_TERMS), re.IGNORECASE)
+_DIGITS = "0123456789"
+_EMAIL_RE = re.compile(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b')
+_PHONE_RE = re.compile(r'\b\d{3}[-.]?\d{3}[-.]?\d{4}\b')
+_QUANTIFIED_RE = re.compile(r'\b\d+(?:\.\d+)?(?:%|percent|\+|years?|months?)\b', re.IGNORECASE)
+
+
+class ResumeFeatures(NamedTuple):
+    """Everything the ATS score and tips need to know about a resume's text."""
+    word_count: int
+    words: FrozenSet[str]              # WORD_TERMS present as whole words (case-insensitive)
+    keywords: FrozenSet[str]           # PROFESSIONAL_KEYWORDS present as substrings
+    has_email: bool
+    has_phone: bool
+    has_quantified: bool
+    has_first_person: bool
+    has_bullets: bool                  # '•', '-' or '*'
+    has_arrow: bool                    # '→'
+
+
+def analyze_resume(resume_text: str) -> ResumeFeatures:
+    """
+    Scan a resume's text once and return its feature record.
+
+    One tokenizing pass finds every whole-word term, the text is lowercased
+    once for all substring keywords, and the contact/achievement patterns
+    are each evaluated once (and skipped when their anchor character is
+    absent) instead of once per consumer.
+    """
+    lowered = resume_text.lower()
+    is_ascii = resume_text.isascii()
+
+    # A \b-bounded case-insensitive match of a one-word term is exactly a \w+
+    # token equal to it. For ASCII text that is a plain set lookup; otherwise
+    # compare tokens with re's own case folding (e.g. 'ſkills' matches 'skills').
+    if is_ascii:
+        words = _WORD_SET.intersection(_TOKEN_RE.findall(lowered))
+    else:
+        words = frozenset(
+            match.lastgroup
+            for match in map(_WORD_FULL_RE.fullmatch, set(_TOKEN_RE.findall(resume_text)))
+            if match
+        )
+
+    # \d also matches non-ASCII digits, so only prefilter ASCII text
+    has_digits = not is_ascii or any(digit in resume_text for digit in _DIGITS)
+
+    return ResumeFeatures(
+        word_count=len(resume_text.split()),
+        words=frozenset(words),
+        keywords=frozenset(k for k in PROFESSIONAL_KEYWORDS if k in lowered),
+        has_email='@' in resume_text and _EMAIL_RE.search(resume_text) is not None,
+        has_phone=has_digits and _PHONE_RE.search(resume_text) is not None,
+        has_quantified=has_digits and _QUANTIFIED_RE.search(resume_text) is not None,
+        has_first_person=any(phrase in lowered for phrase in FIRST_PERSON_PHRASES),
+        has_bullets=any(marker in resume_text for marker in ('•', '-', '*')),
+        has_arrow='→' in resume_text,
+    )
+
+
+def matched_keywords(features: ResumeFeatures, keywords: List[str] = PROFESSIONAL_KEYWORDS) -> List[str]:
+    """Keywords (a subset of PROFESSIONAL_KEYWORDS) found in the resume, in the order given."""
+    return [k for k in keywords if k in features.keywords]
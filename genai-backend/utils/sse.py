@@ -0,0 +1,63 @@
+# utils/sse.py
+
+import json
+import time
+import logging
+from typing import AsyncIterator, Dict, Optional
+
+from fastapi import Request
+from fastapi.responses import StreamingResponse
+
+logger = logging.getLogger(__name__)
+
+
+def format_event(event: str, data: Dict) -> str:
+    """One server-sent event with a JSON payload."""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+def sse_response(request: Request, chunks: AsyncIterator[str], meta: Optional[Dict] = None) -> StreamingResponse:
+    """
+    Stream text chunks to the client as SSE.
+
+    Events:
+        token  {"text": "<chunk>"}                      — as soon as each chunk arrives
+        done   {"text": "<full text>", ...meta, ...}    — once, after the last chunk
+        error  {"error": "<message>"}                   — if generation fails mid-stream
+
+    If the client disconnects, the upstream generator is closed so the
+    LLM request is cancelled instead of running to completion.
+    """
+    meta = meta or {}
+
+    async def event_stream():
+        started = time.perf_counter()
+        first_token_ms = None
+        parts = []
+        try:
+            async for chunk in chunks:
+                if await request.is_disconnected():
+                    logger.info(f"🔌 Client disconnected from {request.url.path}; cancelling generation.")
+                    return
+                if first_token_ms is None:
+                    first_token_ms = round((time.perf_counter() - started) * 1000, 1)
+                parts.append(chunk)
+                yield format_event("token", {"text": chunk})
+
+            yield format_event("done", {
+                **meta,
+                "text": "".join(parts).strip(),
+                "time_to_first_token_ms": first_token_ms,
+                "elapsed_ms": round((time.perf_counter() - started) * 1000, 1),
+            })
+        except Exception as e:
+            logger.error(f"❌ Streaming failed for {request.url.path}: {e}")
+            yield format_event("error", {"error": str(e)})
+        finally:
+            await chunks.aclose()
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -0,0 +1,203 @@
+# utils/text_cache.py
+
+import os
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# ⚙️ Cache budgets (configurable via .env)
+MEMORY_BUDGET_BYTES = int(float(os.getenv("RESUME_TEXT_CACHE_MEMORY_MB", "32")) * 1024 * 1024)
+DISK_BUDGET_BYTES = int(float(os.getenv("RESUME_TEXT_CACHE_DISK_MB", "256")) * 1024 * 1024)
+CACHE_DIR = os.getenv("RESUME_TEXT_CACHE_DIR", "./cache/resume_text")
+
+
+class TextCache:
+    """
+    Two-tier content-addressed cache for extracted text.
+
+    Tier 1 is a bounded in-memory LRU, tier 2 is a directory of text files
+    named by key. Keys are expected to be content hashes, so entries never
+    go stale — they are only evicted to stay within the size budgets.
+    """
+
+    def __init__(self, memory_budget_bytes: int, cache_dir: Optional[str] = None, disk_budget_bytes: int = 0):
+        self.memory_budget_bytes = memory_budget_bytes
+        self.cache_dir = cache_dir or None
+        self.disk_budget_bytes = disk_budget_bytes
+
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()  # key -> (text, size)
+        self._memory_bytes = 0
+        self._disk_bytes = None  # Computed lazily on first disk write
+        self._lock = threading.Lock()
+
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.disk_evictions = 0
+
+        if self.cache_dir:
+            os.makedirs(self.cache_dir, exist_ok=True)
+
+    # ---------- public API ----------
+
+    def get(self, key: str) -> Optional[str]:
+        """Return cached text for key, or None on a miss in both tiers."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.memory_hits += 1
+                return entry[0]
+
+        text = self._read_disk(key)
+        if text is not None:
+            with self._lock:
+                self.disk_hits += 1
+                self._put_memory(key, text)
+            return text
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, key: str, text: str) -> None:
+        """Store text in both tiers."""
+        with self._lock:
+            self._put_memory(key, text)
+        self._write_disk(key, text)
+
+    def clear(self) -> None:
+        """Drop the in-memory tier (the disk tier is left untouched)."""
+        with self._lock:
+            self._entries.clear()
+            self._memory_bytes = 0
+
+    def stats(self) -> Dict:
+        """Hit/miss/eviction counters and current usage against the budgets."""
+        with self._lock:
+            lookups = self.memory_hits + self.disk_hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "memory_bytes": self._memory_bytes,
+                "memory_budget_bytes": self.memory_budget_bytes,
+                "disk_enabled": bool(self.cache_dir),
+                "disk_bytes": self._disk_bytes or 0,
+                "disk_budget_bytes": self.disk_budget_bytes,
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "disk_evictions": self.disk_evictions,
+                "hit_rate": round((self.memory_hits + self.disk_hits) / lookups, 4) if lookups else 0.0,
+            }
+
+    # ---------- memory tier ----------
+
+    def _put_memory(self, key: str, text: str) -> None:
+        size = _text_size(text)
+        if size > self.memory_budget_bytes:
+            return  # Larger than the whole budget; disk tier only
+
+        previous = self._entries.pop(key, None)
+        if previous is not None:
+            self._memory_bytes -= previous[1]
+
+        self._entries[key] = (text, size)
+        self._memory_bytes += size
+
+        while self._memory_bytes > self.memory_budget_bytes and self._entries:
+            _, (_, evicted_size) = self._entries.popitem(last=False)
+            self._memory_bytes -= evicted_size
+            self.evictions += 1
+
+    # ---------- disk tier ----------
+
+    def _path_for(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key[:2], f"{key}.txt")
+
+    def _read_disk(self, key: str) -> Optional[str]:
+        if not self.cache_dir:
+            return None
+        path = self._path_for(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                text = f.read()
+            os.utime(path)  # Refresh mtime so disk eviction is least-recently-used
+            return text
+        except (FileNotFoundError, OSError, UnicodeDecodeError):
+            return None
+
+    def _write_disk(self, key: str, text: str) -> None:
+        if not self.cache_dir or self.disk_budget_bytes <= 0:
+            return
+        path = self._path_for(key)
+        if os.path.exists(path):
+            return
+
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.write(text)
+            os.replace(tmp_path, path)  # Atomic, so readers never see partial files
+        except OSError as e:
+            print(f"⚠️ Could not write text cache entry {key}: {e}")
+            return
+
+        with self._lock:
+            if self._disk_bytes is None:
+                self._disk_bytes = self._scan_disk_bytes()
+            else:
+                self._disk_bytes += os.path.getsize(path)
+            if self._disk_bytes > self.disk_budget_bytes:
+                self._evict_disk()
+
+    def _list_disk_entries(self):
+        entries = []
+        for root, _, files in os.walk(self.cache_dir):
+            for name in files:
+                if not name.endswith(".txt"):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((st.st_mtime, st.st_size, path))
+        return entries
+
+    def _scan_disk_bytes(self) -> int:
+        return sum(size for _, size, _ in self._list_disk_entries())
+
+    def _evict_disk(self) -> None:
+        """Remove least-recently-used files until usage is back under 90% of the budget."""
+        target = int(self.disk_budget_bytes * 0.9)
+        entries = sorted(self._list_disk_entries())
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if total <= target:
+                break
+            try:
+                os.remove(path)
+                total -= size
+                self.disk_evictions += 1
+            except OSError:
+                continue
+        self._disk_bytes = total
+
+
+def _text_size(text: str) -> int:
+    return len(text.encode("utf-8"))
+
+
+# ✅ Shared cache for text extracted from resume / JD PDFs
+resume_text_cache = TextCache(
+    memory_budget_bytes=MEMORY_BUDGET_BYTES,
+    cache_dir=CACHE_DIR,
+    disk_budget_bytes=DISK_BUDGET_BYTES,
+)